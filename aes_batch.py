@@ -0,0 +1,357 @@
+import os
+import re
+import binascii
+import numpy as np
+from Crypto.Cipher import AES
+from Crypto.Util.Padding import unpad
+from tracing import span
+
+# ========== KONSTANTA ==========
+PADDING_PKCS7 = "PKCS#7"
+PADDING_FIXED = "Fixed Length"
+PADDING_CTR = "CTR"
+PADDING_GCM = "GCM"
+PADDING_BUCKET = "Bucket"
+PADDING_METHODS = (PADDING_PKCS7, PADDING_FIXED, PADDING_BUCKET, PADDING_CTR, PADDING_GCM)
+# Mode tanpa padding dengan nonce acak per baris: ciphertext tidak deterministik
+NONCE_MODES = (PADDING_CTR, PADDING_GCM)
+# Metode yang menambah '#' sebelum PKCS#7 (dibuang lagi setelah dekripsi)
+HASH_PADDED = (PADDING_FIXED, PADDING_BUCKET)
+FIXED_LENGTH_TARGET = 152
+# Padding bucket: setiap baris diratakan ke batas kelas panjangnya (byte ciphertext, kelipatan 16).
+# Batas kelas ikut disimpan di nama metode, mis. "Bucket[48,96,160]", agar ikut ke shard paralel,
+# memo, indeks inkremental, dan log tanpa parameter tambahan.
+BUCKET_POW2 = "Pangkat dua"
+BUCKET_QUANTILE = "Kuantil"
+BUCKET_STRATEGIES = (BUCKET_POW2, BUCKET_QUANTILE)
+DEFAULT_BUCKET_COUNT = 4
+DEFAULT_BUCKETS = (16, 32, 64, 128, 256, 512, 1024)
+CTR_NONCE_SIZE = 8    # nonce 8 byte + counter blok 8 byte big-endian (default pycryptodome)
+GCM_NONCE_SIZE = 12
+GCM_TAG_SIZE = 16
+ERROR_LABELS = {
+    PADDING_PKCS7: ("PKCS#7", "ERROR_DECRYPT_PKCS7"),
+    PADDING_FIXED: ("Fixed Length", "ERROR_DECRYPT_FIXED"),
+    PADDING_CTR: ("CTR", "ERROR_DECRYPT_CTR"),
+    PADDING_GCM: ("GCM", "ERROR_DECRYPT_GCM"),
+    PADDING_BUCKET: ("Bucket", "ERROR_DECRYPT_BUCKET"),
+}
+_BUCKET_PATTERN = re.compile(r"^Bucket\[([\d,]+)\]$")
+
+# ========== STRUKTUR DATA BATCH ==========
+
+class BatchCiphertext:
+    """Ciphertext satu batch dalam satu buffer kontigu beserta tabel offset per baris"""
+
+    def __init__(self, buffer, offsets):
+        self.buffer = buffer
+        self.offsets = offsets
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def row(self, i):
+        """Mengambil ciphertext mentah (bytes) baris ke-i"""
+        return self.buffer[self.offsets[i]:self.offsets[i + 1]]
+
+    def hex_rows(self):
+        """Mengembalikan ciphertext per baris dalam bentuk string heksadesimal"""
+        with span("hex_encode", rows=len(self), nbytes=len(self.buffer)):
+            hex_all = binascii.hexlify(self.buffer).decode('ascii')
+            offsets = self.offsets
+            return [hex_all[offsets[i] * 2:offsets[i + 1] * 2] for i in range(len(offsets) - 1)]
+
+    def slice(self, start, stop):
+        """Mengambil sub-batch baris [start, stop) dengan offset yang dimulai dari nol"""
+        base = self.offsets[start]
+        offsets = [offset - base for offset in self.offsets[start:stop + 1]]
+        return BatchCiphertext(self.buffer[base:self.offsets[stop]], offsets)
+
+    def take(self, indices):
+        """Sub-batch berisi baris-baris terpilih (urutan mengikuti `indices`)"""
+        parts = [self.row(i) for i in indices]
+        return BatchCiphertext(b"".join(parts), _offsets_from_lengths(len(part) for part in parts))
+
+    @classmethod
+    def concat(cls, batches):
+        """Menggabungkan beberapa batch berurutan menjadi satu batch"""
+        offsets = [0]
+        for batch in batches:
+            base = offsets[-1]
+            offsets.extend(base + offset for offset in batch.offsets[1:])
+        return cls(b"".join(batch.buffer for batch in batches), offsets)
+
+    @classmethod
+    def from_hex_rows(cls, hex_rows):
+        """Membangun batch dari daftar ciphertext heksadesimal (baris tidak valid menjadi kosong)"""
+        parts = []
+        invalid = {}
+        with span("hex_decode", rows=len(hex_rows)) as current:
+            for i, ciphertext_hex in enumerate(hex_rows):
+                try:
+                    raw = binascii.unhexlify(ciphertext_hex)
+                except (ValueError, binascii.Error) as e:
+                    invalid[i] = str(e)
+                    raw = b""
+                parts.append(raw)
+            batch = cls(b"".join(parts), _offsets_from_lengths(len(p) for p in parts))
+            current.set(nbytes=len(batch.buffer))
+        return batch, invalid
+
+# ========== FUNGSI BANTU ==========
+
+def _offsets_from_lengths(lengths):
+    """Membuat tabel offset kumulatif dari panjang tiap baris"""
+    offsets = [0]
+    total = 0
+    for length in lengths:
+        total += length
+        offsets.append(total)
+    return offsets
+
+def _pkcs7_pad_rows(rows_bytes):
+    """Padding PKCS#7 untuk semua baris sekaligus ke dalam satu buffer"""
+    block = AES.block_size
+    parts = []
+    lengths = []
+    for data in rows_bytes:
+        pad_len = block - len(data) % block
+        parts.append(data)
+        parts.append(bytes((pad_len,)) * pad_len)
+        lengths.append(len(data) + pad_len)
+    return b"".join(parts), _offsets_from_lengths(lengths)
+
+# ========== PADDING BUCKET ==========
+
+def padding_family(padding_method):
+    """Nama dasar metode padding (batas kelas bucket diabaikan)"""
+    return PADDING_BUCKET if padding_method.startswith(PADDING_BUCKET) else padding_method
+
+def bucket_padding_method(ceilings):
+    """Nama metode padding bucket beserta batas kelasnya"""
+    return f"{PADDING_BUCKET}[{','.join(str(ceiling) for ceiling in ceilings)}]"
+
+def parse_buckets(padding_method):
+    """Batas kelas (byte ciphertext) dari nama metode bucket; 'Bucket' saja memakai DEFAULT_BUCKETS"""
+    match = _BUCKET_PATTERN.match(padding_method)
+    return tuple(int(value) for value in match.group(1).split(",")) if match else DEFAULT_BUCKETS
+
+def learn_buckets(lengths, strategy=BUCKET_POW2, count=DEFAULT_BUCKET_COUNT):
+    """Mempelajari batas kelas dari distribusi panjang plaintext (byte, sebelum padding)
+
+    Pangkat dua: kelas = pangkat dua di atas setiap ukuran PKCS#7 yang muncul. Kuantil: `count`
+    kelas pada kuantil ukuran PKCS#7, kelas terakhir selalu mencakup baris terpanjang.
+    """
+    block = AES.block_size
+    lengths = np.asarray(lengths, dtype=np.int64)
+    if len(lengths) == 0:
+        return DEFAULT_BUCKETS
+    needed = (lengths // block + 1) * block
+    if strategy == BUCKET_QUANTILE:
+        quantiles = np.quantile(needed, np.arange(1, count + 1) / count, method="higher")
+        ceilings = -(-quantiles.astype(np.int64) // block) * block
+    else:
+        ceilings = 2 ** np.ceil(np.log2(needed)).astype(np.int64)
+    return tuple(sorted({max(int(ceiling), block) for ceiling in ceilings}))
+
+def bucket_ceiling(length, ceilings):
+    """Ukuran ciphertext kelas untuk plaintext `length` byte; di atas kelas terbesar dibulatkan ke kelipatannya"""
+    for ceiling in ceilings:
+        if length < ceiling:
+            return ceiling
+    largest = ceilings[-1]
+    return (length // largest + 1) * largest
+
+def bucket_report(lengths, ceilings):
+    """Jumlah baris per kelas dan byte ciphertext dibanding PKCS#7 dan Fixed Length"""
+    block = AES.block_size
+    lengths = np.asarray(lengths, dtype=np.int64)
+    sizes = np.array([bucket_ceiling(int(length), ceilings) for length in lengths], dtype=np.int64)
+    fixed = (np.maximum(lengths, FIXED_LENGTH_TARGET) // block + 1) * block
+    return {
+        "buckets": list(ceilings),
+        "rows_per_bucket": {int(size): int(count) for size, count in zip(*np.unique(sizes, return_counts=True))},
+        "bucket_bytes": int(sizes.sum()),
+        "pkcs7_bytes": int(((lengths // block + 1) * block).sum()),
+        "fixed_bytes": int(fixed.sum()),
+    }
+
+def prepare_plaintext_bytes(texts, padding_method):
+    """Mengubah teks menjadi bytes sesuai metode padding sebelum padding blok PKCS#7"""
+    if padding_method == PADDING_FIXED:
+        return [text.ljust(FIXED_LENGTH_TARGET, "#").encode('utf-8') for text in texts]
+    if padding_family(padding_method) == PADDING_BUCKET:
+        # Diratakan ke (batas kelas - 1) byte sehingga PKCS#7 menambah tepat 1 byte
+        ceilings = parse_buckets(padding_method)
+        rows = []
+        for text in texts:
+            data = text.encode('utf-8')
+            rows.append(data + b"#" * (bucket_ceiling(len(data), ceilings) - 1 - len(data)))
+        return rows
+    return [text.encode('utf-8') for text in texts]
+
+def row_overhead(padding_method):
+    """Byte tambahan per baris di luar plaintext untuk mode tanpa padding (nonce dan tag)"""
+    if padding_method == PADDING_CTR:
+        return CTR_NONCE_SIZE
+    if padding_method == PADDING_GCM:
+        return GCM_NONCE_SIZE + GCM_TAG_SIZE
+    return 0
+
+def _ctr_xor_rows(cipher, rows_bytes, nonces):
+    """XOR setiap baris dengan keystream CTR-nya sendiri, mengembalikan list bytes per baris
+
+    Seluruh blok counter (nonce || counter) semua baris dienkripsi dengan satu panggilan AES-ECB,
+    hasilnya identik dengan AES.new(key, MODE_CTR, nonce=nonce) per baris.
+    """
+    block = AES.block_size
+    lengths = np.fromiter(map(len, rows_bytes), dtype=np.int64, count=len(rows_bytes))
+    blocks = (lengths + block - 1) // block
+    block_starts = np.concatenate(([0], np.cumsum(blocks)))[:-1]
+    total_blocks = int(blocks.sum())
+    counters = np.arange(total_blocks, dtype=np.int64) - np.repeat(block_starts, blocks)
+    counter_blocks = np.empty((total_blocks, block), dtype=np.uint8)
+    counter_blocks[:, :CTR_NONCE_SIZE] = np.repeat(
+        np.frombuffer(nonces, dtype=np.uint8).reshape(-1, CTR_NONCE_SIZE), blocks, axis=0)
+    counter_blocks[:, CTR_NONCE_SIZE:] = counters.astype(">u8").view(np.uint8).reshape(-1, 8)
+    keystream = np.frombuffer(cipher.encrypt(counter_blocks.tobytes()), dtype=np.uint8)
+
+    # Baris diratakan ke kelipatan blok agar XOR cukup satu operasi atas seluruh buffer
+    padded = np.frombuffer(b"".join(data + bytes(-len(data) % block) for data in rows_bytes), dtype=np.uint8)
+    xored = (padded ^ keystream).tobytes()
+    return [xored[start:start + length] for start, length in zip((block_starts * block).tolist(), lengths.tolist())]
+
+def ecb_cipher(key):
+    """Objek AES-ECB (key schedule) untuk satu kunci; ECB tanpa state sehingga aman dipakai ulang"""
+    return AES.new(key.encode('utf-8'), mode=AES.MODE_ECB)
+
+def _ctr_encrypt_rows(rows_bytes, key, cipher=None):
+    """AES-CTR per baris dengan nonce acak 8 byte di depan ciphertext (tanpa padding)"""
+    nonces = os.urandom(CTR_NONCE_SIZE * len(rows_bytes))
+    cipher = cipher or ecb_cipher(key)
+    encrypted = _ctr_xor_rows(cipher, rows_bytes, nonces)
+    parts = [nonces[i * CTR_NONCE_SIZE:(i + 1) * CTR_NONCE_SIZE] + data for i, data in enumerate(encrypted)]
+    return BatchCiphertext(b"".join(parts), _offsets_from_lengths(len(p) for p in parts))
+
+def _gcm_encrypt_rows(rows_bytes, key):
+    """AES-GCM per baris: nonce acak 12 byte || ciphertext || tag 16 byte"""
+    key_bytes = key.encode('utf-8')
+    nonces = os.urandom(GCM_NONCE_SIZE * len(rows_bytes))
+    parts = []
+    for i, data in enumerate(rows_bytes):
+        nonce = nonces[i * GCM_NONCE_SIZE:(i + 1) * GCM_NONCE_SIZE]
+        ciphertext, tag = AES.new(key_bytes, mode=AES.MODE_GCM, nonce=nonce).encrypt_and_digest(data)
+        parts.append(nonce + ciphertext + tag)
+    return BatchCiphertext(b"".join(parts), _offsets_from_lengths(len(p) for p in parts))
+
+# ========== API ENKRIPSI/DEKRIPSI BATCH ==========
+
+def aes_encrypt_batch(texts, key, padding_method=PADDING_PKCS7, cipher=None):
+    """Enkripsi AES-ECB seluruh baris dengan satu objek cipher dan satu panggilan encrypt
+
+    Untuk CTR/GCM tidak ada padding; setiap baris memakai nonce acak sendiri (lihat NONCE_MODES).
+    `cipher` dapat diisi objek dari ecb_cipher(key) yang dipakai ulang (tidak berlaku untuk GCM).
+    """
+    if padding_method in NONCE_MODES:
+        rows_bytes = prepare_plaintext_bytes(texts, padding_method)
+        nbytes = sum(len(data) for data in rows_bytes)
+        with span("encrypt", rows=len(texts), nbytes=nbytes, mode=padding_method):
+            if padding_method == PADDING_CTR:
+                return _ctr_encrypt_rows(rows_bytes, key, cipher)
+            return _gcm_encrypt_rows(rows_bytes, key)
+    with span("pad", rows=len(texts)) as current:
+        buffer, offsets = _pkcs7_pad_rows(prepare_plaintext_bytes(texts, padding_method))
+        current.set(nbytes=len(buffer))
+    with span("encrypt", rows=len(texts), nbytes=len(buffer)):
+        cipher = cipher or ecb_cipher(key)
+        return BatchCiphertext(cipher.encrypt(buffer), offsets)
+
+def padded_plaintext_buffer(texts, padding_method=PADDING_PKCS7):
+    """Buffer plaintext setelah padding, persis input AES-ECB pada aes_encrypt_batch (bukan untuk CTR/GCM)"""
+    return _pkcs7_pad_rows(prepare_plaintext_bytes(texts, padding_method))[0]
+
+def aes_encrypt_raw(buffer, key):
+    """Enkripsi AES-ECB langsung atas buffer yang sudah kelipatan 16 byte (tanpa padding)"""
+    cipher = AES.new(key.encode('utf-8'), mode=AES.MODE_ECB)
+    return cipher.encrypt(buffer)
+
+def aes_decrypt_batch(ciphertexts, key, padding_method=PADDING_PKCS7, on_error=None, cipher=None):
+    """Dekripsi AES-ECB seluruh baris sekaligus, menerima BatchCiphertext atau daftar hex"""
+    invalid = {}
+    if not isinstance(ciphertexts, BatchCiphertext):
+        ciphertexts, invalid = BatchCiphertext.from_hex_rows(ciphertexts)
+
+    if padding_method in NONCE_MODES:
+        return _decrypt_nonce_rows(ciphertexts, key, padding_method, invalid, on_error, cipher)
+    error_label, error_value = ERROR_LABELS[padding_family(padding_method)]
+    strip_hash = padding_family(padding_method) in HASH_PADDED
+
+    offsets = ciphertexts.offsets
+    block = AES.block_size
+    aligned = all((offsets[i + 1] - offsets[i]) % block == 0 for i in range(len(offsets) - 1))
+    with span("decrypt", rows=len(ciphertexts), nbytes=len(ciphertexts.buffer)):
+        cipher = cipher or ecb_cipher(key)
+        plain_buffer = cipher.decrypt(ciphertexts.buffer) if aligned else None
+
+    results = []
+    with span("unpad", rows=len(ciphertexts), nbytes=len(ciphertexts.buffer)):
+        for i in range(len(offsets) - 1):
+            try:
+                if i in invalid:
+                    raise binascii.Error(invalid[i])
+                if plain_buffer is not None:
+                    padded = plain_buffer[offsets[i]:offsets[i + 1]]
+                else:
+                    padded = cipher.decrypt(ciphertexts.row(i))
+                decrypted = unpad(padded, AES.block_size).decode('utf-8')
+                if strip_hash:
+                    decrypted = decrypted.rstrip("#")
+                results.append(decrypted)
+            except (ValueError, UnicodeDecodeError, binascii.Error) as e:
+                if on_error is not None:
+                    on_error(f"Error dalam dekripsi {error_label}: {str(e)}")
+                results.append(error_value)
+    return results
+
+def _decrypt_nonce_rows(ciphertexts, key, padding_method, invalid, on_error, cipher=None):
+    """Dekripsi CTR (keystream batch) atau GCM (verifikasi tag per baris)"""
+    error_label, error_value = ERROR_LABELS[padding_method]
+    offsets = [int(offset) for offset in ciphertexts.offsets]
+    overhead = row_overhead(padding_method)
+    row_count = len(offsets) - 1
+    plaintexts = [None] * row_count
+
+    with span("decrypt", rows=row_count, nbytes=len(ciphertexts.buffer), mode=padding_method):
+        valid = [i for i in range(row_count) if i not in invalid and offsets[i + 1] - offsets[i] >= overhead]
+        for i in range(row_count):
+            if i not in invalid and offsets[i + 1] - offsets[i] < overhead:
+                invalid[i] = "Ciphertext lebih pendek dari nonce/tag"
+        buffer = ciphertexts.buffer
+        if padding_method == PADDING_CTR and valid:
+            nonces = b"".join(buffer[offsets[i]:offsets[i] + CTR_NONCE_SIZE] for i in valid)
+            bodies = [buffer[offsets[i] + CTR_NONCE_SIZE:offsets[i + 1]] for i in valid]
+            cipher = cipher or ecb_cipher(key)
+            for i, plaintext in zip(valid, _ctr_xor_rows(cipher, bodies, nonces)):
+                plaintexts[i] = plaintext
+        elif padding_method == PADDING_GCM:
+            key_bytes = key.encode('utf-8')
+            for i in valid:
+                row = buffer[offsets[i]:offsets[i + 1]]
+                nonce, body, tag = row[:GCM_NONCE_SIZE], row[GCM_NONCE_SIZE:-GCM_TAG_SIZE], row[-GCM_TAG_SIZE:]
+                try:
+                    plaintexts[i] = AES.new(key_bytes, mode=AES.MODE_GCM, nonce=nonce).decrypt_and_verify(body, tag)
+                except ValueError as e:
+                    invalid[i] = str(e)
+
+    results = []
+    with span("unpad", rows=row_count):
+        for i in range(row_count):
+            try:
+                if i in invalid:
+                    raise binascii.Error(invalid[i])
+                results.append(plaintexts[i].decode('utf-8'))
+            except (ValueError, UnicodeDecodeError, binascii.Error) as e:
+                if on_error is not None:
+                    on_error(f"Error dalam dekripsi {error_label}: {str(e)}")
+                results.append(error_value)
+    return results
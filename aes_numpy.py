@@ -0,0 +1,173 @@
+import time
+import numpy as np
+from Crypto.Cipher import AES
+from tracing import span
+
+# ========== TABEL GF(2^8) DAN S-BOX ==========
+# Semua tabel dihitung sekali saat modul diimpor. State satu blok disimpan sebagai 16 byte dengan
+# urutan kolom (byte ke-i = baris i % 4, kolom i // 4), sama seperti urutan byte input AES.
+
+BLOCK_SIZE = 16
+ROUNDS = 10
+RCON = np.array([0x01, 0x02, 0x04, 0x08, 0x10, 0x20, 0x40, 0x80, 0x1B, 0x36], dtype=np.uint8)
+
+def _exp_log_tables():
+    """Tabel pangkat dan logaritma GF(2^8) dengan generator 3 (polinomial x^8 + x^4 + x^3 + x + 1)"""
+    exp = np.zeros(510, dtype=np.int64)
+    log = np.zeros(256, dtype=np.int64)
+    value = 1
+    for i in range(255):
+        exp[i] = exp[i + 255] = value
+        log[value] = i
+        doubled = (value << 1) ^ (0x11B if value & 0x80 else 0)
+        value ^= doubled
+    return exp, log
+
+_EXP, _LOG = _exp_log_tables()
+
+def _gf_multiply_table():
+    """GF_MUL[a, b] = a * b di GF(2^8)"""
+    a, b = np.meshgrid(np.arange(256), np.arange(256), indexing="ij")
+    product = _EXP[_LOG[a] + _LOG[b]]
+    return np.where((a == 0) | (b == 0), 0, product).astype(np.uint8)
+
+def _sbox():
+    """S-box AES: invers perkalian di GF(2^8) lalu transformasi affine"""
+    values = np.arange(256)
+    inverse = np.where(values == 0, 0, _EXP[(255 - _LOG[values]) % 255]).astype(np.uint8)
+    result = inverse.copy()
+    for shift in range(1, 5):
+        result ^= (inverse << shift) | (inverse >> (8 - shift))
+    return result ^ np.uint8(0x63)
+
+GF_MUL = _gf_multiply_table()
+SBOX = _sbox()
+INV_SBOX = np.argsort(SBOX).astype(np.uint8)
+
+# ShiftRows: baris r digeser ke kiri r posisi
+SHIFT_ROWS = np.array([row + 4 * ((col + row) % 4) for col in range(4) for row in range(4)])
+INV_SHIFT_ROWS = np.argsort(SHIFT_ROWS)
+# MixColumns: byte baris (r + k) % 4 pada kolom yang sama, untuk k = 0..3
+COLUMN_ROTATIONS = [np.array([4 * col + (row + k) % 4 for col in range(4) for row in range(4)]) for k in range(4)]
+
+# ========== TAHAP-TAHAP AES (N BLOK SEKALIGUS) ==========
+
+def sub_bytes(state):
+    """Substitusi setiap byte lewat S-box"""
+    return np.take(SBOX, state)
+
+def inv_sub_bytes(state):
+    return np.take(INV_SBOX, state)
+
+def shift_rows(state):
+    """Pergeseran siklis baris ke-r sebanyak r byte ke kiri"""
+    return np.take(state, SHIFT_ROWS, axis=1)
+
+def inv_shift_rows(state):
+    return np.take(state, INV_SHIFT_ROWS, axis=1)
+
+def _mix(state, coefficients):
+    """Perkalian setiap kolom dengan matriks sirkulan `coefficients` di GF(2^8)"""
+    result = np.zeros_like(state)
+    for rotation, coefficient in zip(COLUMN_ROTATIONS, coefficients):
+        rotated = np.take(state, rotation, axis=1)
+        result ^= rotated if coefficient == 1 else np.take(GF_MUL[coefficient], rotated)
+    return result
+
+def mix_columns(state):
+    """Setiap kolom dikalikan matriks [02 03 01 01] (sirkulan) di GF(2^8)"""
+    return _mix(state, (2, 3, 1, 1))
+
+def inv_mix_columns(state):
+    return _mix(state, (14, 11, 13, 9))
+
+def add_round_key(state, round_key):
+    return state ^ round_key
+
+def expand_key(key):
+    """Key schedule AES-128: 11 round key berbentuk array (11, 16) uint8"""
+    key_bytes = key.encode("utf-8") if isinstance(key, str) else bytes(key)
+    if len(key_bytes) != BLOCK_SIZE:
+        raise ValueError(f"Kunci AES-128 harus 16 byte, bukan {len(key_bytes)}")
+    words = list(np.frombuffer(key_bytes, dtype=np.uint8).reshape(4, 4))
+    for i in range(4, 4 * (ROUNDS + 1)):
+        temp = words[i - 1]
+        if i % 4 == 0:
+            temp = SBOX[np.roll(temp, -1)]
+            temp[0] ^= RCON[i // 4 - 1]
+        words.append(words[i - 4] ^ temp)
+    return np.concatenate(words).reshape(ROUNDS + 1, BLOCK_SIZE)
+
+# ========== ENKRIPSI/DEKRIPSI BLOK ==========
+
+def encrypt_blocks(blocks, round_keys):
+    """Enkripsi AES-128 untuk array (N, 16) uint8 sekaligus"""
+    state = add_round_key(blocks, round_keys[0])
+    for round_number in range(1, ROUNDS):
+        state = add_round_key(mix_columns(shift_rows(sub_bytes(state))), round_keys[round_number])
+    return add_round_key(shift_rows(sub_bytes(state)), round_keys[ROUNDS])
+
+def decrypt_blocks(blocks, round_keys):
+    """Dekripsi AES-128 untuk array (N, 16) uint8 sekaligus"""
+    state = add_round_key(blocks, round_keys[ROUNDS])
+    for round_number in range(ROUNDS - 1, 0, -1):
+        state = inv_mix_columns(add_round_key(inv_sub_bytes(inv_shift_rows(state)), round_keys[round_number]))
+    return add_round_key(inv_sub_bytes(inv_shift_rows(state)), round_keys[0])
+
+def _as_blocks(buffer):
+    if len(buffer) % BLOCK_SIZE:
+        raise ValueError("Panjang data harus kelipatan 16 byte")
+    return np.frombuffer(buffer, dtype=np.uint8).reshape(-1, BLOCK_SIZE)
+
+def encrypt_ecb(buffer, key):
+    """AES-128-ECB atas buffer kelipatan 16 byte (setara aes_encrypt_raw, tanpa pycryptodome)"""
+    with span("encrypt_numpy", nbytes=len(buffer)):
+        return encrypt_blocks(_as_blocks(buffer), expand_key(key)).tobytes()
+
+def decrypt_ecb(buffer, key):
+    """Kebalikan encrypt_ecb"""
+    with span("decrypt_numpy", nbytes=len(buffer)):
+        return decrypt_blocks(_as_blocks(buffer), expand_key(key)).tobytes()
+
+# ========== JEJAK PER RONDE ==========
+
+def trace_encrypt_block(block, key):
+    """State setelah setiap tahap untuk satu blok: list (ronde, tahap, state 16 byte)"""
+    round_keys = expand_key(key)
+    state = _as_blocks(bytes(block))[:1]
+    steps = [(0, "Input", state)]
+    state = add_round_key(state, round_keys[0])
+    steps.append((0, "AddRoundKey", state))
+    for round_number in range(1, ROUNDS + 1):
+        state = sub_bytes(state)
+        steps.append((round_number, "SubBytes", state))
+        state = shift_rows(state)
+        steps.append((round_number, "ShiftRows", state))
+        if round_number < ROUNDS:
+            state = mix_columns(state)
+            steps.append((round_number, "MixColumns", state))
+        state = add_round_key(state, round_keys[round_number])
+        steps.append((round_number, "AddRoundKey", state))
+    return [(round_number, step, values[0]) for round_number, step, values in steps]
+
+# ========== CEK SILANG ==========
+
+def cross_check(buffer, key):
+    """Membandingkan mesin NumPy dengan pycryptodome atas buffer yang sama (enkripsi dan dekripsi)"""
+    cipher = AES.new(key.encode("utf-8") if isinstance(key, str) else bytes(key), AES.MODE_ECB)
+    start = time.perf_counter()
+    expected = cipher.encrypt(buffer)
+    reference_s = time.perf_counter() - start
+    start = time.perf_counter()
+    encrypted = encrypt_ecb(buffer, key)
+    numpy_s = time.perf_counter() - start
+    decrypted = decrypt_ecb(expected, key)
+    mismatched = np.any(_as_blocks(encrypted) != _as_blocks(expected), axis=1)
+    return {
+        "blocks": len(buffer) // BLOCK_SIZE,
+        "encrypt_match": not mismatched.any(),
+        "mismatched_blocks": int(mismatched.sum()),
+        "decrypt_match": decrypted == buffer,
+        "pycryptodome_s": reference_s,
+        "numpy_s": numpy_s,
+    }
@@ -0,0 +1,309 @@
+import numpy as np
+from aes_batch import BatchCiphertext, aes_encrypt_raw, prepare_plaintext_bytes, PADDING_PKCS7
+from pipeline import reverse_cipher
+
+# ========== KONSTANTA ==========
+MODE_ADJACENT = "Pasangan Berdekatan"
+MODE_ALL_PAIRS = "Semua Pasangan (Blok)"
+MODE_SAMPLED = "Sampel Acak K Pasangan"
+AVALANCHE_MODES = (MODE_ADJACENT, MODE_ALL_PAIRS, MODE_SAMPLED)
+
+DEFAULT_MEMORY_CAP = 64 * 1024 * 1024  # byte untuk satu blok XOR pada mode semua pasangan
+DEFAULT_SAMPLE_PAIRS = 10000
+DEFAULT_SAC_INPUT_BYTES = 16
+SAC_CHUNK_PLAINTEXTS = 256
+HISTOGRAM_BINS = np.linspace(0, 100, 201)  # resolusi 0.5%
+
+# Tabel popcount: jumlah bit 1 untuk setiap nilai byte 0..255
+POPCOUNT_TABLE = np.array([bin(i).count("1") for i in range(256)], dtype=np.uint8)
+
+# ========== KONVERSI CIPHERTEXT ==========
+
+def hex_to_bytes(hex_text):
+    """Mengubah string heksadesimal (boleh panjang ganjil) menjadi bytes"""
+    hex_text = hex_text.strip()
+    if len(hex_text) % 2:
+        hex_text = "0" + hex_text
+    return bytes.fromhex(hex_text)
+
+def hex_to_bits(hex_text):
+    """Mengubah string heksadesimal menjadi array bit sepanjang len(hex) * 4"""
+    bits = np.unpackbits(np.frombuffer(hex_to_bytes(hex_text), dtype=np.uint8))
+    return bits[len(bits) - len(hex_text.strip()) * 4:]
+
+def ciphertexts_to_matrix(ciphertexts):
+    """Menyusun ciphertext (BatchCiphertext, bytes atau hex) menjadi matriks uint8 (N, L)
+
+    Baris yang lebih pendek diratakan kanan dengan nol di depan, sama seperti zfill pada
+    perhitungan bit difference berbasis integer. Mengembalikan (matriks, panjang byte per baris).
+    """
+    if isinstance(ciphertexts, BatchCiphertext):
+        buffer = np.frombuffer(ciphertexts.buffer, dtype=np.uint8)
+        offsets = np.asarray(ciphertexts.offsets, dtype=np.int64)
+    else:
+        rows = [hex_to_bytes(c) if isinstance(c, str) else bytes(c) for c in ciphertexts]
+        buffer = np.frombuffer(b"".join(rows), dtype=np.uint8)
+        offsets = np.concatenate(([0], np.cumsum([len(r) for r in rows], dtype=np.int64)))
+
+    lengths = np.diff(offsets)
+    count = len(lengths)
+    width = int(lengths.max()) if count else 0
+    if count and (lengths == width).all():
+        return buffer[:count * width].reshape(count, width), lengths
+
+    matrix = np.zeros((count, width), dtype=np.uint8)
+    row_ids = np.repeat(np.arange(count), lengths)
+    within_row = np.arange(len(buffer)) - np.repeat(offsets[:-1], lengths)
+    matrix.reshape(-1)[row_ids * width + (width - lengths[row_ids]) + within_row] = buffer
+    return matrix, lengths
+
+def bit_difference_rows(left, right):
+    """Jumlah bit berbeda per baris antara dua matriks uint8 berukuran sama (XOR + popcount)"""
+    return POPCOUNT_TABLE[np.bitwise_xor(left, right)].sum(axis=-1, dtype=np.int64)
+
+def bit_difference(hex1, hex2):
+    """Jumlah bit berbeda antara dua ciphertext heksadesimal"""
+    bits1, bits2 = hex_to_bits(hex1), hex_to_bits(hex2)
+    width = max(len(bits1), len(bits2))
+    bits1 = np.pad(bits1, (width - len(bits1), 0))
+    bits2 = np.pad(bits2, (width - len(bits2), 0))
+    return int(np.count_nonzero(bits1 != bits2))
+
+# ========== RINGKASAN DISTRIBUSI ==========
+
+def _percent(diff_bits, total_bits):
+    total_bits = np.asarray(total_bits, dtype=np.float64)
+    return np.divide(diff_bits, total_bits, out=np.zeros_like(total_bits), where=total_bits > 0) * 100
+
+def summarize_percentages(percentages):
+    """Ringkasan distribusi persentase avalanche (rata-rata, simpangan, persentil)"""
+    if len(percentages) == 0:
+        return {"pairs": 0, "mean": 0.0, "std": 0.0, "min": 0.0, "p5": 0.0,
+                "median": 0.0, "p95": 0.0, "max": 0.0}
+    p5, median, p95 = np.percentile(percentages, [5, 50, 95])
+    return {
+        "pairs": int(len(percentages)),
+        "mean": float(np.mean(percentages)),
+        "std": float(np.std(percentages)),
+        "min": float(np.min(percentages)),
+        "p5": float(p5),
+        "median": float(median),
+        "p95": float(p95),
+        "max": float(np.max(percentages)),
+    }
+
+def _summary_from_histogram(counts, total, total_sq, minimum, maximum):
+    """Ringkasan dari histogram (persentil diperkirakan dari tepi bin)"""
+    pairs = int(counts.sum())
+    if pairs == 0:
+        return summarize_percentages([])
+    mean = total / pairs
+    cumulative = np.cumsum(counts)
+
+    midpoints = (HISTOGRAM_BINS[:-1] + HISTOGRAM_BINS[1:]) / 2
+
+    def quantile(q):
+        return float(midpoints[np.searchsorted(cumulative, q * pairs)])
+
+    return {
+        "pairs": pairs,
+        "mean": float(mean),
+        "std": float(np.sqrt(max(total_sq / pairs - mean ** 2, 0.0))),
+        "min": float(minimum),
+        "p5": quantile(0.05),
+        "median": quantile(0.5),
+        "p95": quantile(0.95),
+        "max": float(maximum),
+    }
+
+# ========== MODE AVALANCHE ==========
+
+def avalanche_adjacent(ciphertexts):
+    """Avalanche antar baris berdekatan (i, i+1), semantik sama dengan perhitungan lama"""
+    matrix, lengths = ciphertexts_to_matrix(ciphertexts)
+    if len(lengths) < 2:
+        pairs = np.empty((0, 2), dtype=np.int64)
+        percentages = np.empty(0)
+    else:
+        diff = bit_difference_rows(matrix[:-1], matrix[1:])
+        percentages = _percent(diff, lengths[:-1] * 8)
+        pairs = np.column_stack((np.arange(len(lengths) - 1), np.arange(1, len(lengths))))
+    return {
+        "mode": MODE_ADJACENT,
+        "pairs": pairs,
+        "percentages": percentages,
+        "summary": summarize_percentages(percentages),
+        "histogram": np.histogram(percentages, bins=HISTOGRAM_BINS)[0],
+    }
+
+def avalanche_all_pairs(ciphertexts, memory_cap=DEFAULT_MEMORY_CAP):
+    """Avalanche untuk semua pasangan i < j, dihitung per blok agar XOR tidak melebihi memory_cap
+
+    Berbeda dengan mode berdekatan, penyebut persentase adalah panjang ciphertext terpanjang
+    dari pasangan sehingga nilai selalu berada pada rentang 0-100%.
+    """
+    matrix, lengths = ciphertexts_to_matrix(ciphertexts)
+    count, width = matrix.shape
+    # Hasil XOR dan hasil lookup popcount masing-masing berukuran block * block * width byte
+    block = max(1, int(np.sqrt(memory_cap / (2 * max(width, 1)))))
+
+    counts = np.zeros(len(HISTOGRAM_BINS) - 1, dtype=np.int64)
+    total = total_sq = 0.0
+    minimum, maximum = np.inf, -np.inf
+    for start_i in range(0, count, block):
+        left = matrix[start_i:start_i + block]
+        left_lengths = lengths[start_i:start_i + block]
+        for start_j in range(start_i, count, block):
+            right = matrix[start_j:start_j + block]
+            diff = bit_difference_rows(left[:, None, :], right[None, :, :])
+            percent = _percent(diff, np.maximum(left_lengths[:, None], lengths[None, start_j:start_j + block]) * 8)
+            ii = np.arange(start_i, start_i + len(left))[:, None]
+            jj = np.arange(start_j, start_j + len(right))[None, :]
+            percent = percent[ii < jj]
+            if len(percent) == 0:
+                continue
+            counts += np.histogram(percent, bins=HISTOGRAM_BINS)[0]
+            total += float(percent.sum())
+            total_sq += float(np.square(percent).sum())
+            minimum = min(minimum, float(percent.min()))
+            maximum = max(maximum, float(percent.max()))
+
+    return {
+        "mode": MODE_ALL_PAIRS,
+        "pairs": None,
+        "percentages": None,
+        "summary": _summary_from_histogram(counts, total, total_sq, minimum, maximum),
+        "histogram": counts,
+    }
+
+def avalanche_sampled(ciphertexts, sample_pairs=DEFAULT_SAMPLE_PAIRS, seed=None):
+    """Avalanche untuk K pasangan acak (i != j), penyebut seperti pada mode semua pasangan"""
+    matrix, lengths = ciphertexts_to_matrix(ciphertexts)
+    count = len(lengths)
+    if count < 2:
+        return avalanche_adjacent(ciphertexts) | {"mode": MODE_SAMPLED}
+    rng = np.random.default_rng(seed)
+    left = rng.integers(0, count, size=sample_pairs)
+    right = (left + rng.integers(1, count, size=sample_pairs)) % count
+    diff = bit_difference_rows(matrix[left], matrix[right])
+    percentages = _percent(diff, np.maximum(lengths[left], lengths[right]) * 8)
+    return {
+        "mode": MODE_SAMPLED,
+        "pairs": np.column_stack((left, right)),
+        "percentages": percentages,
+        "summary": summarize_percentages(percentages),
+        "histogram": np.histogram(percentages, bins=HISTOGRAM_BINS)[0],
+    }
+
+def run_avalanche(ciphertexts, mode=MODE_ADJACENT, memory_cap=DEFAULT_MEMORY_CAP,
+                  sample_pairs=DEFAULT_SAMPLE_PAIRS, seed=None):
+    """Menjalankan mesin avalanche sesuai mode yang dipilih"""
+    if mode == MODE_ALL_PAIRS:
+        return avalanche_all_pairs(ciphertexts, memory_cap)
+    if mode == MODE_SAMPLED:
+        return avalanche_sampled(ciphertexts, sample_pairs, seed)
+    return avalanche_adjacent(ciphertexts)
+
+# ========== STRICT AVALANCHE CRITERION (SAC) & BIT INDEPENDENCE (BIC) ==========
+
+def prepare_sac_messages(texts, input_bytes=DEFAULT_SAC_INPUT_BYTES, padding_method=PADDING_PKCS7):
+    """Menyiapkan input AES (setelah Reverse Cipher dan padding teks) sepanjang tepat input_bytes
+
+    Teks yang lebih panjang dipotong dan yang lebih pendek ditambah '#', sehingga indeks bit
+    input sama untuk semua plaintext. Mengembalikan matriks uint8 (P, input_bytes).
+    """
+    reversed_texts = [reverse_cipher(text) for text in texts]
+    messages = [data[:input_bytes].ljust(input_bytes, b"#")
+                for data in prepare_plaintext_bytes(reversed_texts, padding_method)]
+    return np.frombuffer(b"".join(messages), dtype=np.uint8).reshape(len(messages), input_bytes)
+
+def single_bit_flip_masks(input_bytes):
+    """Mask XOR (input_bytes * 8, input_bytes) untuk membalik tepat satu bit (MSB lebih dulu)"""
+    bit_count = input_bytes * 8
+    masks = np.zeros((bit_count, input_bytes), dtype=np.uint8)
+    bits = np.arange(bit_count)
+    masks[bits, bits // 8] = np.left_shift(1, 7 - bits % 8).astype(np.uint8)
+    return masks
+
+def encrypt_equal_length(messages, key):
+    """Enkripsi batch pesan berpanjang sama (N, L) dengan PKCS#7 dalam satu panggilan AES-ECB"""
+    count, length = messages.shape
+    pad_len = 16 - length % 16
+    padded = np.empty((count, length + pad_len), dtype=np.uint8)
+    padded[:, :length] = messages
+    padded[:, length:] = pad_len
+    encrypted = aes_encrypt_raw(padded.tobytes(), key)
+    return np.frombuffer(encrypted, dtype=np.uint8).reshape(count, length + pad_len)
+
+def strict_avalanche_test(texts, key, input_bytes=DEFAULT_SAC_INPUT_BYTES, padding_method=PADDING_PKCS7,
+                          chunk_plaintexts=SAC_CHUNK_PLAINTEXTS):
+    """Uji SAC/BIC: semua varian balik-satu-bit dienkripsi batch, lalu dihitung matriks peluang flip
+
+    Matriks berukuran (bit input x bit output) berisi peluang bit output berubah saat bit input
+    dibalik; nilai ideal 0.5. BIC diukur dari korelasi perubahan antar pasangan bit output
+    di dalam blok AES yang sama (pada mode ECB blok lain tidak pernah ikut berubah).
+    """
+    messages = prepare_sac_messages(texts, input_bytes, padding_method)
+    # Plaintext identik tidak menambah informasi, cukup diuji sekali
+    messages = np.unique(messages, axis=0) if len(messages) else messages
+    masks = single_bit_flip_masks(input_bytes)
+    input_bits = input_bytes * 8
+    output_bits = (input_bytes + 16 - input_bytes % 16) * 8
+    block_count = (input_bits + 127) // 128
+
+    flip_counts = np.zeros((input_bits, output_bits), dtype=np.int64)
+    # Statistik BIC per blok AES: hanya bit input dan output pada blok yang sama
+    flip_sums = np.zeros((block_count, 128), dtype=np.float64)
+    flip_cross = np.zeros((block_count, 128, 128), dtype=np.float64)
+    block_samples = np.zeros(block_count, dtype=np.int64)
+    for start in range(0, len(messages), chunk_plaintexts):
+        base = messages[start:start + chunk_plaintexts]
+        variants = (base[:, None, :] ^ masks[None, :, :]).reshape(-1, input_bytes)
+        base_cipher = encrypt_equal_length(base, key)
+        variant_cipher = encrypt_equal_length(variants, key).reshape(len(base), input_bits, -1)
+        flips = np.unpackbits(base_cipher[:, None, :] ^ variant_cipher, axis=-1)
+        flip_counts += flips.sum(axis=0, dtype=np.int64)
+        for block in range(block_count):
+            in_bits = slice(block * 128, min((block + 1) * 128, input_bits))
+            samples = flips[:, in_bits, block * 128:(block + 1) * 128].reshape(-1, 128).astype(np.float64)
+            flip_sums[block] += samples.sum(axis=0)
+            flip_cross[block] += samples.T @ samples
+            block_samples[block] += len(samples)
+
+    plaintext_count = len(messages)
+    matrix = flip_counts / max(plaintext_count, 1)
+
+    # Blok output yang dapat dipengaruhi bit input (AES-ECB: hanya blok yang sama)
+    same_block = (np.arange(input_bits)[:, None] // 128) == (np.arange(output_bits)[None, :] // 128)
+    deviation = np.abs(matrix[same_block] - 0.5)
+    cross_block = matrix[~same_block]
+
+    correlations = []
+    for block in range(block_count):
+        if block_samples[block] == 0:
+            continue
+        mean = flip_sums[block] / block_samples[block]
+        covariance = flip_cross[block] / block_samples[block] - np.outer(mean, mean)
+        std = np.sqrt(np.clip(np.diag(covariance), 0, None))
+        reachable = np.flatnonzero(std > 0)
+        correlation = covariance[np.ix_(reachable, reachable)] / np.outer(std[reachable], std[reachable])
+        correlations.append(np.abs(correlation[~np.eye(len(reachable), dtype=bool)]))
+    off_diagonal = np.concatenate(correlations) if correlations else np.empty(0)
+
+    return {
+        "matrix": matrix,
+        "plaintexts": plaintext_count,
+        "variants": plaintext_count * input_bits,
+        "input_bits": input_bits,
+        "output_bits": output_bits,
+        "sac": {
+            "mean_flip_probability": float(matrix[same_block].mean()) if plaintext_count else 0.0,
+            "mean_deviation": float(deviation.mean()) if plaintext_count else 0.0,
+            "max_deviation": float(deviation.max()) if plaintext_count else 0.0,
+            "cross_block_mean": float(cross_block.mean()) if len(cross_block) else 0.0,
+        },
+        "bic": {
+            "max_abs_correlation": float(off_diagonal.max()) if len(off_diagonal) else 0.0,
+            "mean_abs_correlation": float(off_diagonal.mean()) if len(off_diagonal) else 0.0,
+        },
+    }
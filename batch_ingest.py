@@ -0,0 +1,375 @@
+import io
+import os
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+import openpyxl
+import pandas as pd
+from aes_batch import PADDING_PKCS7
+from pipeline import (TARGET_COLUMNS, DEFAULT_CHUNK_SIZE, iter_row_chunks, round_trip, stream_pipeline,
+                      _cell_to_text)
+from jobs import STATE_QUEUED, STATE_RUNNING, STATE_DONE, STATE_FAILED, STATE_CANCELLED
+from tracing import submit_traced
+
+# ========== KONSTANTA ==========
+# Parsing openpyxl adalah Python murni (memegang GIL): thread melebihi jumlah CPU tidak menambah kecepatan
+DEFAULT_IO_WORKERS = min(4, os.cpu_count() or 1)
+DEFAULT_QUEUE_CHUNKS = 8
+BATCH_EXTENSIONS = (".xlsx", ".csv")
+SOURCE_FILE_COLUMN = "File"
+SOURCE_SHEET_COLUMN = "Sheet"
+_PUT_TIMEOUT_S = 0.1
+# Jenis pesan di antrean: (jenis, nomor sheet atau label file, isi)
+_CHUNK = "chunk"
+_SHEET_DONE = "sheet_done"
+_SHEET_FAILED = "sheet_failed"
+_FILE_SCANNED = "file_scanned"
+_FILE_FAILED = "file_failed"
+
+# ========== SUMBER BATCH ==========
+
+def source_name(source):
+    """Nama file dari path atau objek file unggahan"""
+    if isinstance(source, str):
+        return os.path.basename(source)
+    return getattr(source, "name", "") or "tanpa-nama"
+
+def expand_sources(paths):
+    """Path file dan folder menjadi daftar file .xlsx/.csv (isi folder diurutkan menurut nama)"""
+    files = []
+    for path in paths:
+        if os.path.isdir(path):
+            files.extend(os.path.join(path, name) for name in sorted(os.listdir(path))
+                         if os.path.splitext(name)[1].lower() in BATCH_EXTENSIONS and not name.startswith("~$"))
+        else:
+            files.append(path)
+    return files
+
+def source_labels(sources):
+    """Label unik per sumber untuk laporan: path lengkap untuk file di disk, nama file untuk unggahan
+
+    Unggahan dengan nama sama diberi akhiran (2), (3), ... agar baris dan error tidak tergabung.
+    """
+    labels = []
+    seen = {}
+    for source in sources:
+        label = source if isinstance(source, str) else source_name(source)
+        seen[label] = seen.get(label, 0) + 1
+        labels.append(label if seen[label] == 1 else f"{label} ({seen[label]})")
+    return labels
+
+def _source_size(source):
+    if isinstance(source, str):
+        return os.path.getsize(source)
+    return len(source.getbuffer()) if hasattr(source, "getbuffer") else len(source.getvalue())
+
+def _open(source):
+    """Sumber baru per tugas: path dibuka openpyxl/pandas langsung dari disk (tidak dimuat ke memori),
+    objek unggahan dibungkus BytesIO baru karena posisi baca tidak boleh dipakai bersama antar thread"""
+    if isinstance(source, str):
+        return source
+    copy = io.BytesIO(source.getvalue())
+    copy.name = source_name(source)
+    return copy
+
+def find_target_sheets(source, columns=TARGET_COLUMNS):
+    """Memindai header setiap sheet: (sheet berisi semua kolom target, sheet yang dilewati)
+
+    Sheet berisi kolom target berupa list (nama sheet, perkiraan jumlah baris data); .csv dianggap satu
+    sheet tanpa nama. Sheet yang dilewati berupa list (nama sheet, kolom target yang tidak ada).
+    """
+    if os.path.splitext(source_name(source))[1].lower() == ".csv":
+        header = pd.read_csv(_open(source), nrows=0, dtype=str).columns.tolist()
+        missing = [col for col in columns if col not in header]
+        return ([], [(None, missing)]) if missing else ([(None, None)], [])
+    targets, skipped = [], []
+    workbook = openpyxl.load_workbook(_open(source), read_only=True, data_only=True)
+    try:
+        for worksheet in workbook.worksheets:
+            first = next(worksheet.iter_rows(max_row=1, values_only=True), ())
+            header = [_cell_to_text(value) for value in first]
+            missing = [col for col in columns if col not in header]
+            if missing:
+                skipped.append((worksheet.title, missing))
+            else:
+                # max_row diambil dari tag dimensi sheet, hanya perkiraan (bisa None atau memuat baris kosong)
+                estimate = worksheet.max_row - 1 if worksheet.max_row else None
+                targets.append((worksheet.title, estimate))
+    finally:
+        workbook.close()
+    return targets, skipped
+
+# ========== LAPORAN PER FILE/SHEET ==========
+
+class IngestReport:
+    """Progres dan waktu per file/sheet serta throughput gabungan; aman dibaca UI selama batch berjalan
+
+    Waktu per sheet: `parse_s` (openpyxl/pandas di thread I/O), `wait_s` (thread I/O tertahan karena antrean
+    penuh, tanda enkripsi lebih lambat dari parsing) dan `encrypt_s` (gabung + round-trip AES di konsumen).
+    """
+
+    def __init__(self):
+        self.files = {}
+        self.sheets = []
+        self.skipped = []
+        self.started = None
+        self.finished = None
+        self._lock = threading.Lock()
+
+    def add_file(self, label):
+        """Mendaftarkan satu file (label dari source_labels) sebelum dipindai"""
+        with self._lock:
+            self.files[label] = {"bytes": 0, "scan_s": 0.0, "error": None}
+
+    def add_sheet(self, file, sheet, estimated_rows):
+        """Mendaftarkan satu sheet target, mengembalikan nomor sheet di laporan"""
+        with self._lock:
+            self.sheets.append({
+                "file": file, "sheet": sheet, "state": STATE_QUEUED, "estimated_rows": estimated_rows,
+                "rows_read": 0, "rows_done": 0, "chunks": 0, "parse_s": 0.0, "wait_s": 0.0, "encrypt_s": 0.0,
+                "error": None,
+            })
+            return len(self.sheets) - 1
+
+    def add(self, sheet_id, **values):
+        """Menambahkan nilai (jumlah baris/waktu) ke entri sheet"""
+        with self._lock:
+            entry = self.sheets[sheet_id]
+            for name, value in values.items():
+                entry[name] += value
+
+    def set_state(self, sheet_id, state, error=None):
+        with self._lock:
+            entry = self.sheets[sheet_id]
+            if entry["state"] in (STATE_FAILED, STATE_DONE):
+                return
+            entry["state"] = state
+            if error is not None:
+                entry["error"] = error
+
+    def estimated_rows(self, max_rows=None):
+        """Perkiraan total baris dari tag dimensi sheet (dibatasi max_rows per sheet), 0 bila belum diketahui"""
+        total = 0
+        with self._lock:
+            for entry in self.sheets:
+                estimate = entry["estimated_rows"]
+                if estimate is None or entry["state"] == STATE_DONE:
+                    estimate = entry["rows_read"]
+                total += estimate if max_rows is None else min(estimate, max_rows)
+        return total
+
+    @property
+    def rows(self):
+        return sum(entry["rows_done"] for entry in self.sheets)
+
+    @property
+    def total_bytes(self):
+        return sum(entry["bytes"] for entry in self.files.values())
+
+    @property
+    def elapsed(self):
+        if self.started is None:
+            return 0.0
+        return (self.finished or time.perf_counter()) - self.started
+
+    @property
+    def rows_per_s(self):
+        elapsed = self.elapsed
+        return self.rows / elapsed if elapsed > 0 else 0.0
+
+    @property
+    def mb_per_s(self):
+        """Ukuran file masukan (MB) per detik wall-clock seluruh batch"""
+        elapsed = self.elapsed
+        return self.total_bytes / 1e6 / elapsed if elapsed > 0 and self.finished else 0.0
+
+    def summary(self):
+        """Ringkasan per file/sheet sesuai urutan pendaftaran"""
+        with self._lock:
+            entries = [dict(entry) for entry in self.sheets]
+        summary = []
+        for entry in entries:
+            encrypt_s = entry["encrypt_s"]
+            summary.append({
+                "file": entry["file"],
+                "sheet": entry["sheet"],
+                "state": entry["state"],
+                "rows": entry["rows_done"],
+                "estimated_rows": entry["estimated_rows"],
+                "chunks": entry["chunks"],
+                "parse_ms": entry["parse_s"] * 1000,
+                "wait_ms": entry["wait_s"] * 1000,
+                "encrypt_ms": encrypt_s * 1000,
+                "rows_per_s": entry["rows_done"] / encrypt_s if encrypt_s > 0 else None,
+                "error": entry["error"],
+            })
+        return summary
+
+# ========== PRODUSEN (THREAD I/O) DAN ANTREAN TERBATAS ==========
+
+def _put(output, item, stop):
+    """Memasukkan item ke antrean terbatas; menunggu selama antrean penuh kecuali batch dihentikan"""
+    while not stop.is_set():
+        try:
+            output.put(item, timeout=_PUT_TIMEOUT_S)
+            return True
+        except queue.Full:
+            continue
+    return False
+
+def _error_text(e):
+    return f"{type(e).__name__}: {e}"
+
+def _read_sheet(sheet_id, source, sheet, columns, chunk_size, max_rows, output, stop, report):
+    """Tugas I/O per sheet: mem-parse sheet per chunk dan mengirimnya ke antrean"""
+    if stop.is_set():
+        return
+    report.set_state(sheet_id, STATE_RUNNING)
+    chunks = None
+    try:
+        chunks = iter_row_chunks(_open(source), columns, chunk_size, max_rows, sheet)
+        while True:
+            start = time.perf_counter()
+            item = next(chunks, None)
+            report.add(sheet_id, parse_s=time.perf_counter() - start)
+            if item is None:
+                break
+            report.add(sheet_id, rows_read=len(item[1]))
+            start = time.perf_counter()
+            delivered = _put(output, (_CHUNK, sheet_id, item), stop)
+            report.add(sheet_id, wait_s=time.perf_counter() - start)
+            if not delivered:
+                return
+        _put(output, (_SHEET_DONE, sheet_id, None), stop)
+    except Exception as e:
+        _put(output, (_SHEET_FAILED, sheet_id, _error_text(e)), stop)
+    finally:
+        if chunks is not None:
+            chunks.close()
+
+def _scan_file(label, source, columns, chunk_size, max_rows, executor, output, stop, report):
+    """Tugas I/O per file: memindai header setiap sheet lalu menjadwalkan satu tugas per sheet target
+
+    File dibaca baru saat tugas ini berjalan (bukan seluruh batch di awal), dan file yang hilang atau rusak
+    hanya dicatat sebagai error file tersebut.
+    """
+    if stop.is_set():
+        return
+    entry = report.files[label]
+    start = time.perf_counter()
+    try:
+        entry["bytes"] = _source_size(source)
+        targets, skipped = find_target_sheets(source, columns)
+    except Exception as e:
+        entry["error"] = _error_text(e)
+        _put(output, (_FILE_FAILED, label, entry["error"]), stop)
+        return
+    finally:
+        entry["scan_s"] += time.perf_counter() - start
+    report.skipped.extend((label, sheet, missing) for sheet, missing in skipped)
+    sheet_ids = [report.add_sheet(label, sheet, estimate) for sheet, estimate in targets]
+    # Jumlah sheet dikirim sebelum tugas sheet dijadwalkan sehingga konsumen selalu menerimanya lebih dulu
+    if not _put(output, (_FILE_SCANNED, label, len(sheet_ids)), stop):
+        return
+    for sheet_id, (sheet, _) in zip(sheet_ids, targets):
+        try:
+            submit_traced(executor, _read_sheet, sheet_id, source, sheet, columns, chunk_size, max_rows, output,
+                          stop, report)
+        except RuntimeError:
+            # Executor sudah dimatikan karena batch dihentikan
+            return
+
+def iter_batch_chunks(sources, columns=TARGET_COLUMNS, chunk_size=DEFAULT_CHUNK_SIZE, max_rows=None,
+                      io_workers=DEFAULT_IO_WORKERS, queue_chunks=DEFAULT_QUEUE_CHUNKS, report=None, on_error=None):
+    """Mem-parse banyak workbook/sheet secara bersamaan dan menghasilkan (nomor sheet, headers, rows)
+
+    Setiap file dipindai oleh tugas di ThreadPoolExecutor berisi `io_workers` thread, yang lalu menjadwalkan
+    satu tugas per sheet target. Chunk dikirim lewat antrean berkapasitas `queue_chunks` sehingga parsing
+    berhenti sejenak (backpressure) bila enkripsi tertinggal dan memori tetap terbatas. `max_rows` berlaku
+    per sheet. File atau sheet yang gagal dibaca dicatat di `report` (dan `on_error`) tanpa menghentikan
+    yang lain. Chunk dari sheet berbeda dapat saling berselang.
+    """
+    report = report if report is not None else IngestReport()
+    output = queue.Queue(maxsize=queue_chunks)
+    stop = threading.Event()
+    executor = ThreadPoolExecutor(max_workers=max(int(io_workers), 1), thread_name_prefix="ingest")
+    pending_files = 0
+    pending_sheets = 0
+    try:
+        for label, source in zip(source_labels(sources), sources):
+            report.add_file(label)
+            submit_traced(executor, _scan_file, label, source, columns, chunk_size, max_rows, executor, output,
+                          stop, report)
+            pending_files += 1
+        while pending_files or pending_sheets:
+            kind, item_id, payload = output.get()
+            if kind == _CHUNK:
+                headers, rows = payload
+                report.add(item_id, chunks=1)
+                yield item_id, headers, rows
+            elif kind == _SHEET_DONE:
+                pending_sheets -= 1
+                report.set_state(item_id, STATE_DONE)
+            elif kind == _SHEET_FAILED:
+                pending_sheets -= 1
+                report.set_state(item_id, STATE_FAILED, payload)
+                if on_error is not None:
+                    entry = report.sheets[item_id]
+                    on_error(f"{entry['file']} [{entry['sheet'] or '-'}]: {payload}")
+            elif kind == _FILE_SCANNED:
+                pending_files -= 1
+                pending_sheets += payload
+            else:
+                pending_files -= 1
+                if on_error is not None:
+                    on_error(f"{item_id}: {payload}")
+    finally:
+        # Dibatalkan/ditutup lebih awal: hentikan produsen, kosongkan antrean agar put() tidak menggantung
+        stop.set()
+        while True:
+            try:
+                output.get_nowait()
+            except queue.Empty:
+                break
+        executor.shutdown(wait=True, cancel_futures=True)
+        for entry_id, entry in enumerate(report.sheets):
+            if entry["state"] in (STATE_QUEUED, STATE_RUNNING):
+                report.set_state(entry_id, STATE_CANCELLED)
+
+# ========== PIPELINE BATCH ==========
+
+def stream_batch_pipeline(sources, key, padding_method=PADDING_PKCS7, columns=TARGET_COLUMNS,
+                          chunk_size=DEFAULT_CHUNK_SIZE, max_rows=None, verify=True, on_error=None,
+                          round_trip_fn=round_trip, io_workers=DEFAULT_IO_WORKERS,
+                          queue_chunks=DEFAULT_QUEUE_CHUNKS, report=None):
+    """Pipeline per chunk seperti stream_pipeline untuk banyak file dan semua sheet berisi kolom target
+
+    Parsing berjalan di thread I/O (lihat iter_batch_chunks) sementara enkripsi berjalan di thread pemanggil.
+    Chunk juga berisi "file" dan "sheet" asalnya; "start" adalah posisi baris dalam keseluruhan batch.
+    """
+    report = report if report is not None else IngestReport()
+    report.started = time.perf_counter()
+    tags = []
+    batch_chunks = iter_batch_chunks(sources, columns, chunk_size, max_rows, io_workers, queue_chunks, report,
+                                     on_error)
+
+    def feed():
+        for sheet_id, headers, rows in batch_chunks:
+            tags.append((sheet_id, time.perf_counter()))
+            yield headers, rows
+
+    chunks = stream_pipeline(None, key, padding_method, columns, chunk_size, verify=verify, on_error=on_error,
+                             round_trip_fn=round_trip_fn, chunks=feed())
+    try:
+        for chunk in chunks:
+            sheet_id, fed_at = tags.pop(0)
+            entry = report.sheets[sheet_id]
+            report.add(sheet_id, rows_done=len(chunk["original"]), encrypt_s=time.perf_counter() - fed_at)
+            chunk["file"] = entry["file"]
+            chunk["sheet"] = entry["sheet"]
+            yield chunk
+    finally:
+        chunks.close()
+        batch_chunks.close()
+        report.finished = time.perf_counter()
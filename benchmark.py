@@ -0,0 +1,212 @@
+import argparse
+import json
+import os
+import platform
+import random
+import sys
+import time
+from datetime import datetime, timezone
+import numpy as np
+import Crypto
+from aes_batch import (aes_encrypt_batch, aes_decrypt_batch, aes_encrypt_raw, padded_plaintext_buffer,
+                       PADDING_METHODS, PADDING_PKCS7, PADDING_BUCKET, BUCKET_STRATEGIES, learn_buckets,
+                       bucket_padding_method)
+import aes_numpy
+from avalanche import avalanche_adjacent
+from pipeline import KEY, TARGET_COLUMNS, ROW_SEPARATOR, reverse_cipher, reverse_cipher_undo
+
+# ========== KONSTANTA ==========
+DEFAULT_SIZES = [10, 100, 1000, 10000, 100000, 1000000]
+DEFAULT_ROW_LENGTH = 120
+DEFAULT_DUPLICATION_RATE = 0.3
+DEFAULT_NON_ASCII_SHARE = 0.1
+DEFAULT_WARMUP = 1
+DEFAULT_REPETITIONS = 5
+PERCENTILES = (50, 90, 99)
+
+GROUP_NAMES = ["ELEKTRIKAL", "MEKANIKAL", "BAHAN KIMIA", "SPARE PART", "INSTRUMENTASI", "PERKAKAS"]
+CUSTOMER_PREFIXES = ["PT", "CV", "UD", "Koperasi"]
+CATALOG_WORDS = ["BEARING", "VALVE", "PUMP", "MOTOR", "GASKET", "CABLE", "FILTER", "SENSOR", "BOLT", "SEAL"]
+NON_ASCII_WORDS = ["Ø25mm", "µm", "Grüße", "Ångström", "café", "piñón", "–", "°C", "²"]
+
+# ========== GENERATOR DATA SINTETIS ==========
+
+def generate_rows(count, row_length=DEFAULT_ROW_LENGTH, duplication_rate=DEFAULT_DUPLICATION_RATE,
+                  non_ascii_share=DEFAULT_NON_ASCII_SHARE, seed=0):
+    """Membuat baris sintetis berbentuk TARGET_COLUMNS (GroupDesc, Customer Name, MaterialNumber, ...)
+
+    row_length adalah perkiraan panjang teks gabungan per baris, duplication_rate adalah porsi baris
+    yang menyalin baris sebelumnya, dan non_ascii_share adalah porsi baris yang memuat karakter non-ASCII.
+    """
+    rng = random.Random(seed)
+    rows = []
+    for i in range(count):
+        if rows and rng.random() < duplication_rate:
+            rows.append(list(rows[rng.randrange(len(rows))]))
+            continue
+        group = f"{rng.choice(GROUP_NAMES)} {rng.randint(1, 40):02d}"
+        customer = f"{rng.choice(CUSTOMER_PREFIXES)} Pelanggan {rng.randint(1, 500)}"
+        material = f"{rng.randint(0, 10 ** 9):018d}"
+        catalog = f"{rng.choice(CATALOG_WORDS)}-{rng.randint(100, 9999)}"
+        fixed_length = len(group) + len(customer) + len(material) + len(catalog) + 4 * len(ROW_SEPARATOR)
+        words = []
+        while fixed_length + len(" ".join(words)) < row_length:
+            words.append(rng.choice(CATALOG_WORDS).lower())
+        if rng.random() < non_ascii_share:
+            words.append(rng.choice(NON_ASCII_WORDS))
+        rows.append([group, customer, material, catalog, " ".join(words) or "-"])
+    return rows
+
+# ========== PENGUKURAN ==========
+
+def measure(fn, warmup=DEFAULT_WARMUP, repetitions=DEFAULT_REPETITIONS):
+    """Menjalankan fn dengan warm-up lalu mengukur waktu setiap repetisi (detik)"""
+    for _ in range(warmup):
+        fn()
+    samples = []
+    for _ in range(repetitions):
+        start = time.perf_counter_ns()
+        fn()
+        samples.append((time.perf_counter_ns() - start) / 1e9)
+    return samples
+
+def summarize(samples, rows, byte_count):
+    """Ringkasan waktu: min, rata-rata, persentil, dan throughput"""
+    values = np.asarray(samples)
+    summary = {
+        "repetitions": len(samples),
+        "min_s": float(values.min()),
+        "mean_s": float(values.mean()),
+        "stdev_s": float(values.std()),
+        "max_s": float(values.max()),
+    }
+    for p in PERCENTILES:
+        summary[f"p{p}_s"] = float(np.percentile(values, p))
+    median = summary["p50_s"]
+    summary["rows_per_s"] = rows / median if median > 0 else None
+    summary["mb_per_s"] = byte_count / median / 1e6 if median > 0 else None
+    return summary
+
+def benchmark_size(rows, key=KEY, warmup=DEFAULT_WARMUP, repetitions=DEFAULT_REPETITIONS):
+    """Mengukur setiap tahap pipeline untuk satu ukuran data"""
+    results = []
+    combined = [ROW_SEPARATOR.join(row) for row in rows]
+    reversed_texts = [reverse_cipher(text) for text in combined]
+    plaintext_bytes = sum(len(text.encode("utf-8")) for text in combined)
+
+    def record(stage, fn, byte_count, padding=None):
+        samples = measure(fn, warmup, repetitions)
+        results.append({"stage": stage, "padding": padding, "rows": len(rows), "bytes": byte_count,
+                        **summarize(samples, len(rows), byte_count)})
+
+    record("combine", lambda: [ROW_SEPARATOR.join(row) for row in rows], plaintext_bytes)
+    record("reverse_cipher", lambda: [reverse_cipher(text) for text in combined], plaintext_bytes)
+    record("reverse_undo", lambda: [reverse_cipher_undo(text) for text in reversed_texts], plaintext_bytes)
+
+    # Padding bucket diukur dengan kelas yang dipelajari dari data itu sendiri, per strategi
+    lengths = [len(text.encode("utf-8")) for text in reversed_texts]
+    paddings = []
+    for padding in PADDING_METHODS:
+        if padding == PADDING_BUCKET:
+            paddings.extend(bucket_padding_method(learn_buckets(lengths, strategy)) for strategy in BUCKET_STRATEGIES)
+        else:
+            paddings.append(padding)
+
+    for padding in paddings:
+        batch = aes_encrypt_batch(reversed_texts, key, padding)
+        cipher_bytes = len(batch.buffer)
+        record("aes_encrypt", lambda: aes_encrypt_batch(reversed_texts, key, padding), cipher_bytes, padding)
+        record("hex_encode", lambda: batch.hex_rows(), cipher_bytes, padding)
+        record("aes_decrypt", lambda: aes_decrypt_batch(batch, key, padding), cipher_bytes, padding)
+        record("avalanche_adjacent", lambda: avalanche_adjacent(batch), cipher_bytes, padding)
+
+    # Mesin blok saja (tanpa padding/hex) atas buffer yang sama: pycryptodome vs AES NumPy tervektorisasi
+    buffer = padded_plaintext_buffer(reversed_texts, PADDING_PKCS7)
+    if aes_numpy.encrypt_ecb(buffer, key) != aes_encrypt_raw(buffer, key):
+        raise AssertionError("Hasil AES NumPy berbeda dengan pycryptodome")
+    record("ecb_pycryptodome", lambda: aes_encrypt_raw(buffer, key), len(buffer), PADDING_PKCS7)
+    record("ecb_numpy", lambda: aes_numpy.encrypt_ecb(buffer, key), len(buffer), PADDING_PKCS7)
+    return results
+
+def environment_info():
+    """Informasi lingkungan agar hasil benchmark dapat dibandingkan"""
+    return {
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "processor": platform.processor(),
+        "cpu_count": os.cpu_count(),
+        "numpy": np.__version__,
+        "pycryptodome": Crypto.__version__,
+    }
+
+def run_benchmark(sizes=DEFAULT_SIZES, row_length=DEFAULT_ROW_LENGTH, duplication_rate=DEFAULT_DUPLICATION_RATE,
+                  non_ascii_share=DEFAULT_NON_ASCII_SHARE, warmup=DEFAULT_WARMUP,
+                  repetitions=DEFAULT_REPETITIONS, seed=0, key=KEY, progress=None):
+    """Menjalankan seluruh benchmark dan mengembalikan hasil dalam bentuk dict siap JSON"""
+    params = {
+        "sizes": list(sizes),
+        "row_length": row_length,
+        "duplication_rate": duplication_rate,
+        "non_ascii_share": non_ascii_share,
+        "warmup": warmup,
+        "repetitions": repetitions,
+        "seed": seed,
+        "columns": TARGET_COLUMNS,
+    }
+    all_rows = generate_rows(max(sizes), row_length, duplication_rate, non_ascii_share, seed)
+    results = []
+    for size in sizes:
+        if progress is not None:
+            progress(f"Mengukur {size} baris...")
+        for result in benchmark_size(all_rows[:size], key, warmup, repetitions):
+            results.append({"size": size, **result})
+    return {"environment": environment_info(), "params": params, "results": results}
+
+# ========== CLI ==========
+
+def format_table(report):
+    """Tabel ringkas (p50 per tahap) untuk ditampilkan di terminal"""
+    lines = [f"{'size':>9} {'stage':<20} {'padding':<13} {'bytes':>12} {'p50 (ms)':>10} {'p90 (ms)':>10} "
+             f"{'rows/s':>13} {'MB/s':>9}"]
+    for r in report["results"]:
+        rows_per_s = f"{r['rows_per_s']:.0f}" if r["rows_per_s"] else "-"
+        mb_per_s = f"{r['mb_per_s']:.1f}" if r["mb_per_s"] else "-"
+        lines.append(f"{r['size']:>9} {r['stage']:<20} {r['padding'] or '-':<13} {r['bytes']:>12} "
+                     f"{r['p50_s'] * 1000:>10.3f} {r['p90_s'] * 1000:>10.3f} {rows_per_s:>13} {mb_per_s:>9}")
+    return "\n".join(lines)
+
+def build_parser():
+    """Menyusun argumen command-line untuk benchmark"""
+    parser = argparse.ArgumentParser(description="Benchmark pipeline AES-128 + Reverse Cipher dengan data sintetis")
+    parser.add_argument("--sizes", default=",".join(map(str, DEFAULT_SIZES)),
+                        help="Ukuran data (jumlah baris) dipisah koma")
+    parser.add_argument("--row-length", type=int, default=DEFAULT_ROW_LENGTH, help="Perkiraan panjang teks per baris")
+    parser.add_argument("--duplication-rate", type=float, default=DEFAULT_DUPLICATION_RATE,
+                        help="Porsi baris duplikat (0-1)")
+    parser.add_argument("--non-ascii-share", type=float, default=DEFAULT_NON_ASCII_SHARE,
+                        help="Porsi baris yang memuat karakter non-ASCII (0-1)")
+    parser.add_argument("--warmup", type=int, default=DEFAULT_WARMUP, help="Jumlah putaran warm-up")
+    parser.add_argument("--repetitions", type=int, default=DEFAULT_REPETITIONS, help="Jumlah repetisi terukur")
+    parser.add_argument("--seed", type=int, default=0, help="Seed generator data sintetis")
+    parser.add_argument("-o", "--output", default=None, help="File keluaran JSON (default: stdout)")
+    return parser
+
+def main(argv=None):
+    """Titik masuk command-line"""
+    args = build_parser().parse_args(argv)
+    sizes = [int(size) for size in args.sizes.split(",") if size.strip()]
+    report = run_benchmark(sizes, args.row_length, args.duplication_rate, args.non_ascii_share,
+                           args.warmup, args.repetitions, args.seed,
+                           progress=lambda message: print(message, file=sys.stderr))
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(format_table(report), file=sys.stderr)
+    else:
+        json.dump(report, sys.stdout, indent=2)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,109 @@
+import pandas as pd
+from aes_batch import BatchCiphertext, aes_encrypt_batch, aes_decrypt_batch, PADDING_PKCS7
+from pipeline import TARGET_COLUMNS, DEFAULT_CHUNK_SIZE, iter_row_chunks, _chunk_rows
+from tracing import span, traced_iter
+
+# ========== FUNGSI BANTU ==========
+
+def reverse_field(text):
+    """Membalik isi satu sel; sel kosong tetap kosong agar skema tabel kembali utuh saat dekripsi"""
+    return text[::-1]
+
+# ========== TABEL TERENKRIPSI PER KOLOM ==========
+
+class EncryptedTable:
+    """Tabel terenkripsi dengan skema sama seperti input: satu BatchCiphertext per kolom"""
+
+    def __init__(self, headers, columns, padding_method=PADDING_PKCS7):
+        self.headers = headers
+        self.columns = columns
+        self.padding_method = padding_method
+
+    def __len__(self):
+        return len(self.columns[self.headers[0]]) if self.headers else 0
+
+    @property
+    def nbytes(self):
+        return sum(len(batch.buffer) for batch in self.columns.values())
+
+    def hex_frame(self, columns=None):
+        """Ciphertext heksadesimal sebagai DataFrame dengan nama kolom asli"""
+        columns = self.headers if columns is None else _check_columns(self.headers, columns)
+        return pd.DataFrame({name: self.columns[name].hex_rows() for name in columns}, columns=columns)
+
+    @classmethod
+    def from_hex_frame(cls, df, padding_method=PADDING_PKCS7, columns=None):
+        """Membangun tabel dari DataFrame heksadesimal; hanya kolom yang diminta yang di-decode"""
+        headers = df.columns.tolist() if columns is None else _check_columns(df.columns.tolist(), columns)
+        invalid = {}
+        batches = {}
+        for name in headers:
+            batches[name], invalid[name] = BatchCiphertext.from_hex_rows(df[name].fillna("").astype(str).tolist())
+        table = cls(headers, batches, padding_method)
+        return table, invalid
+
+    def take(self, indices, columns=None):
+        """Sub-tabel berisi baris-baris terpilih (urutan mengikuti `indices`) tanpa dekripsi"""
+        columns = self.headers if columns is None else _check_columns(self.headers, columns)
+        taken = {}
+        for name in columns:
+            taken[name] = self.columns[name].take(indices)
+        return EncryptedTable(list(columns), taken, self.padding_method)
+
+    @classmethod
+    def concat(cls, tables):
+        """Menggabungkan beberapa tabel berurutan (skema sama) menjadi satu tabel"""
+        headers = tables[0].headers if tables else []
+        columns = {name: BatchCiphertext.concat([table.columns[name] for table in tables]) for name in headers}
+        return cls(headers, columns, tables[0].padding_method if tables else PADDING_PKCS7)
+
+def _check_columns(headers, columns):
+    """Memastikan subset kolom ada di tabel, urutan mengikuti permintaan"""
+    missing = [name for name in columns if name not in headers]
+    if missing:
+        raise ValueError(f"Kolom tidak ditemukan pada tabel terenkripsi: {', '.join(missing)}")
+    return list(columns)
+
+# ========== API ENKRIPSI/DEKRIPSI PER KOLOM ==========
+
+def encrypt_columns(headers, rows, key, padding_method=PADDING_PKCS7):
+    """Reverse Cipher lalu AES batch untuk setiap kolom secara terpisah"""
+    columns = {}
+    for position, name in enumerate(headers):
+        with span("reverse", rows=len(rows), column=name):
+            reversed_values = [reverse_field(row[position]) for row in rows]
+        columns[name] = aes_encrypt_batch(reversed_values, key, padding_method)
+    return EncryptedTable(list(headers), columns, padding_method)
+
+def decrypt_columns(table, key, columns=None, on_error=None):
+    """Mendekripsi hanya kolom yang diminta, mengembalikan {nama kolom: list nilai asli}
+
+    Kolom lain tidak disentuh sama sekali, sehingga biaya dekripsi sebanding dengan byte kolom terpilih.
+    """
+    columns = table.headers if columns is None else _check_columns(table.headers, columns)
+    result = {}
+    for name in columns:
+        decrypted = aes_decrypt_batch(table.columns[name], key, table.padding_method, on_error=on_error)
+        with span("reverse_undo", rows=len(decrypted), column=name):
+            result[name] = [reverse_field(text) for text in decrypted]
+    return result
+
+def stream_column_pipeline(source, key, padding_method=PADDING_PKCS7, columns=TARGET_COLUMNS,
+                           chunk_size=DEFAULT_CHUNK_SIZE, max_rows=None, verify=True, on_error=None, chunks=None):
+    """Seperti stream_pipeline, tetapi setiap kolom dienkripsi sebagai batch sendiri (tanpa penggabungan baris)"""
+    if chunks is None:
+        chunks = iter_row_chunks(source, columns, chunk_size, max_rows)
+    start = 0
+    for headers, rows in traced_iter(chunks, "read", _chunk_rows):
+        table = encrypt_columns(headers, rows, key, padding_method)
+        chunk = {
+            "start": start,
+            "headers": headers,
+            "original": rows,
+            "table": table,
+        }
+        if verify:
+            with span("verify", rows=len(rows)):
+                chunk["decrypted"] = decrypt_columns(table, key, on_error=on_error)
+        start += len(rows)
+        yield chunk
@@ -0,0 +1,205 @@
+import math
+from statistics import NormalDist
+import numpy as np
+from aes_batch import BatchCiphertext
+from pipeline import ROW_SEPARATOR, PIPELINE_ROUND_TRIP, reverse_cipher
+
+# ========== KONSTANTA ==========
+# Pengganti hasil dekripsi untuk baris yang tidak pernah didekripsi (enkripsi saja / di luar sampel)
+NOT_DECRYPTED = "(tidak didekripsi)"
+
+# ========== KOLOM TEKS KOMPAK ==========
+
+class TextColumn:
+    """Kolom string dalam satu blob UTF-8 dengan tabel offset numpy (tata letak seperti kolom string Arrow)"""
+
+    def __init__(self, blob, offsets):
+        self.blob = blob
+        self.offsets = offsets
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def slice(self, start, stop):
+        """Mendekode nilai baris [start, stop) menjadi list string"""
+        bounds = self.offsets[start:stop + 1].tolist()
+        if len(bounds) < 2:
+            return []
+        base = bounds[0]
+        data = self.blob[base:bounds[-1]]
+        return [data[a - base:b - base].decode("utf-8") for a, b in zip(bounds, bounds[1:])]
+
+    @property
+    def nbytes(self):
+        return len(self.blob) + self.offsets.nbytes
+
+class _TextColumnBuilder:
+    """Mengumpulkan nilai per chunk lalu membentuk TextColumn sekali di akhir"""
+
+    def __init__(self):
+        self.parts = []
+        self.lengths = []
+
+    def extend(self, values):
+        encoded = [value.encode("utf-8") for value in values]
+        self.parts.append(b"".join(encoded))
+        self.lengths.append(np.fromiter((len(value) for value in encoded), dtype=np.int64, count=len(encoded)))
+
+    def build(self):
+        lengths = np.concatenate(self.lengths) if self.lengths else np.zeros(0, dtype=np.int64)
+        offsets = np.concatenate(([0], np.cumsum(lengths))).astype(np.int64)
+        return TextColumn(b"".join(self.parts), offsets)
+
+# ========== HASIL PROSES KOMPAK ==========
+
+class CompactResult:
+    """Hasil proses enkripsi/dekripsi yang disimpan ringkas di session state
+
+    Yang disimpan hanya kolom asli (blob + offset), ciphertext mentah (satu buffer + offset),
+    persentase avalanche, dan baris yang hasil dekripsinya tidak cocok. Teks gabungan, hasil
+    Reverse Cipher, hex ciphertext dan hasil dekripsi dibuat ulang per irisan saat dibutuhkan.
+    `checked` adalah penanda boolean per baris yang diverifikasi (None: semua baris diverifikasi).
+    """
+
+    def __init__(self, headers, columns, ciphertexts, mismatches, avalanche_percent, time, padding_method_used,
+                 mode=PIPELINE_ROUND_TRIP, checked=None):
+        self.headers = headers
+        self.columns = columns
+        self.ciphertexts = ciphertexts
+        self.mismatches = mismatches
+        self.avalanche_percent = avalanche_percent
+        self.time = time
+        self.padding_method_used = padding_method_used
+        self.mode = mode
+        self.checked = checked
+
+    def __len__(self):
+        return len(self.ciphertexts)
+
+    def original(self, start=0, stop=None):
+        """Baris data asli (list nilai per kolom)"""
+        stop = len(self) if stop is None else min(stop, len(self))
+        if not self.columns:
+            return [[] for _ in range(start, stop)]
+        return [list(row) for row in zip(*(column.slice(start, stop) for column in self.columns))]
+
+    def combined(self, start=0, stop=None):
+        """Teks gabungan data asli (' || ') yang menjadi input Reverse Cipher"""
+        return [ROW_SEPARATOR.join(row) for row in self.original(start, stop)]
+
+    def reversed_encrypt(self, start=0, stop=None):
+        """Hasil Reverse Cipher (input ke AES)"""
+        return [reverse_cipher(text) for text in self.combined(start, stop)]
+
+    def aes_hex(self, start=0, stop=None):
+        """Ciphertext AES dalam bentuk heksadesimal"""
+        stop = len(self) if stop is None else min(stop, len(self))
+        return self.ciphertexts.slice(start, stop).hex_rows()
+
+    def reversed_decrypt(self, start=0, stop=None):
+        """Hasil dekripsi akhir per baris
+
+        Baris terverifikasi yang cocok sama dengan teks gabungan, baris tidak cocok berisi hasil dekripsinya,
+        dan baris yang tidak didekripsi berisi NOT_DECRYPTED.
+        """
+        combined = self.combined(start, stop)
+        mismatches = self.mismatches
+        return [NOT_DECRYPTED if ok is None else mismatches.get(start + i, text)
+                for i, (text, ok) in enumerate(zip(combined, self.match(start, stop)))]
+
+    def match(self, start=0, stop=None):
+        """Status kecocokan hasil dekripsi dengan data asli per baris (None: baris tidak diverifikasi)"""
+        stop = len(self) if stop is None else min(stop, len(self))
+        checked = self.checked
+        return [None if checked is not None and not checked[i] else i not in self.mismatches
+                for i in range(start, stop)]
+
+    @property
+    def checked_count(self):
+        """Jumlah baris yang benar-benar diverifikasi"""
+        return len(self) if self.checked is None else int(self.checked.sum())
+
+    @property
+    def match_count(self):
+        return self.checked_count - len(self.mismatches)
+
+    def success_interval(self, confidence=0.95):
+        """Rentang tingkat keberhasilan seluruh baris pada tingkat kepercayaan tertentu
+
+        Semua baris diverifikasi: rentang = nilai pasti. Sampel: interval skor Wilson dengan koreksi
+        populasi terbatas (sampel diambil tanpa pengembalian). Tidak ada verifikasi: None.
+        """
+        n, total = self.checked_count, len(self)
+        if n == 0:
+            return None
+        rate = self.match_count / n
+        if n >= total:
+            return rate, rate
+        z = NormalDist().inv_cdf(0.5 + confidence / 2)
+        z *= math.sqrt((total - n) / (total - 1))
+        center = (rate + z * z / (2 * n)) / (1 + z * z / n)
+        margin = z * math.sqrt(rate * (1 - rate) / n + z * z / (4 * n * n)) / (1 + z * z / n)
+        return max(center - margin, 0.0), min(center + margin, 1.0)
+
+    @property
+    def avalanche(self):
+        """Avalanche Effect baris berdekatan sebagai list (baris A, baris B, persentase)"""
+        return [(i + 1, i + 2, float(percent)) for i, percent in enumerate(self.avalanche_percent)]
+
+    @property
+    def nbytes(self):
+        """Perkiraan ukuran data yang disimpan (byte)"""
+        return (sum(column.nbytes for column in self.columns) + len(self.ciphertexts.buffer)
+                + self.ciphertexts.offsets.nbytes + self.avalanche_percent.nbytes
+                + (self.checked.nbytes if self.checked is not None else 0)
+                + sum(len(text) for text in self.mismatches.values()))
+
+class CompactResultBuilder:
+    """Membangun CompactResult dari chunk stream_pipeline tanpa menampung list per baris
+
+    Chunk dengan "checked_rows"/"mismatches" (verifikasi sampel, dekripsi saja) dipakai apa adanya;
+    chunk dengan "reversed_decrypt" dibandingkan penuh; chunk tanpa keduanya dianggap tidak diverifikasi.
+    """
+
+    def __init__(self, mode=PIPELINE_ROUND_TRIP):
+        self.mode = mode
+        self.headers = []
+        self.columns = None
+        self.batches = []
+        self.mismatches = {}
+        self.checked = []
+        self.row_count = 0
+
+    def add_chunk(self, chunk):
+        self.headers = chunk["headers"]
+        rows = chunk["original"]
+        if self.columns is None:
+            self.columns = [_TextColumnBuilder() for _ in self.headers]
+        for i, builder in enumerate(self.columns):
+            builder.extend([row[i] for row in rows])
+        self.batches.append(chunk["batch"])
+        checked = np.zeros(len(rows), dtype=bool)
+        if "checked_rows" in chunk:
+            checked[list(chunk["checked_rows"])] = True
+            for i, decrypted in chunk["mismatches"].items():
+                self.mismatches[chunk["start"] + i] = decrypted
+        elif "reversed_decrypt" in chunk:
+            checked[:] = True
+            for i, (text, decrypted) in enumerate(zip(chunk["combined"], chunk["reversed_decrypt"])):
+                if text != decrypted:
+                    self.mismatches[chunk["start"] + i] = decrypted
+        self.checked.append(checked)
+        self.row_count += len(rows)
+
+    def batch(self):
+        """Seluruh ciphertext sebagai satu BatchCiphertext dengan offset numpy"""
+        batch = BatchCiphertext.concat(self.batches)
+        return BatchCiphertext(batch.buffer, np.asarray(batch.offsets, dtype=np.int64))
+
+    def build(self, avalanche_percent, time, padding_method_used, batch=None):
+        columns = [builder.build() for builder in self.columns or []]
+        checked = np.concatenate(self.checked) if self.checked else np.zeros(0, dtype=bool)
+        return CompactResult(self.headers, columns, batch if batch is not None else self.batch(),
+                             self.mismatches, np.asarray(avalanche_percent, dtype=np.float64),
+                             time, padding_method_used, mode=self.mode,
+                             checked=None if checked.all() else checked)
@@ -0,0 +1,196 @@
+import io
+import mmap
+import struct
+import numpy as np
+from aes_batch import (BatchCiphertext, PADDING_PKCS7, PADDING_FIXED, PADDING_CTR, PADDING_GCM, PADDING_BUCKET,
+                       padding_family)
+from pipeline import key_fingerprint, decrypt_texts
+
+# ========== FORMAT CONTAINER ==========
+# [header 48 byte][region ciphertext][indeks offset uint64 (row_count + 1), hanya bila row_stride == 0]
+#
+# Bila semua baris sama panjang (umumnya Fixed Length: 152 karakter + blok PKCS#7 = 160 byte),
+# indeks tidak ditulis dan baris ke-i berada di data_start + i * row_stride.
+
+MAGIC = b"SKRPAES\x00"
+VERSION = 1
+HEADER = struct.Struct("<8sBBxxIQQ16s")
+OFFSET = struct.Struct("<Q")
+CONTAINER_EXTENSION = ".skc"
+# Batas kelas bucket tidak disimpan: dekripsi cukup membuang '#' seperti Fixed Length
+PADDING_CODES = {PADDING_PKCS7: 0, PADDING_FIXED: 1, PADDING_CTR: 2, PADDING_GCM: 3, PADDING_BUCKET: 4}
+PADDING_NAMES = {code: name for name, code in PADDING_CODES.items()}
+
+class ContainerError(ValueError):
+    """File container rusak, versi tidak dikenal, atau kunci tidak cocok"""
+
+# ========== PENULISAN ==========
+
+class ContainerWriter:
+    """Menulis ciphertext per batch ke container (path atau file biner yang bisa di-seek)"""
+
+    def __init__(self, target, padding_method, key):
+        self.padding_method = padding_method
+        self.fingerprint = key_fingerprint(key).encode("ascii")
+        self.owns_file = isinstance(target, str)
+        self.file = open(target, "wb") if self.owns_file else target
+        self.start = self.file.tell()
+        self.lengths = []
+        self.row_count = 0
+        self.data_length = 0
+        self.file.write(b"\x00" * HEADER.size)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, traceback):
+        if exc_type is None:
+            self.close()
+        elif self.owns_file:
+            self.file.close()
+
+    def append(self, batch):
+        """Menambahkan satu BatchCiphertext (urutan baris dipertahankan)"""
+        offsets = np.asarray(batch.offsets, dtype=np.int64)
+        base = int(offsets[0])
+        self.file.write(batch.buffer[base:int(offsets[-1])])
+        self.lengths.append(np.diff(offsets))
+        self.row_count += len(offsets) - 1
+        self.data_length += int(offsets[-1]) - base
+
+    def close(self):
+        """Menulis indeks offset (bila perlu) lalu header final"""
+        lengths = np.concatenate(self.lengths) if self.lengths else np.zeros(0, dtype=np.int64)
+        uniform = len(lengths) > 0 and bool((lengths == lengths[0]).all())
+        row_stride = int(lengths[0]) if uniform else 0
+        if not row_stride:
+            offsets = np.concatenate(([0], np.cumsum(lengths))).astype("<u8")
+            self.file.write(offsets.tobytes())
+        end = self.file.tell()
+        self.file.seek(self.start)
+        self.file.write(HEADER.pack(MAGIC, VERSION, PADDING_CODES[padding_family(self.padding_method)], row_stride,
+                                    self.row_count, self.data_length, self.fingerprint))
+        self.file.seek(end)
+        if self.owns_file:
+            self.file.close()
+
+def write_container(target, batches, padding_method, key):
+    """Menulis satu atau beberapa BatchCiphertext berurutan ke container"""
+    if isinstance(batches, BatchCiphertext):
+        batches = [batches]
+    with ContainerWriter(target, padding_method, key) as writer:
+        for batch in batches:
+            writer.append(batch)
+    return writer.row_count
+
+def container_bytes(batches, padding_method, key):
+    """Container dalam memori (misalnya untuk tombol unduh)"""
+    buffer = io.BytesIO()
+    write_container(buffer, batches, padding_method, key)
+    return buffer.getvalue()
+
+# ========== PEMBACAAN (MMAP) ==========
+
+class ContainerReader:
+    """Akses acak per baris ke container lewat mmap; hanya byte baris yang diminta yang disentuh
+
+    Menerima path file atau objek bytes (container yang sudah ada di memori).
+    """
+
+    def __init__(self, source):
+        self.file = None
+        if isinstance(source, str):
+            self.file = open(source, "rb")
+            try:
+                self.buffer = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError:
+                # mmap menolak file kosong
+                self.file.close()
+                self.file = None
+                raise ContainerError("File terlalu kecil untuk container terenkripsi") from None
+        else:
+            self.buffer = source
+        try:
+            self._read_header()
+        except ContainerError:
+            # Header ditolak: mmap dan file harus ditutup karena pemanggil tidak pernah mendapat objek ini
+            self.close()
+            raise
+
+    def _read_header(self):
+        if len(self.buffer) < HEADER.size:
+            raise ContainerError("File terlalu kecil untuk container terenkripsi")
+        magic, version, padding_code, self.row_stride, self.row_count, self.data_length, fingerprint = \
+            HEADER.unpack_from(self.buffer, 0)
+        if magic != MAGIC:
+            raise ContainerError("Bukan file container terenkripsi")
+        if version != VERSION or padding_code not in PADDING_NAMES:
+            raise ContainerError(f"Versi container tidak didukung: {version}")
+        self.padding_method = PADDING_NAMES[padding_code]
+        self.fingerprint = fingerprint.decode("ascii")
+        self.data_start = HEADER.size
+        self.index_start = self.data_start + self.data_length
+        expected = self.index_start + (0 if self.row_stride else OFFSET.size * (self.row_count + 1))
+        if len(self.buffer) < expected:
+            raise ContainerError("Container terpotong")
+
+    def __len__(self):
+        return self.row_count
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, traceback):
+        self.close()
+
+    def close(self):
+        if self.file is not None:
+            self.buffer.close()
+            self.file.close()
+            self.file = None
+
+    def _bounds(self, i):
+        if not 0 <= i < self.row_count:
+            raise IndexError(f"Baris {i} di luar jangkauan (0..{self.row_count - 1})")
+        if self.row_stride:
+            return i * self.row_stride, (i + 1) * self.row_stride
+        start = OFFSET.unpack_from(self.buffer, self.index_start + i * OFFSET.size)[0]
+        stop = OFFSET.unpack_from(self.buffer, self.index_start + (i + 1) * OFFSET.size)[0]
+        return start, stop
+
+    def row(self, i):
+        """Ciphertext mentah baris ke-i"""
+        start, stop = self._bounds(i)
+        return bytes(self.buffer[self.data_start + start:self.data_start + stop])
+
+    def rows(self, indices):
+        """BatchCiphertext untuk baris-baris terpilih (urutan mengikuti `indices`)"""
+        parts = [self.row(i) for i in indices]
+        offsets = [0]
+        for part in parts:
+            offsets.append(offsets[-1] + len(part))
+        return BatchCiphertext(b"".join(parts), offsets)
+
+    def slice(self, start, stop):
+        """BatchCiphertext baris [start, stop) dibaca sebagai satu rentang kontigu"""
+        stop = min(stop, self.row_count)
+        if start >= stop:
+            return BatchCiphertext(b"", [0])
+        if self.row_stride:
+            offsets = np.arange(start, stop + 1, dtype=np.int64) * self.row_stride
+        else:
+            offsets = np.frombuffer(self.buffer, dtype="<u8", count=stop - start + 1,
+                                    offset=self.index_start + start * OFFSET.size).astype(np.int64)
+        base = self.data_start + int(offsets[0])
+        offsets -= offsets[0]
+        return BatchCiphertext(bytes(self.buffer[base:base + int(offsets[-1])]), offsets)
+
+    def check_key(self, key):
+        if key_fingerprint(key) != self.fingerprint:
+            raise ContainerError("Kunci tidak cocok dengan sidik jari kunci pada container")
+
+    def decrypt_rows(self, indices, key, on_error=None):
+        """Mendekripsi (AES + Reverse Undo) hanya baris-baris terpilih"""
+        self.check_key(key)
+        _, plaintexts = decrypt_texts(self.rows(indices), key, self.padding_method, on_error=on_error)
+        return plaintexts
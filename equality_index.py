@@ -0,0 +1,48 @@
+from aes_batch import aes_encrypt_batch, NONCE_MODES
+from column_crypto import reverse_field, decrypt_columns, _check_columns
+from tracing import span
+
+# ========== INDEKS KESAMAAN CIPHERTEXT ==========
+# AES-ECB deterministik: nilai sel yang sama dengan kunci dan padding yang sama selalu menghasilkan
+# ciphertext yang sama. Pencarian cukup mengenkripsi nilai yang dicari lalu mencocokkan ciphertext,
+# tanpa mendekripsi tabel. Konsekuensinya, kesamaan nilai antar baris memang terlihat dari ciphertext.
+# CTR/GCM memakai nonce acak per baris sehingga tidak dapat diindeks dengan cara ini.
+
+def encrypt_value(value, key, padding_method):
+    """Ciphertext satu nilai sel, sama persis dengan hasil encrypt_columns untuk nilai tersebut"""
+    if padding_method in NONCE_MODES:
+        raise ValueError(f"Mode {padding_method} memakai nonce acak; pencarian ciphertext hanya untuk mode ECB")
+    return aes_encrypt_batch([reverse_field(value)], key, padding_method).row(0)
+
+class CiphertextIndex:
+    """Hash index ciphertext -> nomor baris untuk satu kolom EncryptedTable"""
+
+    def __init__(self, table, column):
+        _check_columns(table.headers, [column])
+        self.table = table
+        self.column = column
+        self.rows = {}
+        batch = table.columns[column]
+        with span("index_build", rows=len(batch), nbytes=len(batch.buffer)):
+            for i in range(len(batch)):
+                self.rows.setdefault(batch.row(i), []).append(i)
+
+    def __len__(self):
+        return len(self.rows)
+
+    def find(self, value, key):
+        """Nomor baris yang nilai kolomnya sama dengan `value` (O(1), tanpa dekripsi)"""
+        with span("index_lookup", rows=1):
+            return list(self.rows.get(encrypt_value(value, key, self.table.padding_method), ()))
+
+    def lookup(self, value, key, columns=None, on_error=None):
+        """Mencari lalu mendekripsi hanya baris yang cocok, mengembalikan (nomor baris, {kolom: nilai})"""
+        indices = self.find(value, key)
+        if not indices:
+            return indices, {name: [] for name in (columns or self.table.headers)}
+        return indices, decrypt_columns(self.table.take(indices, columns), key, on_error=on_error)
+
+def scan_hex_column(hex_values, value, key, padding_method):
+    """Pencarian sekali jalan pada kolom hex (mis. file ekspor): membandingkan string hex tanpa dekripsi"""
+    target = encrypt_value(value, key, padding_method).hex()
+    return [i for i, ciphertext_hex in enumerate(hex_values) if ciphertext_hex == target]
@@ -0,0 +1,208 @@
+import os
+import hashlib
+import sqlite3
+from aes_batch import BatchCiphertext
+from pipeline import (TARGET_COLUMNS, ROW_SEPARATOR, DEFAULT_CHUNK_SIZE, reverse_cipher, round_trip,
+                      iter_row_chunks, key_fingerprint)
+from tracing import span, traced_iter
+
+# ========== KONSTANTA ==========
+DEFAULT_INDEX_PATH = os.environ.get("SKRIPSI_INDEX_DB", "indeks_enkripsi.db")
+DEFAULT_DATASET = "material_sap"
+KEY_COLUMN = "MaterialNumber"
+SQLITE_MAX_PARAMS = 900
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS encrypted_rows (
+    scope TEXT NOT NULL,
+    row_key TEXT NOT NULL,
+    digest BLOB NOT NULL,
+    ciphertext BLOB NOT NULL,
+    PRIMARY KEY (scope, row_key)
+) WITHOUT ROWID;
+"""
+
+# ========== INDEKS DIGEST ==========
+
+def row_digest(text):
+    """Digest isi plaintext satu baris"""
+    return hashlib.sha256(text.encode("utf-8")).digest()
+
+class IncrementalReport:
+    """Ringkasan perubahan terhadap run sebelumnya"""
+
+    def __init__(self):
+        self.inserted = 0
+        self.updated = 0
+        self.unchanged = 0
+        self.deleted = 0
+        self.complete = False
+        self.partial = False
+
+    @property
+    def encrypted(self):
+        return self.inserted + self.updated
+
+    def as_dict(self):
+        return {"inserted": self.inserted, "updated": self.updated, "unchanged": self.unchanged,
+                "deleted": self.deleted}
+
+class EncryptionIndex:
+    """Indeks persisten row-key -> digest plaintext -> ciphertext (SQLite), dipisah per dataset/kunci/padding"""
+
+    def __init__(self, path=DEFAULT_INDEX_PATH):
+        self.path = path
+        conn = sqlite3.connect(self.path, timeout=30)
+        try:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(SCHEMA)
+        finally:
+            conn.close()
+
+    @staticmethod
+    def scope(dataset, key, padding_method):
+        return f"{dataset}|{key_fingerprint(key)}|{padding_method}"
+
+    def connect(self):
+        return sqlite3.connect(self.path, timeout=30, isolation_level=None)
+
+    def row_count(self, scope):
+        conn = self.connect()
+        try:
+            return conn.execute("SELECT COUNT(*) FROM encrypted_rows WHERE scope = ?", (scope,)).fetchone()[0]
+        finally:
+            conn.close()
+
+    def clear(self, scope=None):
+        """Menghapus indeks satu scope, atau seluruh indeks bila scope None"""
+        conn = self.connect()
+        try:
+            if scope is None:
+                conn.execute("DELETE FROM encrypted_rows")
+            else:
+                conn.execute("DELETE FROM encrypted_rows WHERE scope = ?", (scope,))
+        finally:
+            conn.close()
+
+def _fetch_ciphertexts(conn, scope, row_keys):
+    """Mengambil ciphertext tersimpan untuk sekumpulan row-key (dibagi agar tidak melebihi batas parameter)"""
+    found = {}
+    for i in range(0, len(row_keys), SQLITE_MAX_PARAMS):
+        part = row_keys[i:i + SQLITE_MAX_PARAMS]
+        query = (f"SELECT row_key, ciphertext FROM encrypted_rows "
+                 f"WHERE scope = ? AND row_key IN ({', '.join('?' * len(part))})")
+        found.update(conn.execute(query, [scope, *part]).fetchall())
+    return found
+
+# ========== PIPELINE INKREMENTAL ==========
+
+def incremental_pipeline(source, key, padding_method, index, dataset=DEFAULT_DATASET, columns=TARGET_COLUMNS,
+                         chunk_size=DEFAULT_CHUNK_SIZE, max_rows=None, verify=True, on_error=None,
+                         round_trip_fn=round_trip, chunks=None, report=None, key_column=KEY_COLUMN):
+    """Seperti stream_pipeline, tetapi hanya baris baru/berubah yang dienkripsi (dan diverifikasi)
+
+    Baris diidentifikasi lewat `key_column` (MaterialNumber; nilai duplikat diberi nomor kemunculan).
+    Baris yang digest plaintext-nya sama dengan run sebelumnya memakai ciphertext dari indeks.
+    Indeks di-commit per chunk (kunci tulis hanya dipegang selama menulis satu chunk, dan progres tetap
+    tersimpan bila run terhenti); baris yang tidak muncul lagi baru dihapus setelah seluruh file selesai.
+    Dengan `verify`, hanya baris baru/berubah yang didekripsi ulang: chunk berisi "checked_rows" dan
+    "mismatches" seperti verifikasi sampel, dan baris yang dipakai ulang ("reused") tercatat tidak
+    diverifikasi. Hitungan perubahan diisi ke `report`.
+    """
+    if chunks is None:
+        chunks = iter_row_chunks(source, columns, chunk_size, max_rows)
+    report = report if report is not None else IncrementalReport()
+    scope = EncryptionIndex.scope(dataset, key, padding_method)
+
+    conn = index.connect()
+    completed = False
+    try:
+        previous = dict(conn.execute("SELECT row_key, digest FROM encrypted_rows WHERE scope = ?", (scope,)))
+        seen = set()
+        occurrences = {}
+        start = 0
+        for headers, rows in traced_iter(chunks, "read", lambda chunk: len(chunk[1])):
+            if key_column not in headers:
+                raise ValueError(f"Kolom kunci '{key_column}' tidak ditemukan untuk mode inkremental")
+            key_position = headers.index(key_column)
+            with span("combine", rows=len(rows)):
+                combined = [ROW_SEPARATOR.join(row) for row in rows]
+
+            with span("diff", rows=len(rows)):
+                row_keys, digests, changed, reused = [], [], [], []
+                for i, (row, text) in enumerate(zip(rows, combined)):
+                    value = row[key_position].strip()
+                    occurrence = occurrences.get(value, 0)
+                    occurrences[value] = occurrence + 1
+                    row_key = value if occurrence == 0 else f"{value}#{occurrence}"
+                    digest = row_digest(text)
+                    row_keys.append(row_key)
+                    digests.append(digest)
+                    seen.add(row_key)
+                    old_digest = previous.get(row_key)
+                    if old_digest == digest:
+                        reused.append(i)
+                        report.unchanged += 1
+                    else:
+                        changed.append(i)
+                        if old_digest is None:
+                            report.inserted += 1
+                        else:
+                            report.updated += 1
+
+            with span("index_lookup", rows=len(reused)):
+                stored = _fetch_ciphertexts(conn, scope, [row_keys[i] for i in reused])
+
+            # Hanya baris baru/berubah yang melewati Reverse Cipher -> AES -> (verifikasi)
+            changed_texts = [combined[i] for i in changed]
+            _, changed_batch, _, changed_undo = round_trip_fn(
+                changed_texts, key, padding_method, verify=verify, on_error=on_error)
+
+            parts = [None] * len(rows)
+            for i in reused:
+                parts[i] = stored[row_keys[i]]
+            for position, i in enumerate(changed):
+                parts[i] = changed_batch.row(position)
+            offsets = [0]
+            for part in parts:
+                offsets.append(offsets[-1] + len(part))
+            batch = BatchCiphertext(b"".join(parts), offsets)
+
+            with span("index_write", rows=len(changed)):
+                with conn:
+                    conn.execute("BEGIN IMMEDIATE")
+                    conn.executemany(
+                        "INSERT OR REPLACE INTO encrypted_rows (scope, row_key, digest, ciphertext) "
+                        "VALUES (?, ?, ?, ?)",
+                        [(scope, row_keys[i], digests[i], parts[i]) for i in changed])
+
+            chunk = {
+                "start": start,
+                "headers": headers,
+                "original": rows,
+                "combined": combined,
+                "reversed_encrypt": [reverse_cipher(text) for text in combined],
+                "batch": batch,
+                "changed": changed,
+                "reused": reused,
+            }
+            if verify:
+                # Baris yang dipakai ulang tidak didekripsi ulang, sehingga tidak dihitung sebagai terverifikasi
+                chunk["checked_rows"] = changed
+                chunk["mismatches"] = {i: changed_undo[position] for position, i in enumerate(changed)
+                                       if changed_undo[position] != combined[i]}
+            start += len(rows)
+            yield chunk
+
+        # Bila hanya sebagian file yang dibaca (max_rows), baris lain tidak boleh dianggap terhapus
+        report.partial = max_rows is not None and start >= max_rows
+        deleted = [] if report.partial else [row_key for row_key in previous if row_key not in seen]
+        with conn:
+            conn.execute("BEGIN IMMEDIATE")
+            conn.executemany("DELETE FROM encrypted_rows WHERE scope = ? AND row_key = ?",
+                             [(scope, row_key) for row_key in deleted])
+        report.deleted = len(deleted)
+        completed = True
+    finally:
+        conn.close()
+        report.complete = completed
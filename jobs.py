@@ -0,0 +1,123 @@
+import itertools
+import threading
+import time
+import traceback
+
+# ========== KONSTANTA ==========
+STATE_QUEUED = "menunggu"
+STATE_RUNNING = "berjalan"
+STATE_DONE = "selesai"
+STATE_FAILED = "gagal"
+STATE_CANCELLED = "dibatalkan"
+ACTIVE_STATES = (STATE_QUEUED, STATE_RUNNING)
+# Pesan worker yang disimpan per job; sisanya hanya dihitung (file dengan kunci salah bisa gagal di setiap baris)
+MAX_MESSAGES = 20
+
+_job_ids = itertools.count(1)
+
+# ========== JOB LATAR BELAKANG ==========
+
+class JobCancelled(Exception):
+    """Dilempar dari job.update() saat job diminta berhenti"""
+
+class Job:
+    """Satu pekerjaan panjang di thread terpisah, dengan progres per chunk dan pembatalan kooperatif"""
+
+    def __init__(self, label, total_rows):
+        self.id = next(_job_ids)
+        self.label = label
+        self.total_rows = total_rows
+        self.state = STATE_QUEUED
+        self.rows_done = 0
+        self.created = time.time()
+        self.started = None
+        self.finished = None
+        self.result = None
+        # Progres rinci yang dibaca UI selama job berjalan (mis. IngestReport per file/sheet)
+        self.details = None
+        self.error = None
+        self.messages = []
+        self.message_count = 0
+        self.collected = False
+        self._cancel = threading.Event()
+        self._lock = threading.Lock()
+        self.thread = None
+
+    @property
+    def is_active(self):
+        return self.state in ACTIVE_STATES
+
+    @property
+    def elapsed(self):
+        if self.started is None:
+            return 0.0
+        return (self.finished or time.time()) - self.started
+
+    @property
+    def rows_per_s(self):
+        elapsed = self.elapsed
+        return self.rows_done / elapsed if elapsed > 0 else 0.0
+
+    @property
+    def eta_s(self):
+        """Perkiraan sisa waktu (detik) dari laju sejauh ini, None bila belum bisa diperkirakan"""
+        rate = self.rows_per_s
+        if not self.is_active or rate <= 0 or not self.total_rows:
+            return None
+        return max(self.total_rows - self.rows_done, 0) / rate
+
+    @property
+    def fraction(self):
+        if self.state == STATE_DONE:
+            return 1.0
+        return min(self.rows_done / self.total_rows, 1.0) if self.total_rows else 0.0
+
+    @property
+    def cancel_requested(self):
+        return self._cancel.is_set()
+
+    def cancel(self):
+        """Meminta job berhenti di titik pemeriksaan berikutnya (antar chunk)"""
+        self._cancel.set()
+
+    def update(self, rows_done):
+        """Dipanggil worker setelah setiap chunk; sekaligus titik pembatalan"""
+        self.rows_done = rows_done
+        if self._cancel.is_set():
+            raise JobCancelled()
+
+    def log(self, message):
+        """Pesan (mis. error dekripsi) dari worker, ditampilkan di UI setelahnya; hanya MAX_MESSAGES pertama disimpan"""
+        with self._lock:
+            self.message_count += 1
+            if len(self.messages) < MAX_MESSAGES:
+                self.messages.append(message)
+
+    @property
+    def dropped_messages(self):
+        return self.message_count - len(self.messages)
+
+    def _run(self, fn, args, kwargs):
+        self.state = STATE_RUNNING
+        self.started = time.time()
+        try:
+            self.result = fn(self, *args, **kwargs)
+            self.state = STATE_DONE
+        except JobCancelled:
+            self.state = STATE_CANCELLED
+        except Exception as e:
+            self.error = f"{type(e).__name__}: {e}"
+            # Traceback selalu disimpan, meskipun batas pesan sudah tercapai
+            with self._lock:
+                self.message_count += 1
+                self.messages.append(traceback.format_exc())
+            self.state = STATE_FAILED
+        finally:
+            self.finished = time.time()
+
+def start_job(label, total_rows, fn, *args, **kwargs):
+    """Menjalankan fn(job, *args, **kwargs) di thread daemon dan mengembalikan Job-nya"""
+    job = Job(label, total_rows)
+    job.thread = threading.Thread(target=job._run, args=(fn, args, kwargs), name=f"job-{job.id}", daemon=True)
+    job.thread.start()
+    return job
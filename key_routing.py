@@ -0,0 +1,343 @@
+import csv
+import io
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from aes_batch import (BatchCiphertext, aes_encrypt_batch, aes_decrypt_batch, ecb_cipher, PADDING_PKCS7, PADDING_GCM,
+                       ERROR_LABELS, padding_family)
+from pipeline import (TARGET_COLUMNS, ROW_SEPARATOR, DEFAULT_CHUNK_SIZE, CIPHERTEXT_COLUMN, normalize_key,
+                      iter_row_chunks, reverse_cipher, reverse_cipher_undo, split_plaintext, _chunk_rows)
+from tracing import span, traced_iter
+
+# ========== KONSTANTA ==========
+ROUTE_COLUMNS = ["Customer Name", "GroupDesc"]
+KEY_ID_COLUMN = "Key ID"
+# Key ID kunci utama (dipakai nilai rute tanpa kunci sendiri bila fallback diaktifkan)
+DEFAULT_KEY_ID = "utama"
+DEFAULT_POOL_SIZE = 4096
+
+class KeyMapError(ValueError):
+    """File kunci tidak valid atau ada nilai rute yang tidak punya kunci"""
+
+# ========== FILE KUNCI ==========
+
+class KeyMap(dict):
+    """Nilai rute -> kunci, dengan Key ID per kunci di `ids` (kunci -> Key ID)
+
+    Key ID berasal dari file kunci, bukan dari kunci itu sendiri, sehingga aman disimpan di samping
+    ciphertext: hash kunci yang dipublikasikan memungkinkan tebakan kunci diuji secara offline.
+    """
+
+    def __init__(self, pairs, ids):
+        super().__init__(pairs)
+        self.ids = ids
+
+def _key_ids(entries):
+    """Key ID per kunci: ID eksplisit dari file, atau nomor urut kunci (K1, K2, ...) sesuai urutan file"""
+    ids = {}
+    for _, key, key_id in entries:
+        if key_id:
+            if ids.get(key, key_id) != key_id:
+                raise KeyMapError(f"Satu kunci memiliki dua Key ID berbeda ({ids[key]!r} dan {key_id!r})")
+            ids[key] = key_id
+    ordinal = 0
+    for _, key, _ in entries:
+        if key not in ids:
+            ordinal += 1
+            ids[key] = f"K{ordinal}"
+    used = {}
+    for key, key_id in ids.items():
+        if key_id == DEFAULT_KEY_ID:
+            raise KeyMapError(f"Key ID {DEFAULT_KEY_ID!r} dicadangkan untuk kunci utama")
+        if used.setdefault(key_id, key) != key:
+            raise KeyMapError(f"Key ID {key_id!r} dipakai lebih dari satu kunci")
+    return ids
+
+def load_key_map(source):
+    """Membaca file kunci lokal: .json {nilai: kunci} atau .csv (nilai, kunci) dengan header
+
+    Key ID dapat ditulis di file: .json {nilai: {"key": kunci, "id": key_id}} atau kolom ketiga .csv. Tanpa
+    Key ID eksplisit dipakai nomor urut kunci dalam file, sehingga dekripsi harus memakai file kunci yang sama.
+    Kunci dinormalisasi ke 16 karakter seperti kunci tunggal aplikasi.
+    """
+    name = source if isinstance(source, str) else getattr(source, "name", "")
+    if isinstance(source, str):
+        with open(source, "rb") as f:
+            data = f.read()
+    else:
+        data = source.getvalue() if hasattr(source, "getvalue") else source.read()
+    text = data.decode("utf-8-sig")
+    if os.path.splitext(name)[1].lower() == ".json":
+        try:
+            mapping = json.loads(text)
+        except json.JSONDecodeError as e:
+            raise KeyMapError(f"File kunci JSON tidak valid: {e}")
+        if not isinstance(mapping, dict):
+            raise KeyMapError("File kunci JSON harus berupa objek {nilai: kunci}")
+        entries = []
+        for value, entry in mapping.items():
+            if isinstance(entry, dict):
+                if "key" not in entry:
+                    raise KeyMapError(f"Entri {value!r} pada file kunci JSON tidak memiliki \"key\"")
+                entries.append((value, entry["key"], entry.get("id")))
+            else:
+                entries.append((value, entry, None))
+    else:
+        rows = list(csv.reader(io.StringIO(text)))
+        if any(len(row) < 2 for row in rows[1:] if row):
+            raise KeyMapError("File kunci CSV harus memiliki dua kolom: nilai, kunci (kolom ketiga opsional: Key ID)")
+        entries = [(row[0], row[1], row[2] if len(row) > 2 else None) for row in rows[1:] if row]
+    entries = [(str(value).strip(), normalize_key(str(key)), str(key_id).strip() if key_id else None)
+               for value, key, key_id in entries]
+    if not entries:
+        raise KeyMapError("File kunci kosong")
+    invalid = [value for value, key, _ in entries if len(key.encode("utf-8")) != 16]
+    if invalid:
+        raise KeyMapError(f"Kunci untuk {len(invalid)} nilai bukan 16 byte UTF-8 (mis. {invalid[0]!r}); "
+                          "gunakan karakter ASCII")
+    return KeyMap(((value, key) for value, key, _ in entries), _key_ids(entries))
+
+def key_id_of(key_map, key):
+    """Key ID yang ditulis di samping ciphertext untuk kunci ini (kunci utama: DEFAULT_KEY_ID)"""
+    return key_map.ids.get(key, DEFAULT_KEY_ID)
+
+def keys_by_id(key_map, default_key=None):
+    """Key ID -> kunci, untuk dekripsi file yang menyimpan kolom Key ID"""
+    keys = {key_id: key for key, key_id in key_map.ids.items()}
+    if default_key is not None:
+        keys[DEFAULT_KEY_ID] = default_key
+    return keys
+
+# ========== POOL CIPHER PER KUNCI ==========
+
+class CipherPool:
+    """Pool LRU terbatas: kunci -> objek AES-ECB (key schedule) yang dipakai ulang antar batch
+
+    Objek ECB tidak menyimpan state antar panggilan sehingga aman dipakai ulang untuk banyak batch.
+    """
+
+    def __init__(self, max_entries=DEFAULT_POOL_SIZE):
+        self.max_entries = max_entries
+        self.ciphers = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.ciphers)
+
+    def get(self, key):
+        with self._lock:
+            cipher = self.ciphers.get(key)
+            if cipher is not None:
+                self.ciphers.move_to_end(key)
+                self.hits += 1
+                return cipher
+            self.misses += 1
+            cipher = self.ciphers[key] = ecb_cipher(key)
+            while len(self.ciphers) > self.max_entries:
+                self.ciphers.popitem(last=False)
+                self.evictions += 1
+            return cipher
+
+    def clear(self):
+        with self._lock:
+            self.ciphers.clear()
+            self.hits = self.misses = self.evictions = 0
+
+    @property
+    def hit_rate(self):
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+# ========== LAPORAN PER KUNCI ==========
+
+class KeyUsageReport:
+    """Jumlah baris, nilai rute dan waktu enkripsi/dekripsi per kunci (dicatat lewat Key ID, bukan kuncinya)"""
+
+    def __init__(self):
+        self.keys = {}
+        self.unmapped_rows = 0
+
+    def _entry(self, key_id):
+        entry = self.keys.get(key_id)
+        if entry is None:
+            entry = self.keys[key_id] = {"values": set(), "rows": 0, "batches": 0,
+                                         "encrypt_s": 0.0, "decrypt_s": 0.0}
+        return entry
+
+    def add(self, key_id, values, rows, encrypt_s=0.0, decrypt_s=0.0):
+        entry = self._entry(key_id)
+        entry["values"].update(values)
+        entry["rows"] += rows
+        entry["batches"] += 1
+        entry["encrypt_s"] += encrypt_s
+        entry["decrypt_s"] += decrypt_s
+
+    def rows(self):
+        """Ringkasan per kunci, diurutkan dari jumlah baris terbanyak"""
+        summary = []
+        for key_id, entry in self.keys.items():
+            elapsed = entry["encrypt_s"] + entry["decrypt_s"]
+            summary.append({
+                "key_id": key_id,
+                "values": len(entry["values"]),
+                "rows": entry["rows"],
+                "batches": entry["batches"],
+                "encrypt_ms": entry["encrypt_s"] * 1000,
+                "decrypt_ms": entry["decrypt_s"] * 1000,
+                "rows_per_s": entry["rows"] / elapsed if elapsed > 0 else None,
+            })
+        return sorted(summary, key=lambda row: row["rows"], reverse=True)
+
+# ========== RUTE BARIS KE KUNCI ==========
+
+def route_keys(route_values, key_map, default_key=None):
+    """Kunci untuk setiap baris berdasarkan nilai kolom rute; tanpa default, nilai tak dikenal adalah error"""
+    keys = []
+    missing = set()
+    for value in route_values:
+        key = key_map.get(value.strip(), default_key)
+        if key is None:
+            missing.add(value)
+        keys.append(key)
+    if missing:
+        sample = ", ".join(repr(value) for value in sorted(missing)[:5])
+        raise KeyMapError(f"{len(missing)} nilai rute tidak ada di file kunci (mis. {sample})")
+    return keys
+
+def _group_by_key(keys):
+    """Nomor baris per kunci, urutan kemunculan pertama dipertahankan"""
+    groups = {}
+    for i, key in enumerate(keys):
+        groups.setdefault(key, []).append(i)
+    return groups
+
+def _scatter(parts, count):
+    """Menyusun ulang ciphertext per grup (list (indeks, BatchCiphertext)) ke urutan baris asli"""
+    rows = [None] * count
+    for indices, batch in parts:
+        for position, i in enumerate(indices):
+            rows[i] = batch.row(position)
+    offsets = [0]
+    for row in rows:
+        offsets.append(offsets[-1] + len(row))
+    return BatchCiphertext(b"".join(rows), offsets)
+
+def multi_key_round_trip(texts, keys, route_values, padding_method=PADDING_PKCS7, verify=True, on_error=None,
+                         pool=None, report=None, key_ids=None):
+    """Seperti round_trip, tetapi setiap grup baris berkunci sama dienkripsi sebagai satu batch
+
+    Objek cipher diambil dari `pool` (kecuali GCM yang membutuhkan objek baru per nonce). `key_ids`
+    (kunci -> Key ID) menentukan label kunci pada `report`.
+    """
+    with span("reverse", rows=len(texts)):
+        reversed_texts = [reverse_cipher(text) for text in texts]
+    groups = _group_by_key(keys)
+    parts = []
+    decrypted_aes = [None] * len(texts) if verify else None
+    with span("encrypt_multi_key", rows=len(texts), keys=len(groups)):
+        for key, indices in groups.items():
+            cipher = pool.get(key) if pool is not None and padding_method != PADDING_GCM else None
+            start = time.perf_counter()
+            batch = aes_encrypt_batch([reversed_texts[i] for i in indices], key, padding_method, cipher=cipher)
+            encrypt_s = time.perf_counter() - start
+            decrypt_s = 0.0
+            if verify:
+                start = time.perf_counter()
+                for i, text in zip(indices, aes_decrypt_batch(batch, key, padding_method, on_error, cipher=cipher)):
+                    decrypted_aes[i] = text
+                decrypt_s = time.perf_counter() - start
+            parts.append((indices, batch))
+            if report is not None:
+                key_id = (key_ids or {}).get(key, DEFAULT_KEY_ID)
+                report.add(key_id, {route_values[i] for i in indices}, len(indices), encrypt_s, decrypt_s)
+    batch = _scatter(parts, len(texts))
+    if not verify:
+        return reversed_texts, batch, None, None
+    with span("reverse_undo", rows=len(texts)):
+        return reversed_texts, batch, decrypted_aes, [reverse_cipher_undo(text) for text in decrypted_aes]
+
+def stream_multi_key_pipeline(source, key_map, padding_method=PADDING_PKCS7, route_column=ROUTE_COLUMNS[0],
+                              columns=TARGET_COLUMNS, chunk_size=DEFAULT_CHUNK_SIZE, max_rows=None, verify=True,
+                              on_error=None, default_key=None, pool=None, report=None, chunks=None):
+    """Pipeline per chunk seperti stream_pipeline dengan kunci per baris dari kolom `route_column`
+
+    Chunk juga berisi "row_keys" (kunci per baris, untuk verifikasi sampel) dan "key_ids" (Key ID per baris,
+    dari file kunci; lihat KeyMap).
+    """
+    if chunks is None:
+        chunks = iter_row_chunks(source, columns, chunk_size, max_rows)
+    pool = pool if pool is not None else CipherPool()
+    start = 0
+    for headers, rows in traced_iter(chunks, "read", _chunk_rows):
+        if route_column not in headers:
+            raise KeyMapError(f"Kolom rute '{route_column}' tidak ditemukan pada file masukan")
+        position = headers.index(route_column)
+        route_values = [row[position] for row in rows]
+        keys = route_keys(route_values, key_map, default_key)
+        if report is not None:
+            report.unmapped_rows += sum(1 for value in route_values if value.strip() not in key_map)
+        with span("combine", rows=len(rows)):
+            combined = [ROW_SEPARATOR.join(row) for row in rows]
+        reversed_texts, batch, decrypted_aes, reversed_decrypt = multi_key_round_trip(
+            combined, keys, route_values, padding_method, verify, on_error, pool, report, key_map.ids)
+        chunk = {
+            "start": start,
+            "headers": headers,
+            "original": rows,
+            "combined": combined,
+            "reversed_encrypt": reversed_texts,
+            "batch": batch,
+            "row_keys": keys,
+            "key_ids": [key_id_of(key_map, key) for key in keys],
+        }
+        if verify:
+            chunk["decrypted_aes"] = decrypted_aes
+            chunk["reversed_decrypt"] = reversed_decrypt
+        start += len(rows)
+        yield chunk
+
+def stream_multi_key_decrypt_pipeline(source, keys_by_key_id, padding_method=PADDING_PKCS7, columns=TARGET_COLUMNS,
+                                      chunk_size=DEFAULT_CHUNK_SIZE, max_rows=None, on_error=None, pool=None,
+                                      report=None, chunks=None):
+    """Dekripsi saja untuk file berisi kolom ciphertext dan Key ID (hasil enkripsi multi-kunci)"""
+    if chunks is None:
+        chunks = iter_row_chunks(source, [CIPHERTEXT_COLUMN, KEY_ID_COLUMN], chunk_size, max_rows)
+    pool = pool if pool is not None else CipherPool()
+    error_value = ERROR_LABELS[padding_family(padding_method)][1]
+    start = 0
+    for headers, rows in traced_iter(chunks, "read", _chunk_rows):
+        if headers != [CIPHERTEXT_COLUMN, KEY_ID_COLUMN]:
+            raise KeyMapError(f"File masukan harus memiliki kolom '{CIPHERTEXT_COLUMN}' dan '{KEY_ID_COLUMN}'")
+        unknown = {row[1] for row in rows if row[1] not in keys_by_key_id}
+        if unknown:
+            raise KeyMapError(f"{len(unknown)} Key ID tidak ada di file kunci (mis. {sorted(unknown)[0]})")
+        batch, _ = BatchCiphertext.from_hex_rows([row[0] for row in rows])
+        decrypted_aes = [None] * len(rows)
+        with span("decrypt_multi_key", rows=len(rows)):
+            for key_id, indices in _group_by_key([row[1] for row in rows]).items():
+                key = keys_by_key_id[key_id]
+                cipher = pool.get(key) if padding_method != PADDING_GCM else None
+                started = time.perf_counter()
+                texts = aes_decrypt_batch(batch.take(indices), key, padding_method, on_error, cipher=cipher)
+                for i, text in zip(indices, texts):
+                    decrypted_aes[i] = text
+                if report is not None:
+                    report.add(key_id, (), len(indices), decrypt_s=time.perf_counter() - started)
+        with span("reverse_undo", rows=len(rows)):
+            plaintexts = [reverse_cipher_undo(text) for text in decrypted_aes]
+            original = [split_plaintext(text, len(columns)) for text in plaintexts]
+        yield {
+            "start": start,
+            "headers": list(columns),
+            "original": original,
+            "combined": plaintexts,
+            "batch": batch,
+            "checked_rows": range(len(rows)),
+            "mismatches": {i: text for i, text in enumerate(decrypted_aes) if text == error_value},
+        }
+        start += len(rows)
@@ -0,0 +1,168 @@
+import math
+import os
+from contextlib import contextmanager
+from functools import partial
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from aes_batch import BatchCiphertext, aes_encrypt_batch, aes_decrypt_batch, PADDING_PKCS7
+from pipeline import round_trip
+from tracing import submit_traced
+
+# ========== KONSTANTA ==========
+EXECUTOR_SERIAL = "Serial"
+EXECUTOR_THREAD = "Paralel (Thread)"
+EXECUTOR_PROCESS = "Paralel (Process)"
+EXECUTOR_CHOICES = (EXECUTOR_SERIAL, EXECUTOR_THREAD, EXECUTOR_PROCESS)
+DEFAULT_SHARD_SIZE = 2000
+
+# ========== KONFIGURASI ==========
+
+class ParallelConfig:
+    """Pengaturan eksekusi paralel: jenis executor, jumlah worker dan ukuran shard"""
+
+    def __init__(self, executor=EXECUTOR_THREAD, workers=None, shard_size=DEFAULT_SHARD_SIZE):
+        self.executor = executor
+        self.workers = max(1, int(workers or os.cpu_count() or 1))
+        self.shard_size = max(1, int(shard_size))
+
+    @property
+    def is_parallel(self):
+        return self.executor != EXECUTOR_SERIAL and self.workers > 1
+
+    @property
+    def chunk_size(self):
+        """Ukuran chunk streaming yang cukup untuk mengisi semua worker"""
+        return self.shard_size * self.workers
+
+    def make_executor(self):
+        if self.executor == EXECUTOR_PROCESS:
+            return ProcessPoolExecutor(max_workers=self.workers)
+        return ThreadPoolExecutor(max_workers=self.workers)
+
+    def for_rows(self, count):
+        """Salinan konfigurasi dengan shard cukup kecil agar `count` baris terbagi ke semua worker
+
+        Ukuran shard = ceil(count / workers), dibatasi shard_size sebagai batas atas.
+        """
+        shard_size = min(self.shard_size, max(1, math.ceil(count / self.workers)))
+        return ParallelConfig(self.executor, self.workers, shard_size)
+
+# ========== FUNGSI SHARD (dijalankan di worker) ==========
+
+def _shard_bounds(count, shard_size):
+    """Membagi indeks [0, count) menjadi rentang shard berurutan"""
+    return [(start, min(start + shard_size, count)) for start in range(0, count, shard_size)]
+
+def _encrypt_shard(texts, key, padding_method):
+    return aes_encrypt_batch(texts, key, padding_method)
+
+def _decrypt_shard(batch, key, padding_method):
+    errors = []
+    return aes_decrypt_batch(batch, key, padding_method, on_error=errors.append), errors
+
+def _round_trip_shard(texts, key, padding_method, verify):
+    errors = []
+    return round_trip(texts, key, padding_method, verify=verify, on_error=errors.append) + (errors,)
+
+def _noop(_):
+    return None
+
+def _report_errors(errors, on_error):
+    if on_error is not None:
+        for message in errors:
+            on_error(message)
+
+# ========== API PARALEL ==========
+
+@contextmanager
+def _pool_scope(config, pool):
+    """Memakai `pool` yang sudah terbuka, atau membuat (lalu menutup) executor sementara"""
+    if pool is not None:
+        yield pool
+        return
+    with config.make_executor() as owned_pool:
+        yield owned_pool
+
+def parallel_encrypt(texts, key, padding_method=PADDING_PKCS7, config=None, pool=None):
+    """Enkripsi AES batch per shard secara paralel, hasil digabung sesuai urutan baris
+
+    `pool` dapat diisi executor yang sudah terbuka (lihat open_pool) agar startup worker tidak ikut terukur.
+    """
+    if config is None or not config.is_parallel:
+        return aes_encrypt_batch(texts, key, padding_method)
+    bounds = _shard_bounds(len(texts), config.shard_size)
+    with _pool_scope(config, pool) as executor:
+        futures = [submit_traced(executor, _encrypt_shard, texts[a:b], key, padding_method) for a, b in bounds]
+        return BatchCiphertext.concat([future.result() for future in futures])
+
+def parallel_decrypt(batch, key, padding_method=PADDING_PKCS7, config=None, on_error=None, pool=None):
+    """Dekripsi AES batch per shard secara paralel, hasil digabung sesuai urutan baris (`pool` seperti
+    parallel_encrypt)"""
+    if config is None or not config.is_parallel:
+        return aes_decrypt_batch(batch, key, padding_method, on_error=on_error)
+    if not isinstance(batch, BatchCiphertext):
+        hex_rows = batch
+        batch, invalid = BatchCiphertext.from_hex_rows(hex_rows)
+        if invalid:
+            # Baris hex tidak valid ditangani (dan dilaporkan) oleh jalur serial
+            return aes_decrypt_batch(hex_rows, key, padding_method, on_error=on_error)
+    bounds = _shard_bounds(len(batch), config.shard_size)
+    results = []
+    with _pool_scope(config, pool) as executor:
+        futures = [submit_traced(executor, _decrypt_shard, batch.slice(a, b), key, padding_method) for a, b in bounds]
+        for future in futures:
+            decrypted, errors = future.result()
+            _report_errors(errors, on_error)
+            results.extend(decrypted)
+    return results
+
+def parallel_round_trip(texts, key, padding_method=PADDING_PKCS7, config=None, verify=True, on_error=None,
+                        pool=None):
+    """Reverse -> AES -> (opsional) dekripsi -> Reverse Undo per shard dalam satu kali kirim ke worker
+
+    `pool` dapat diisi executor yang sudah terbuka agar dipakai ulang antar chunk streaming.
+    """
+    if config is None or not config.is_parallel:
+        return round_trip(texts, key, padding_method, verify=verify, on_error=on_error)
+
+    bounds = _shard_bounds(len(texts), config.shard_size)
+    owned_pool = pool is None
+    pool = config.make_executor() if owned_pool else pool
+    try:
+        futures = [submit_traced(pool, _round_trip_shard, texts[a:b], key, padding_method, verify) for a, b in bounds]
+        shard_results = [future.result() for future in futures]
+    finally:
+        if owned_pool:
+            pool.shutdown()
+
+    reversed_texts, batches, decrypted_aes, reversed_decrypt = [], [], [], []
+    for shard_reversed, shard_batch, shard_decrypted, shard_undo, errors in shard_results:
+        _report_errors(errors, on_error)
+        reversed_texts.extend(shard_reversed)
+        batches.append(shard_batch)
+        if verify:
+            decrypted_aes.extend(shard_decrypted)
+            reversed_decrypt.extend(shard_undo)
+
+    batch = BatchCiphertext.concat(batches)
+    if not verify:
+        return reversed_texts, batch, None, None
+    return reversed_texts, batch, decrypted_aes, reversed_decrypt
+
+@contextmanager
+def open_pool(config=None):
+    """Executor yang dibuat sekali dan sudah dipanaskan (semua worker sudah berjalan), None untuk serial"""
+    if config is None or not config.is_parallel:
+        yield None
+        return
+    with config.make_executor() as pool:
+        list(pool.map(_noop, range(config.workers)))
+        yield pool
+
+@contextmanager
+def open_round_trip(config=None):
+    """Menyediakan fungsi round trip untuk stream_pipeline, dengan pool yang dipakai ulang antar chunk"""
+    if config is None or not config.is_parallel:
+        yield round_trip
+        return
+    with config.make_executor() as pool:
+        yield partial(parallel_round_trip, config=config, pool=pool)
@@ -0,0 +1,270 @@
+import os
+import math
+import random
+import hashlib
+import pandas as pd
+import openpyxl
+from aes_batch import (BatchCiphertext, aes_encrypt_batch, aes_decrypt_batch, PADDING_PKCS7, ERROR_LABELS,
+                       padding_family)
+from tracing import span, traced_iter
+
+# ========== KONSTANTA ==========
+KEY = "KRIPTOGRAFIAESKU"[:16]
+TARGET_COLUMNS = ["GroupDesc", "Customer Name", "MaterialNumber", "Catalog Data", "MaterialDesc"]
+ROW_SEPARATOR = " || "
+DEFAULT_CHUNK_SIZE = 5000
+CIPHERTEXT_COLUMN = "Ciphertext AES"
+
+# Mode pipeline: round-trip penuh memverifikasi setiap baris, verifikasi sampel hanya sebagian acak
+PIPELINE_ROUND_TRIP = "Round-trip penuh"
+PIPELINE_ENCRYPT = "Enkripsi saja"
+PIPELINE_DECRYPT = "Dekripsi saja"
+PIPELINE_SAMPLED = "Verifikasi sampel"
+PIPELINE_MODES = (PIPELINE_ROUND_TRIP, PIPELINE_ENCRYPT, PIPELINE_DECRYPT, PIPELINE_SAMPLED)
+DEFAULT_SAMPLE_FRACTION = 0.05
+
+# ========== FUNGSI UTILITAS KRIPTOGRAFI ==========
+
+def reverse_cipher(text):
+    """Membalik urutan karakter dalam teks"""
+    if not text or text.strip() == "":
+        return "N/A"
+    return text[::-1]
+
+def reverse_cipher_undo(text):
+    """Mengembalikan teks yang telah dibalik ke bentuk semula"""
+    return text[::-1]
+
+def normalize_key(key):
+    """Memotong/menambah kunci menjadi tepat 16 karakter untuk AES-128"""
+    return key[:16].ljust(16, '\0')
+
+def split_plaintext(text, width):
+    """Memecah teks hasil dekripsi kembali menjadi nilai per kolom"""
+    row = text.split(ROW_SEPARATOR)
+    if len(row) == width:
+        return row
+    return [text] + [""] * (width - 1)
+
+def key_fingerprint(key):
+    """Sidik jari kunci (bukan kunci itu sendiri) untuk memisahkan indeks/cache per kunci"""
+    return hashlib.sha256(b"skripsi-index\x00" + key.encode("utf-8")).hexdigest()[:16]
+
+# ========== PEMBACAAN DATA ==========
+
+def read_table(source, max_rows=None):
+    """Membaca file .xlsx atau .csv (path atau objek file) menjadi DataFrame"""
+    name = source if isinstance(source, str) else getattr(source, "name", "")
+    if os.path.splitext(name)[1].lower() == ".csv":
+        return pd.read_csv(source, nrows=max_rows, dtype=str)
+    return pd.read_excel(source, engine='openpyxl', nrows=max_rows)
+
+def project_columns(df, columns=TARGET_COLUMNS, max_rows=None):
+    """Memilih kolom target yang tersedia dan mengubah semua nilai menjadi string"""
+    with span("project", rows=len(df)):
+        df = df[[col for col in columns if col in df.columns]].fillna("").astype(str)
+        if max_rows is not None:
+            df = df.head(max_rows)
+        return df
+
+def combine_rows(df):
+    """Menggabungkan nilai setiap baris menjadi satu teks dengan pemisah ' || '"""
+    return [ROW_SEPARATOR.join(str(item) for item in row) for row in df.itertuples(index=False, name=None)]
+
+def _cell_to_text(value):
+    """Mengubah nilai sel menjadi string (sel kosong menjadi string kosong)"""
+    return "" if value is None else str(value)
+
+def _iter_excel_rows(source, sheet=None):
+    """Iterasi baris satu sheet (default: sheet pertama) lewat mode read-only openpyxl (header lalu data)"""
+    workbook = openpyxl.load_workbook(source, read_only=True, data_only=True)
+    try:
+        worksheet = workbook.worksheets[0] if sheet is None else workbook[sheet]
+        pending_empty = 0
+        for row in worksheet.iter_rows(values_only=True):
+            # Baris kosong di akhir sheet dibuang, sama seperti pd.read_excel
+            if all(value is None for value in row):
+                pending_empty += 1
+                continue
+            for _ in range(pending_empty):
+                yield ()
+            pending_empty = 0
+            yield row
+    finally:
+        workbook.close()
+
+def iter_row_chunks(source, columns=TARGET_COLUMNS, chunk_size=DEFAULT_CHUNK_SIZE, max_rows=None, sheet=None):
+    """Membaca kolom target per chunk tanpa mem-parsing seluruh file, menghasilkan (headers, rows)
+
+    `sheet` memilih sheet .xlsx berdasarkan nama (default: sheet pertama); diabaikan untuk .csv.
+    """
+    name = source if isinstance(source, str) else getattr(source, "name", "")
+    if hasattr(source, "seek"):
+        source.seek(0)
+    if os.path.splitext(name)[1].lower() == ".csv":
+        for df in pd.read_csv(source, nrows=max_rows, dtype=str, chunksize=chunk_size):
+            df = project_columns(df, columns)
+            yield df.columns.tolist(), df.values.tolist()
+        return
+
+    rows = _iter_excel_rows(source, sheet)
+    header = [_cell_to_text(value) for value in next(rows, ())]
+    positions = [(col, header.index(col)) for col in columns if col in header]
+    headers = [col for col, _ in positions]
+
+    chunk = []
+    count = 0
+    for row in rows:
+        if max_rows is not None and count >= max_rows:
+            break
+        chunk.append([_cell_to_text(row[i]) if i < len(row) else "" for _, i in positions])
+        count += 1
+        if len(chunk) >= chunk_size:
+            yield headers, chunk
+            chunk = []
+    if chunk:
+        yield headers, chunk
+
+def file_digest(source):
+    """SHA-256 isi file (path atau objek file) sebagai kunci cache"""
+    digest = hashlib.sha256()
+    if isinstance(source, str):
+        with open(source, "rb") as f:
+            for block in iter(lambda: f.read(1 << 20), b""):
+                digest.update(block)
+    else:
+        position = source.tell()
+        source.seek(0)
+        for block in iter(lambda: source.read(1 << 20), b""):
+            digest.update(block)
+        source.seek(position)
+    return digest.hexdigest()
+
+def load_combined_texts(source, columns=TARGET_COLUMNS, max_rows=None, chunks=None):
+    """Membaca kolom target sekali dan mengembalikan (headers, rows, teks gabungan per baris)
+
+    `chunks` dapat diisi iterator (headers, rows) lain, misalnya dari cache workbook.
+    """
+    if chunks is None:
+        chunks = iter_row_chunks(source, columns, max_rows=max_rows)
+    headers, rows = list(columns), []
+    for headers, chunk in traced_iter(chunks, "read", _chunk_rows):
+        rows.extend(chunk)
+    with span("combine", rows=len(rows)):
+        combined = [ROW_SEPARATOR.join(row) for row in rows]
+    return headers, rows, combined
+
+def _chunk_rows(chunk):
+    """Jumlah baris dalam satu chunk (headers, rows)"""
+    return len(chunk[1])
+
+# ========== PIPELINE ==========
+
+def encrypt_texts(texts, key, padding_method=PADDING_PKCS7):
+    """Reverse Cipher lalu AES batch, mengembalikan teks terbalik dan BatchCiphertext"""
+    with span("reverse", rows=len(texts)):
+        reversed_texts = [reverse_cipher(text) for text in texts]
+    return reversed_texts, aes_encrypt_batch(reversed_texts, key, padding_method)
+
+def decrypt_texts(ciphertexts, key, padding_method=PADDING_PKCS7, on_error=None):
+    """AES batch lalu Reverse Undo, mengembalikan hasil dekripsi AES dan teks asli"""
+    decrypted_aes = aes_decrypt_batch(ciphertexts, key, padding_method, on_error=on_error)
+    with span("reverse_undo", rows=len(decrypted_aes)):
+        return decrypted_aes, [reverse_cipher_undo(text) for text in decrypted_aes]
+
+def round_trip(texts, key, padding_method=PADDING_PKCS7, verify=True, on_error=None):
+    """Reverse -> AES -> (opsional) dekripsi -> Reverse Undo untuk satu chunk secara serial"""
+    reversed_texts, batch = encrypt_texts(texts, key, padding_method)
+    if not verify:
+        return reversed_texts, batch, None, None
+    with span("verify", rows=len(texts)):
+        decrypted_aes, reversed_decrypt = decrypt_texts(batch, key, padding_method, on_error=on_error)
+    return reversed_texts, batch, decrypted_aes, reversed_decrypt
+
+def stream_pipeline(source, key, padding_method=PADDING_PKCS7, columns=TARGET_COLUMNS,
+                    chunk_size=DEFAULT_CHUNK_SIZE, max_rows=None, verify=True, on_error=None,
+                    round_trip_fn=round_trip, chunks=None):
+    """Pipeline generator per chunk: baca -> reverse -> AES -> (opsional) verifikasi dekripsi
+
+    `chunks` dapat diisi iterator (headers, rows) lain, misalnya dari cache workbook.
+    """
+    if chunks is None:
+        chunks = iter_row_chunks(source, columns, chunk_size, max_rows)
+    start = 0
+    for headers, rows in traced_iter(chunks, "read", _chunk_rows):
+        with span("combine", rows=len(rows)):
+            combined = [ROW_SEPARATOR.join(row) for row in rows]
+        reversed_texts, batch, decrypted_aes, reversed_decrypt = round_trip_fn(
+            combined, key, padding_method, verify=verify, on_error=on_error)
+        chunk = {
+            "start": start,
+            "headers": headers,
+            "original": rows,
+            "combined": combined,
+            "reversed_encrypt": reversed_texts,
+            "batch": batch,
+        }
+        if verify:
+            chunk["decrypted_aes"] = decrypted_aes
+            chunk["reversed_decrypt"] = reversed_decrypt
+        start += len(rows)
+        yield chunk
+
+def sample_verify(chunks, key, padding_method=PADDING_PKCS7, fraction=DEFAULT_SAMPLE_FRACTION, on_error=None,
+                  rng=None):
+    """Verifikasi sampel untuk chunk hasil pipeline tanpa verifikasi (verify=False)
+
+    Per chunk hanya `fraction` baris acak yang didekripsi, lalu hasilnya dibandingkan langsung dengan teks
+    gabungan asli yang masih ada di chunk. Chunk mendapat "checked_rows" (nomor baris dalam chunk yang
+    diperiksa) dan "mismatches" ({nomor baris: hasil dekripsi}) untuk baris yang hasilnya berbeda.
+    Bila chunk berisi "row_keys" (enkripsi multi-kunci), setiap baris sampel didekripsi dengan kuncinya.
+    """
+    rng = rng if rng is not None else random.Random()
+    for chunk in chunks:
+        combined = chunk["combined"]
+        sample = sorted(rng.sample(range(len(combined)), min(len(combined), math.ceil(len(combined) * fraction))))
+        with span("verify_sample", rows=len(sample)):
+            row_keys = chunk.get("row_keys")
+            if row_keys is None:
+                _, decrypted = decrypt_texts(chunk["batch"].take(sample), key, padding_method, on_error=on_error)
+            else:
+                decrypted = [None] * len(sample)
+                groups = {}
+                for position, i in enumerate(sample):
+                    groups.setdefault(row_keys[i], []).append(position)
+                for row_key, positions in groups.items():
+                    _, texts = decrypt_texts(chunk["batch"].take([sample[p] for p in positions]), row_key,
+                                             padding_method, on_error=on_error)
+                    for position, text in zip(positions, texts):
+                        decrypted[position] = text
+            chunk["checked_rows"] = sample
+            chunk["mismatches"] = {i: text for i, text in zip(sample, decrypted) if text != combined[i]}
+        yield chunk
+
+def stream_decrypt_pipeline(source, key, padding_method=PADDING_PKCS7, columns=TARGET_COLUMNS,
+                            chunk_size=DEFAULT_CHUNK_SIZE, max_rows=None, on_error=None, chunks=None):
+    """Pipeline dekripsi saja: kolom ciphertext hex -> AES -> Reverse Undo -> dipecah ke kolom target
+
+    Setiap baris diperiksa; baris yang gagal didekripsi dicatat di "mismatches" berisi label error-nya.
+    """
+    if chunks is None:
+        chunks = iter_row_chunks(source, [CIPHERTEXT_COLUMN], chunk_size, max_rows)
+    error_value = ERROR_LABELS[padding_family(padding_method)][1]
+    start = 0
+    for headers, rows in traced_iter(chunks, "read", _chunk_rows):
+        if not headers:
+            raise ValueError(f"Kolom '{CIPHERTEXT_COLUMN}' tidak ditemukan pada file masukan")
+        batch, _ = BatchCiphertext.from_hex_rows([row[0] for row in rows])
+        decrypted_aes, plaintexts = decrypt_texts(batch, key, padding_method, on_error=on_error)
+        with span("split", rows=len(plaintexts)):
+            original = [split_plaintext(text, len(columns)) for text in plaintexts]
+        yield {
+            "start": start,
+            "headers": list(columns),
+            "original": original,
+            "combined": plaintexts,
+            "batch": batch,
+            "checked_rows": range(len(rows)),
+            "mismatches": {i: text for i, text in enumerate(decrypted_aes) if text == error_value},
+        }
+        start += len(rows)
@@ -0,0 +1,103 @@
+import threading
+from collections import OrderedDict
+from aes_batch import BatchCiphertext, PADDING_PKCS7, NONCE_MODES
+from pipeline import reverse_cipher, round_trip, key_fingerprint
+from tracing import span
+
+# ========== KONSTANTA ==========
+DEFAULT_MEMO_ENTRIES = 100000
+
+# ========== CACHE LRU ==========
+
+class CiphertextMemo:
+    """Memo LRU terbatas: (sidik jari kunci, metode padding, teks baris) -> ciphertext dan hasil dekripsi
+
+    Hanya untuk metode padding berbasis ECB (PKCS#7, Fixed Length, Bucket): dengan kunci tetap ciphertext
+    adalah fungsi murni dari teks baris. CTR/GCM tidak pernah dimemo karena setiap baris wajib memakai
+    nonce acak sendiri.
+    """
+
+    def __init__(self, max_entries=DEFAULT_MEMO_ENTRIES):
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.entries)
+
+    def lookup(self, scope, texts, verify):
+        """Mengembalikan {teks: (ciphertext, decrypted_aes, reversed_decrypt)} untuk teks yang ada di memo"""
+        found = {}
+        with self._lock:
+            for text in texts:
+                entry = self.entries.get((scope, text))
+                if entry is None or (verify and entry[1] is None):
+                    self.misses += 1
+                    continue
+                self.entries.move_to_end((scope, text))
+                self.hits += 1
+                found[text] = entry
+        return found
+
+    def store(self, scope, items):
+        """Menyimpan pasangan (teks, (ciphertext, decrypted_aes, reversed_decrypt)) lalu membuang entri terlama"""
+        with self._lock:
+            for text, entry in items:
+                self.entries[(scope, text)] = entry
+                self.entries.move_to_end((scope, text))
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self.entries.clear()
+            self.hits = self.misses = self.evictions = 0
+
+    @property
+    def hit_rate(self):
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+# ========== ROUND TRIP DENGAN MEMO ==========
+
+def memo_round_trip(texts, key, padding_method=PADDING_PKCS7, verify=True, on_error=None, memo=None,
+                    inner=round_trip):
+    """round_trip dengan dedupe per chunk dan memo: hanya teks unik yang belum dikenal yang dienkripsi
+
+    Hasil teks unik disebar kembali ke semua baris duplikatnya. Error dekripsi dilaporkan sekali
+    per teks unik (saat pertama kali dihitung). Untuk NONCE_MODES dedupe dan memo dilewati: baris duplikat
+    harus tetap mendapat nonce (dan ciphertext) berbeda.
+    """
+    if padding_method in NONCE_MODES:
+        return inner(texts, key, padding_method, verify=verify, on_error=on_error)
+    with span("dedupe", rows=len(texts)) as current:
+        unique = list(dict.fromkeys(texts))
+        current.set(unique=len(unique))
+    scope = (key_fingerprint(key), padding_method)
+    known = memo.lookup(scope, unique, verify) if memo is not None else {}
+
+    missing = [text for text in unique if text not in known]
+    if missing:
+        _, batch, decrypted_aes, reversed_decrypt = inner(missing, key, padding_method, verify=verify,
+                                                          on_error=on_error)
+        computed = [(text, (batch.row(i), decrypted_aes[i] if verify else None,
+                            reversed_decrypt[i] if verify else None))
+                    for i, text in enumerate(missing)]
+        known.update(computed)
+        if memo is not None:
+            memo.store(scope, computed)
+
+    with span("fan_out", rows=len(texts)):
+        entries = [known[text] for text in texts]
+        offsets = [0]
+        for ciphertext, _, _ in entries:
+            offsets.append(offsets[-1] + len(ciphertext))
+        batch = BatchCiphertext(b"".join(entry[0] for entry in entries), offsets)
+        reversed_texts = [reverse_cipher(text) for text in texts]
+    if not verify:
+        return reversed_texts, batch, None, None
+    return reversed_texts, batch, [entry[1] for entry in entries], [entry[2] for entry in entries]
@@ -2,209 +2,619 @@ import streamlit as st
 import pandas as pd
 import time
 import random
-import binascii
 from Crypto.Cipher import AES
-from Crypto.Util.Padding import pad, unpad
 import os
 import altair as alt
 import graphviz
 import re
+import io
+import json
+from functools import partial
 from PIL import Image
 import numpy as np
+from avalanche import (avalanche_adjacent, bit_difference, hex_to_bits, run_avalanche, AVALANCHE_MODES,
+                       MODE_ALL_PAIRS, MODE_SAMPLED, DEFAULT_MEMORY_CAP, DEFAULT_SAMPLE_PAIRS, HISTOGRAM_BINS,
+                       strict_avalanche_test)
+from pipeline import (KEY, TARGET_COLUMNS, ROW_SEPARATOR, reverse_cipher, reverse_cipher_undo, normalize_key,
+                      stream_pipeline, DEFAULT_CHUNK_SIZE, file_digest, load_combined_texts, encrypt_texts,
+                      decrypt_texts, stream_decrypt_pipeline, sample_verify, CIPHERTEXT_COLUMN, PIPELINE_MODES,
+                      PIPELINE_ROUND_TRIP, PIPELINE_DECRYPT, PIPELINE_SAMPLED,
+                      DEFAULT_SAMPLE_FRACTION)
+from workbook_cache import WorkbookCache
+from timing_store import TimingStore, SOURCE_TIMING_TEST
+from tracing import Tracer, tracing, span
+from compact_result import CompactResultBuilder, NOT_DECRYPTED
+from incremental import EncryptionIndex, IncrementalReport, incremental_pipeline, DEFAULT_DATASET, KEY_COLUMN
+from row_memo import CiphertextMemo, memo_round_trip
+from column_crypto import encrypt_columns, decrypt_columns
+from container import ContainerReader, container_bytes, CONTAINER_EXTENSION
+from equality_index import CiphertextIndex
+from jobs import start_job, STATE_DONE
+from batch_ingest import IngestReport, stream_batch_pipeline, DEFAULT_IO_WORKERS, DEFAULT_QUEUE_CHUNKS
+from key_routing import (CipherPool, KeyUsageReport, KeyMapError, load_key_map, keys_by_id, stream_multi_key_pipeline,
+                         stream_multi_key_decrypt_pipeline, ROUTE_COLUMNS, KEY_ID_COLUMN)
+from aes_batch import (aes_encrypt_batch, PADDING_METHODS, NONCE_MODES, PADDING_PKCS7, PADDING_FIXED, PADDING_BUCKET,
+                       BUCKET_STRATEGIES, BUCKET_QUANTILE, DEFAULT_BUCKET_COUNT, DEFAULT_BUCKETS, padding_family,
+                       learn_buckets, bucket_report, bucket_padding_method, padded_plaintext_buffer)
+import aes_numpy
+from parallel_aes import (ParallelConfig, parallel_encrypt, parallel_decrypt, open_round_trip, open_pool,
+                          EXECUTOR_CHOICES, EXECUTOR_SERIAL, EXECUTOR_THREAD, EXECUTOR_PROCESS, DEFAULT_SHARD_SIZE)
 
 # ========== KONFIGURASI HALAMAN ==========
 st.set_page_config(page_title="Enkripsi Data Material SAP", layout="wide")
 
 # ========== KONSTANTA ==========
-KEY = "KRIPTOGRAFIAESKU"[:16]
-TARGET_COLUMNS = ["GroupDesc", "Customer Name", "MaterialNumber", "Catalog Data", "MaterialDesc"]
 LOG_FILE = "log_waktu.csv"
-
-# ========== FUNGSI UTILITAS KRIPTOGRAFI ==========
-
-def reverse_cipher(text):
-    """Membalik urutan karakter dalam teks"""
-    if not text or text.strip() == "":
-        return "N/A"
-    return text[::-1]
-
-def reverse_cipher_undo(text):
-    """Mengembalikan teks yang telah dibalik ke bentuk semula"""
-    return text[::-1]
-
-def pad_text_to_length(text, target_length=512):
-    """Padding teks dengan karakter '#' hingga panjang tertentu"""
-    return text.ljust(target_length, "#")
-
-def aes_encrypt_pkcs7(text, key):
-    """Enkripsi AES dengan padding PKCS#7 standar"""
-    data_bytes = text.encode('utf-8')
-    cipher = AES.new(key.encode('utf-8'), mode=AES.MODE_ECB)
-    padded_data = pad(data_bytes, AES.block_size)
-    encrypted_bytes = cipher.encrypt(padded_data)
-    return binascii.hexlify(encrypted_bytes).decode('utf-8')
-
-def aes_decrypt_pkcs7(ciphertext_hex, key):
-    """Dekripsi AES dengan unpadding PKCS#7 standar"""
-    try:
-        cipher = AES.new(key.encode('utf-8'), mode=AES.MODE_ECB)
-        encrypted_bytes = binascii.unhexlify(ciphertext_hex)
-        decrypted_padded = cipher.decrypt(encrypted_bytes)
-        decrypted = unpad(decrypted_padded, AES.block_size).decode('utf-8')
-        return decrypted
-    except (ValueError, UnicodeDecodeError, binascii.Error) as e:
-        st.error(f"Error dalam dekripsi PKCS#7: {str(e)}")
-        return "ERROR_DECRYPT_PKCS7"
-
-def aes_encrypt_fixed_length(text, key, target_length=152):
-    """Enkripsi AES dengan padding kustom fixed length"""
-    padded_text_custom = pad_text_to_length(text, target_length)
-    data_bytes_for_aes = padded_text_custom.encode('utf-8')
-    padded_data_for_aes = pad(data_bytes_for_aes, AES.block_size)
-    cipher = AES.new(key.encode('utf-8'), mode=AES.MODE_ECB)
-    encrypted_bytes = cipher.encrypt(padded_data_for_aes)
-    return binascii.hexlify(encrypted_bytes).decode('utf-8')
-
-def aes_decrypt_fixed_length(ciphertext_hex, key):
-    """Dekripsi AES dengan unpadding fixed length"""
-    try:
-        cipher = AES.new(key.encode('utf-8'), mode=AES.MODE_ECB)
-        encrypted_bytes = binascii.unhexlify(ciphertext_hex)
-        decrypted_padded_aes = cipher.decrypt(encrypted_bytes)
-        unpadded_from_aes = unpad(decrypted_padded_aes, AES.block_size).decode('utf-8')
-        decrypted = unpadded_from_aes.rstrip("#")
-        return decrypted
-    except (ValueError, UnicodeDecodeError, binascii.Error) as e:
-        st.error(f"Error dalam dekripsi Fixed Length: {str(e)}")
-        return "ERROR_DECRYPT_FIXED"
+TRACE_STAGE_COLUMNS = {
+    "read_s": ("read",),
+    "reverse_s": ("reverse",),
+    "encrypt_s": ("pad", "encrypt"),
+    "decrypt_s": ("decrypt", "unpad"),
+    "undo_s": ("reverse_undo",)
+}
+PAGE_SIZES = [25, 50, 100, 250, 500, 1000]
+RESULT_VIEWS = ["Data Asli", "Hasil Reverse Cipher", "Hasil AES Enkripsi", "Hasil Dekripsi"]
 
 # ========== FUNGSI UTILITAS PENGUJIAN ==========
 
 def count_bit_difference(hex1, hex2):
     """Menghitung jumlah bit yang berbeda antara dua string heksadesimal"""
     try:
-        val1 = int(hex1, 16)
-        val2 = int(hex2, 16)
+        return bit_difference(hex1, hex2)
     except ValueError:
         st.error("Input heksadesimal tidak valid untuk perhitungan bit difference.")
         return 0
 
-    b1 = bin(val1)[2:].zfill(len(hex1) * 4)
-    b2 = bin(val2)[2:].zfill(len(hex2) * 4)
-    
-    max_len = max(len(b1), len(b2))
-    b1 = b1.zfill(max_len)
-    b2 = b2.zfill(max_len)
-
-    return sum(bit1 != bit2 for bit1, bit2 in zip(b1, b2))
-
-def calculate_avalanche_effect(hex_rows):
-    """Menghitung Avalanche Effect untuk serangkaian ciphertext"""
-    results = []
-    for i in range(len(hex_rows) - 1):
-        diff = count_bit_difference(hex_rows[i], hex_rows[i + 1])
-        total_bits = len(hex_rows[i]) * 4
-        percent = (diff / total_bits) * 100 if total_bits > 0 else 0
-        results.append((i + 1, i + 2, percent))
-    return results
-
-def log_time(jumlah_data, waktu_eksekusi, padding_method):
-    """Mencatat waktu eksekusi ke file log"""
-    df_log = pd.DataFrame({
-        "Jumlah Data": [jumlah_data],
-        "Waktu Eksekusi (detik)": [waktu_eksekusi],
-        "Metode Padding": [padding_method]
-    })
-    
-    if os.path.exists(LOG_FILE):
-        try:
-            existing_df = pd.read_csv(LOG_FILE)
-            df_log = pd.concat([existing_df, df_log], ignore_index=True)
-        except pd.errors.EmptyDataError:
-            pass
-    df_log.to_csv(LOG_FILE, index=False)
-
-def process_file_fast(uploaded_file, max_rows, key, padding_method):
-    """Fungsi utama untuk memproses file Excel"""
-    try:
-        df = pd.read_excel(uploaded_file, engine='openpyxl')
-        df = df[[col for col in TARGET_COLUMNS if col in df.columns]].fillna("").astype(str)
-        df = df.head(max_rows)
-        combined_texts = df.apply(lambda row: " || ".join(str(item) for item in row), axis=1)
-
-        progress = st.progress(0)
-        status = st.empty()
-        start_time = time.time()
-
-        # PROSES ENKRIPSI
-        reversed_for_encrypt = [reverse_cipher(text) for text in combined_texts]
-        progress.progress(0.25)
-        status.text("✅ Reverse Cipher selesai")
-
-        # Pilihan AES Encryption
-        if padding_method == "PKCS#7":
-            aes_results = [aes_encrypt_pkcs7(text, key) for text in reversed_for_encrypt]
-            status.text("✅ AES Encryption (PKCS#7) selesai")
-        else:
-            aes_results = [aes_encrypt_fixed_length(text, key) for text in reversed_for_encrypt]
-            status.text("✅ AES Encryption (Fixed Length) selesai")
-        progress.progress(0.5)
-
-        # PROSES DEKRIPSI
-        if padding_method == "PKCS#7":
-            decrypted_aes = [aes_decrypt_pkcs7(ct, key) for ct in aes_results]
-            status.text("✅ AES Decryption (PKCS#7) selesai")
+@st.cache_resource
+def get_workbook_cache():
+    """Cache workbook kolumnar di disk, dipakai bersama oleh semua sesi"""
+    return WorkbookCache()
+
+def show_workbook_cache_panel(uploaded_file):
+    """Menampilkan status cache workbook beserta tombol invalidasi"""
+    cache = get_workbook_cache()
+    with st.expander("🗄️ Cache Workbook"):
+        entries = cache.entries()
+        col1, col2, col3 = st.columns(3)
+        col1.metric("Jumlah entri", len(entries))
+        col2.metric("Ukuran cache", f"{sum(size for _, size, _ in entries) / (1024 * 1024):.1f} MB",
+                    help=f"Batas {cache.max_bytes / (1024 * 1024):.0f} MB (eviksi LRU)")
+        col3.metric("Hit / Miss", f"{cache.hits} / {cache.misses}")
+        col_file, col_all = st.columns(2)
+        if uploaded_file and col_file.button("Hapus cache file ini"):
+            cache.invalidate(file_digest(uploaded_file), TARGET_COLUMNS)
+            load_timing_texts.clear()
+            st.success("Cache untuk file ini dihapus.")
+        if col_all.button("Kosongkan seluruh cache"):
+            cache.invalidate()
+            load_timing_texts.clear()
+            st.success("Seluruh cache workbook dihapus.")
+
+@st.cache_resource
+def get_encryption_index():
+    """Indeks digest per baris untuk mode inkremental, dipakai bersama oleh semua sesi"""
+    return EncryptionIndex()
+
+@st.cache_resource
+def get_row_memo():
+    """Memo LRU ciphertext untuk baris duplikat, dipakai bersama oleh semua sesi"""
+    return CiphertextMemo()
+
+def show_row_memo_panel():
+    """Menampilkan hit/miss memo baris duplikat beserta tombol pengosongan"""
+    memo = get_row_memo()
+    with st.expander("🧩 Memo Baris Duplikat"):
+        col1, col2, col3, col4 = st.columns(4)
+        col1.metric("Hit", memo.hits)
+        col2.metric("Miss", memo.misses)
+        col3.metric("Hit rate", f"{memo.hit_rate * 100:.1f}%")
+        col4.metric("Entri", len(memo), help=f"Batas {memo.max_entries} entri (eviksi LRU), "
+                                             f"{memo.evictions} entri sudah dibuang")
+        if st.button("Kosongkan memo"):
+            memo.clear()
+            st.success("Memo baris duplikat dikosongkan.")
+
+@st.cache_resource
+def get_cipher_pool():
+    """Pool objek cipher per kunci untuk mode multi-kunci, dipakai bersama oleh semua sesi"""
+    return CipherPool()
+
+def show_key_report(report, pool):
+    """Jumlah baris dan waktu per kunci pada run multi-kunci terakhir"""
+    with st.expander("🗝️ Ringkasan Multi-Kunci", expanded=True):
+        rows = report.rows()
+        col1, col2, col3, col4 = st.columns(4)
+        col1.metric("Kunci dipakai", len(rows))
+        col2.metric("Baris tanpa kunci (kunci utama)", report.unmapped_rows)
+        col3.metric("Hit rate pool cipher", f"{pool.hit_rate * 100:.1f}%")
+        col4.metric("Cipher di pool", len(pool), help=f"Batas {pool.max_entries} kunci (eviksi LRU), "
+                                                      f"{pool.evictions} sudah dibuang")
+        st.dataframe(pd.DataFrame([{
+            'Key ID': row['key_id'],
+            'Nilai rute': row['values'],
+            'Baris': row['rows'],
+            'Batch': row['batches'],
+            'Enkripsi (ms)': round(row['encrypt_ms'], 3),
+            'Dekripsi (ms)': round(row['decrypt_ms'], 3),
+            'Baris/detik': round(row['rows_per_s']) if row['rows_per_s'] else None,
+        } for row in rows]), hide_index=True)
+        st.caption("Key ID berasal dari file kunci (ID eksplisit atau nomor urut kunci, bukan turunan kuncinya), "
+                   f"sama dengan kolom '{KEY_ID_COLUMN}' pada keluaran `skripsi_cli.py --key-file`.")
+
+@st.cache_resource
+def get_timing_store():
+    """Log waktu eksekusi (SQLite), log CSV lama diimpor sekali saat pertama dibuka"""
+    store = TimingStore()
+    store.import_legacy_csv(LOG_FILE)
+    return store
+
+def log_time(jumlah_data, waktu_eksekusi, padding_method, parallel_config=None, store=None, **stages):
+    """Mencatat waktu eksekusi ke log waktu (append atomik, aman untuk beberapa sesi sekaligus)"""
+    workers = parallel_config.workers if parallel_config is not None and parallel_config.is_parallel else 1
+    executor = parallel_config.executor if workers > 1 else EXECUTOR_SERIAL
+    store = store if store is not None else get_timing_store()
+    # Batas kelas bucket tidak ikut dicatat agar ringkasan dikelompokkan per metode
+    store.record(jumlah_data, waktu_eksekusi, padding_family(padding_method), workers=workers, executor=executor,
+                 **stages)
+
+def process_file_fast(job, uploaded_file, max_rows, key, padding_method, parallel_config=None, tracer=None,
+                      incremental_dataset=None, memo=None, workbook_cache=None, encryption_index=None,
+                      timing_store=None, mode=PIPELINE_ROUND_TRIP, sample_fraction=DEFAULT_SAMPLE_FRACTION,
+                      key_map=None, route_column=ROUTE_COLUMNS[0], fallback_key=False, cipher_pool=None):
+    """Fungsi utama untuk memproses file Excel secara streaming per chunk (opsional paralel)
+
+    Berjalan di thread job (lihat jobs.py): tidak memanggil fungsi Streamlit, progres dilaporkan lewat
+    `job.update()` per chunk (sekaligus titik pembatalan) dan pesan error lewat `job.log()`.
+    Bila `tracer` diisi, setiap tahap pipeline direkam sebagai span (lihat tracing.py).
+    Bila `incremental_dataset` diisi, hanya baris baru/berubah dibanding run sebelumnya yang dienkripsi.
+    Bila `memo` diisi, baris duplikat cukup dienkripsi sekali (lihat row_memo.py).
+    `mode` memilih round-trip penuh, enkripsi saja, dekripsi saja (input kolom ciphertext hex) atau
+    verifikasi sampel (hanya `sample_fraction` baris yang didekripsi dan dibandingkan dengan teks aslinya).
+    Bila `key_map` diisi, kunci setiap baris dipilih dari nilai `route_column` (lihat key_routing.py);
+    `key` hanya dipakai untuk nilai tanpa kunci bila `fallback_key` aktif.
+    """
+    start_time = time.time()
+
+    # Hasil dikumpulkan ringkas per chunk (lihat compact_result.py), bukan list string per baris
+    builder = CompactResultBuilder(mode)
+    report = None
+    key_report = None
+
+    is_parallel = parallel_config is not None and parallel_config.is_parallel
+    chunk_size = parallel_config.chunk_size if is_parallel else DEFAULT_CHUNK_SIZE
+
+    with tracing(tracer):
+        # Setiap chunk: baca -> Reverse Cipher -> AES Encryption -> AES Decryption -> Reverse Undo
+        with open_round_trip(parallel_config) as round_trip_fn:
+            if memo is not None:
+                round_trip_fn = partial(memo_round_trip, memo=memo, inner=round_trip_fn)
+            verify = mode == PIPELINE_ROUND_TRIP
+            if key_map is not None:
+                key_report = KeyUsageReport()
+                default_key = key if fallback_key else None
+                if mode == PIPELINE_DECRYPT:
+                    chunks = workbook_cache.iter_chunks(uploaded_file, [CIPHERTEXT_COLUMN, KEY_ID_COLUMN],
+                                                        chunk_size, max_rows)
+                    pipeline_chunks = stream_multi_key_decrypt_pipeline(
+                        uploaded_file, keys_by_id(key_map, default_key), padding_method, TARGET_COLUMNS, chunk_size,
+                        max_rows=max_rows, on_error=job.log, pool=cipher_pool, report=key_report, chunks=chunks)
+                else:
+                    chunks = workbook_cache.iter_chunks(uploaded_file, TARGET_COLUMNS, chunk_size, max_rows)
+                    pipeline_chunks = stream_multi_key_pipeline(
+                        uploaded_file, key_map, padding_method, route_column, TARGET_COLUMNS, chunk_size,
+                        max_rows=max_rows, verify=verify, on_error=job.log, default_key=default_key,
+                        pool=cipher_pool, report=key_report, chunks=chunks)
+            elif mode == PIPELINE_DECRYPT:
+                chunks = workbook_cache.iter_chunks(uploaded_file, [CIPHERTEXT_COLUMN], chunk_size, max_rows)
+                pipeline_chunks = stream_decrypt_pipeline(uploaded_file, key, padding_method, TARGET_COLUMNS,
+                                                          chunk_size, max_rows=max_rows, on_error=job.log,
+                                                          chunks=chunks)
+            elif incremental_dataset:
+                chunks = workbook_cache.iter_chunks(uploaded_file, TARGET_COLUMNS, chunk_size, max_rows)
+                report = IncrementalReport()
+                pipeline_chunks = incremental_pipeline(
+                    uploaded_file, key, padding_method, encryption_index, incremental_dataset,
+                    TARGET_COLUMNS, chunk_size, max_rows=max_rows, verify=verify, on_error=job.log,
+                    round_trip_fn=round_trip_fn, chunks=chunks, report=report)
+            else:
+                chunks = workbook_cache.iter_chunks(uploaded_file, TARGET_COLUMNS, chunk_size, max_rows)
+                pipeline_chunks = stream_pipeline(uploaded_file, key, padding_method, TARGET_COLUMNS, chunk_size,
+                                                  max_rows=max_rows, verify=verify, on_error=job.log,
+                                                  round_trip_fn=round_trip_fn, chunks=chunks)
+            result_chunks = pipeline_chunks
+            if mode == PIPELINE_SAMPLED:
+                result_chunks = sample_verify(pipeline_chunks, key, padding_method, sample_fraction,
+                                              on_error=job.log)
+            try:
+                for chunk in result_chunks:
+                    builder.add_chunk(chunk)
+                    job.update(builder.row_count)
+            finally:
+                # Menutup generator saat dibatalkan agar koneksi indeks inkremental dilepas (chunk yang sudah
+                # selesai tetap tersimpan karena indeks di-commit per chunk)
+                result_chunks.close()
+                pipeline_chunks.close()
+
+    return {
+        'hasil': finish_processing(builder, start_time, padding_method, parallel_config, tracer, timing_store),
+        'key': key if key_map is None else None,
+        'incremental_report': report,
+        'key_report': key_report,
+        'ingest_report': None,
+        'tracer': tracer
+    }
+
+def finish_processing(builder, start_time, padding_method, parallel_config=None, tracer=None, timing_store=None):
+    """Avalanche antar baris bersebelahan, pencatatan log waktu, lalu CompactResult akhir"""
+    with tracing(tracer):
+        avalanche_start = time.time()
+        batch = builder.batch()
+        with span("avalanche", rows=len(batch)):
+            avalanche_percent = avalanche_adjacent(batch)["percentages"]
+        avalanche_time = time.time() - avalanche_start
+    elapsed_time = time.time() - start_time
+
+    stages = {'avalanche_s': avalanche_time}
+    if tracer is not None:
+        totals = tracer.totals()
+        for column, names in TRACE_STAGE_COLUMNS.items():
+            if any(name in totals for name in names):
+                stages[column] = sum(totals.get(name, 0.0) for name in names)
+    log_time(builder.row_count, elapsed_time, padding_method, parallel_config, store=timing_store, **stages)
+    return builder.build(avalanche_percent, elapsed_time, padding_method, batch=batch)
+
+def process_batch_files(job, sources, max_rows, key, padding_method, parallel_config=None, tracer=None, memo=None,
+                        timing_store=None, mode=PIPELINE_ROUND_TRIP, sample_fraction=DEFAULT_SAMPLE_FRACTION,
+                        io_workers=DEFAULT_IO_WORKERS, queue_chunks=DEFAULT_QUEUE_CHUNKS):
+    """Memproses banyak workbook sekaligus: semua sheet yang memuat kolom target, `max_rows` per sheet
+
+    Parsing berjalan di thread I/O (lihat batch_ingest.py) dan dikirim lewat antrean terbatas ke enkripsi di
+    thread job ini. Progres per file/sheet tersedia di `job.details` selama job berjalan.
+    """
+    start_time = time.time()
+    builder = CompactResultBuilder(mode)
+    report = job.details = IngestReport()
+
+    is_parallel = parallel_config is not None and parallel_config.is_parallel
+    chunk_size = parallel_config.chunk_size if is_parallel else DEFAULT_CHUNK_SIZE
+
+    with tracing(tracer):
+        with open_round_trip(parallel_config) as round_trip_fn:
+            if memo is not None:
+                round_trip_fn = partial(memo_round_trip, memo=memo, inner=round_trip_fn)
+            pipeline_chunks = stream_batch_pipeline(
+                sources, key, padding_method, TARGET_COLUMNS, chunk_size, max_rows=max_rows,
+                verify=mode == PIPELINE_ROUND_TRIP, on_error=job.log, round_trip_fn=round_trip_fn,
+                io_workers=io_workers, queue_chunks=queue_chunks, report=report)
+            result_chunks = pipeline_chunks
+            if mode == PIPELINE_SAMPLED:
+                result_chunks = sample_verify(pipeline_chunks, key, padding_method, sample_fraction,
+                                              on_error=job.log)
+            try:
+                for chunk in result_chunks:
+                    builder.add_chunk(chunk)
+                    # Total baris baru diketahui setelah header setiap sheet dipindai
+                    job.total_rows = max(report.estimated_rows(max_rows), builder.row_count)
+                    job.update(builder.row_count)
+            finally:
+                result_chunks.close()
+                pipeline_chunks.close()
+
+    return {
+        'hasil': finish_processing(builder, start_time, padding_method, parallel_config, tracer, timing_store),
+        'key': key,
+        'incremental_report': None,
+        'key_report': None,
+        'ingest_report': report,
+        'tracer': tracer
+    }
+
+def start_processing_job(uploaded_file, max_rows, key, padding_method, **options):
+    """Menyalin file unggahan lalu menjalankan process_file_fast sebagai job latar belakang"""
+    source = io.BytesIO(uploaded_file.getvalue())
+    source.name = uploaded_file.name
+    mode = options.get('mode', PIPELINE_ROUND_TRIP)
+    if options.get('key_map') is not None:
+        mode += f", multi-kunci per {options.get('route_column', ROUTE_COLUMNS[0])}"
+    job = start_job(f"{uploaded_file.name} — {max_rows} baris, {padding_method}, {mode}", max_rows,
+                    process_file_fast, source, max_rows, key, padding_method, workbook_cache=get_workbook_cache(),
+                    encryption_index=get_encryption_index(), timing_store=get_timing_store(), **options)
+    st.session_state.setdefault('jobs', {})[job.id] = job
+    return job
+
+def start_batch_job(uploaded_files, max_rows, key, padding_method, **options):
+    """Menyalin semua file unggahan lalu menjalankan process_batch_files sebagai job latar belakang"""
+    sources = []
+    for uploaded in uploaded_files:
+        source = io.BytesIO(uploaded.getvalue())
+        source.name = uploaded.name
+        sources.append(source)
+    mode = options.get('mode', PIPELINE_ROUND_TRIP)
+    job = start_job(f"Batch {len(sources)} file — {max_rows} baris/sheet, {padding_method}, {mode}", 0,
+                    process_batch_files, sources, max_rows, key, padding_method, timing_store=get_timing_store(),
+                    **options)
+    st.session_state.setdefault('jobs', {})[job.id] = job
+    return job
+
+def collect_finished_jobs():
+    """Memasang hasil job yang sudah selesai ke session (sekali per job)"""
+    for job in st.session_state.get('jobs', {}).values():
+        if job.is_active or job.collected:
+            continue
+        job.collected = True
+        if job.state != STATE_DONE:
+            continue
+        result = job.result
+        hasil = result['hasil']
+        st.session_state['hasil'] = hasil
+        st.session_state['hasil_key'] = result['key']
+        st.session_state.pop('hasil_container', None)
+        st.session_state.pop('hasil_lookup', None)
+        st.session_state['file_processed'] = True
+        st.session_state['incremental_report'] = result['incremental_report']
+        st.session_state['key_report'] = result['key_report']
+        st.session_state['ingest_report'] = result['ingest_report']
+        tracer = result['tracer']
+        if tracer is not None:
+            st.session_state['trace'] = {
+                'rows': len(hasil),
+                'padding': hasil.padding_method_used,
+                'memory': tracer.memory,
+                'summary': tracer.summary(),
+                'chrome_trace': json.dumps(tracer.to_chrome_trace())
+            }
+        st.session_state['job_notice'] = job.id
+
+def format_duration(seconds):
+    """Durasi dalam detik menjadi teks singkat (mis. '1m 05s')"""
+    if seconds is None:
+        return "-"
+    minutes, seconds = divmod(int(round(seconds)), 60)
+    return f"{minutes}m {seconds:02d}s" if minutes else f"{seconds}s"
+
+@st.fragment(run_every=1)
+def show_job_progress():
+    """Progres job aktif di sidebar, diperbarui tiap detik tanpa menjalankan ulang seluruh halaman"""
+    jobs = st.session_state.get('jobs', {})
+    active = [job for job in jobs.values() if job.is_active]
+    if any(not job.is_active and not job.collected for job in jobs.values()):
+        # Job baru selesai: jalankan ulang seluruh aplikasi agar hasilnya terpasang di semua menu
+        st.rerun()
+    for job in active:
+        st.markdown(f"**⏳ Job #{job.id}** — {job.label}")
+        st.progress(job.fraction, text=f"{job.rows_done} / {job.total_rows} baris")
+        col_rate, col_eta = st.columns(2)
+        col_rate.metric("Baris/detik", f"{job.rows_per_s:,.0f}")
+        col_eta.metric("Sisa waktu", format_duration(job.eta_s))
+        if job.details is not None:
+            st.dataframe(pd.DataFrame([{
+                'File': row['file'],
+                'Sheet': row['sheet'] or '-',
+                'Status': row['state'],
+                'Baris': row['rows'],
+            } for row in job.details.summary()]), hide_index=True)
+        if job.cancel_requested:
+            st.caption("Menunggu chunk berjalan selesai untuk berhenti…")
+        elif st.button("⏹️ Batalkan", key=f"cancel_job_{job.id}"):
+            job.cancel()
+
+def show_ingest_report(report):
+    """Waktu per file/sheet dan throughput gabungan pada run batch terakhir"""
+    with st.expander("📚 Ringkasan Batch per File/Sheet", expanded=True):
+        rows = report.summary()
+        col1, col2, col3, col4 = st.columns(4)
+        col1.metric("File / sheet", f"{len(report.files)} / {len(rows)}")
+        col2.metric("Total baris", f"{report.rows:,}")
+        col3.metric("Baris/detik", f"{report.rows_per_s:,.0f}", help=f"Wall-clock {report.elapsed:.2f} detik")
+        col4.metric("MB/detik (file masukan)", f"{report.mb_per_s:.2f}",
+                    help=f"{report.total_bytes / 1e6:.2f} MB dibaca")
+        st.dataframe(pd.DataFrame([{
+            'File': row['file'],
+            'Sheet': row['sheet'] or '-',
+            'Status': row['state'],
+            'Baris': row['rows'],
+            'Chunk': row['chunks'],
+            'Parsing (ms)': round(row['parse_ms'], 1),
+            'Tertahan antrean (ms)': round(row['wait_ms'], 1),
+            'Enkripsi (ms)': round(row['encrypt_ms'], 1),
+            'Baris/detik enkripsi': round(row['rows_per_s']) if row['rows_per_s'] else None,
+            'Error': row['error'],
+        } for row in rows]), hide_index=True)
+        st.caption("Parsing berjalan bersamaan di thread I/O; waktu 'Tertahan antrean' yang besar berarti enkripsi "
+                   "menjadi hambatan, sedangkan waktu parsing per sheet ikut memuat jeda berbagi GIL antar thread.")
+        for file, sheet, missing in report.skipped:
+            st.caption(f"Dilewati: {file} [{sheet or '-'}] — tidak memiliki kolom {', '.join(missing)}")
+        for file, entry in report.files.items():
+            if entry['error']:
+                st.error(f"{file}: {entry['error']}")
+
+def show_job_history():
+    """Riwayat job sesi ini"""
+    jobs = st.session_state.get('jobs', {})
+    if not jobs:
+        return
+    with st.expander("🗂️ Riwayat Job"):
+        st.dataframe(pd.DataFrame([{
+            'Job': job.id,
+            'Keterangan': job.label,
+            'Status': job.state,
+            'Baris': job.rows_done,
+            'Durasi (detik)': round(job.elapsed, 2),
+            'Baris/detik': round(job.rows_per_s),
+        } for job in reversed(list(jobs.values()))]), hide_index=True)
+        for job in jobs.values():
+            if job.error:
+                st.error(f"Job #{job.id}: {job.error}")
+
+@st.cache_data(max_entries=4, show_spinner=False)
+def load_timing_texts(digest, max_rows, _uploaded_file):
+    """Mem-parsing file sekali per isi file (kunci: hash isi) dan menyimpan teks gabungan per baris"""
+    start = time.perf_counter()
+    chunks = get_workbook_cache().iter_chunks(_uploaded_file, TARGET_COLUMNS, max_rows=max_rows)
+    _, _, combined_texts = load_combined_texts(_uploaded_file, TARGET_COLUMNS, max_rows, chunks=chunks)
+    return combined_texts, time.perf_counter() - start
+
+def learn_padding_buckets(texts, strategy, count=DEFAULT_BUCKET_COUNT):
+    """Batas kelas padding bucket dari panjang teks setelah Reverse Cipher, beserta ringkasan byte-nya"""
+    lengths = [len(reverse_cipher(text).encode('utf-8')) for text in texts]
+    ceilings = learn_buckets(lengths, strategy, count)
+    return ceilings, bucket_report(lengths, ceilings)
+
+def format_bucket_report(report):
+    """Ringkasan satu baris: kelas, jumlah baris per kelas dan penghematan byte ciphertext"""
+    rows = ", ".join(f"{size} B: {count}" for size, count in report['rows_per_bucket'].items())
+    saved = 1 - report['bucket_bytes'] / report['fixed_bytes'] if report['fixed_bytes'] else 0.0
+    overhead = report['bucket_bytes'] / report['pkcs7_bytes'] - 1 if report['pkcs7_bytes'] else 0.0
+    return (f"Kelas (byte ciphertext): {list(report['buckets'])} — baris per kelas: {rows}. "
+            f"Ciphertext {report['bucket_bytes']:,} B: {saved:.1%} lebih kecil dari Fixed Length "
+            f"({report['fixed_bytes']:,} B), {overhead:.1%} lebih besar dari PKCS#7 ({report['pkcs7_bytes']:,} B).")
+
+@st.cache_data(max_entries=4, show_spinner=False)
+def load_table_rows(digest, max_rows, _uploaded_file):
+    """Seperti load_timing_texts, tetapi menyimpan nilai per kolom untuk perbandingan mode per kolom"""
+    chunks = get_workbook_cache().iter_chunks(_uploaded_file, TARGET_COLUMNS, max_rows=max_rows)
+    headers, rows, _ = load_combined_texts(_uploaded_file, TARGET_COLUMNS, max_rows, chunks=chunks)
+    return headers, rows
+
+def compare_encryption_layouts(headers, rows, key, padding_method, selected_columns):
+    """Mengukur mode per baris (gabungan ' || ') dan per kolom pada data yang sama
+
+    Dekripsi subset pada mode per baris tetap harus mendekripsi dan memecah seluruh baris.
+    """
+    positions = [headers.index(name) for name in selected_columns]
+    timing = {}
+
+    start = time.perf_counter()
+    combined = [ROW_SEPARATOR.join(row) for row in rows]
+    _, row_batch = encrypt_texts(combined, key, padding_method)
+    timing[('row', 'encrypt')] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    decrypt_texts(row_batch, key, padding_method, on_error=st.error)
+    timing[('row', 'decrypt_all')] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    _, plaintexts = decrypt_texts(row_batch, key, padding_method, on_error=st.error)
+    fields = [text.split(ROW_SEPARATOR) for text in plaintexts]
+    row_subset = [tuple(row[i] for i in positions) for row in fields if len(row) == len(headers)]
+    timing[('row', 'decrypt_subset')] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    table = encrypt_columns(headers, rows, key, padding_method)
+    timing[('column', 'encrypt')] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    decrypt_columns(table, key, on_error=st.error)
+    timing[('column', 'decrypt_all')] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    column_values = decrypt_columns(table, key, selected_columns, on_error=st.error)
+    timing[('column', 'decrypt_subset')] = time.perf_counter() - start
+
+    # Kedua mode harus menghasilkan subset kolom yang sama (di luar pengukuran waktu)
+    column_subset = list(zip(*(column_values[name] for name in selected_columns)))
+
+    subset_bytes = sum(len(table.columns[name].buffer) for name in selected_columns)
+    return {
+        'rows': len(rows),
+        'padding': padding_method,
+        'columns': list(selected_columns),
+        'timing': timing,
+        'subset_rows': len(row_subset),
+        'subset_match': row_subset == column_subset,
+        'bytes': {
+            ('row', 'encrypt'): len(row_batch.buffer),
+            ('row', 'decrypt_all'): len(row_batch.buffer),
+            ('row', 'decrypt_subset'): len(row_batch.buffer),
+            ('column', 'encrypt'): table.nbytes,
+            ('column', 'decrypt_all'): table.nbytes,
+            ('column', 'decrypt_subset'): subset_bytes,
+        },
+        'table_csv': table.hex_frame().head(1000).to_csv(index=False)
+    }
+
+def show_layout_comparison(uploaded_file, key):
+    """Perbandingan waktu mode enkripsi per baris vs per kolom, berdampingan"""
+    st.subheader("⚖️ Perbandingan Mode Per Baris vs Per Kolom")
+    st.write("""
+    **Per baris**: semua kolom target digabung dengan `' || '` lalu dienkripsi sebagai satu teks.
+    **Per kolom**: setiap kolom dienkripsi sebagai batch sendiri sehingga hasilnya berupa tabel terenkripsi
+    dengan skema yang sama; kolom tertentu dapat didekripsi tanpa menyentuh kolom lain.
+    """)
+    col_rows, col_padding, col_subset = st.columns(3)
+    with col_rows:
+        max_rows = st.number_input("Jumlah baris:", min_value=1, value=2000, step=500, key="layout_rows")
+    with col_padding:
+        padding_method = st.selectbox("Metode padding:", PADDING_METHODS, key="layout_padding")
+    with col_subset:
+        selected_columns = st.multiselect("Kolom yang didekripsi:", TARGET_COLUMNS, default=[KEY_COLUMN],
+                                          key="layout_columns")
+
+    if st.button("Bandingkan Mode Enkripsi"):
+        headers, rows = load_table_rows(file_digest(uploaded_file), int(max_rows), uploaded_file)
+        selected_columns = [name for name in selected_columns if name in headers]
+        if not selected_columns:
+            st.warning("Kolom yang dipilih tidak ada pada file.")
         else:
-            decrypted_aes = [aes_decrypt_fixed_length(ct, key) for ct in aes_results]
-            status.text("✅ AES Decryption (Fixed Length) selesai")
-        progress.progress(0.75)
-
-        # Reverse Cipher Undo
-        reversed_for_decrypt = [reverse_cipher_undo(text) for text in decrypted_aes]
-        progress.progress(1.0)
-        status.text("✅ Reverse Cipher Undo selesai")
-
-        avalanche = calculate_avalanche_effect(aes_results)
-        elapsed_time = time.time() - start_time
-        log_time(max_rows, elapsed_time, padding_method)
-
-        return {
-            "original": df.values.tolist(),
-            "headers": df.columns.tolist(),
-            "reversed_encrypt": reversed_for_encrypt,
-            "aes": aes_results,
-            "decrypted_aes": decrypted_aes,
-            "reversed_decrypt": reversed_for_decrypt,
-            "avalanche": avalanche,
-            "time": elapsed_time,
-            "padding_method_used": padding_method
+            st.session_state['layout_comparison'] = compare_encryption_layouts(
+                headers, rows, key, padding_method, selected_columns)
+
+    comparison = st.session_state.get('layout_comparison')
+    if comparison:
+        labels = {
+            'encrypt': "Enkripsi seluruh data",
+            'decrypt_all': "Dekripsi seluruh kolom",
+            'decrypt_subset': f"Dekripsi subset ({', '.join(comparison['columns'])})",
         }
-    except Exception as e:
-        st.error(f"Terjadi error saat memproses file: {str(e)}")
-        return None
-
-def process_file_with_timing(uploaded_file, max_rows, key, padding_method):
-    """Fungsi dengan pengukuran waktu yang lebih akurat"""
+        df_layout = pd.DataFrame([{
+            'Tahap': label,
+            'Per baris (detik)': comparison['timing'][('row', step)],
+            'Per kolom (detik)': comparison['timing'][('column', step)],
+            'Byte ciphertext per baris': comparison['bytes'][('row', step)],
+            'Byte ciphertext per kolom': comparison['bytes'][('column', step)],
+        } for step, label in labels.items()])
+        st.caption(f"{comparison['rows']} baris, padding {comparison['padding']}")
+        if comparison['subset_match']:
+            st.success(f"✅ Subset hasil dekripsi kedua mode identik ({comparison['subset_rows']} baris).")
+        else:
+            st.error(f"Subset hasil dekripsi per baris ({comparison['subset_rows']} baris) berbeda dengan per kolom.")
+        st.dataframe(df_layout.style.format({'Per baris (detik)': '{:.4f}', 'Per kolom (detik)': '{:.4f}'}))
+
+        df_chart = df_layout.melt(id_vars=['Tahap'], value_vars=['Per baris (detik)', 'Per kolom (detik)'],
+                                  var_name='Mode', value_name='Waktu (detik)')
+        chart = alt.Chart(df_chart).mark_bar().encode(
+            x=alt.X('Mode:N', title=None),
+            y='Waktu (detik):Q',
+            color='Mode:N',
+            column=alt.Column('Tahap:N', title=None),
+            tooltip=['Tahap', 'Mode', alt.Tooltip('Waktu (detik)', format='.4f')]
+        ).properties(width=150)
+        st.altair_chart(chart)
+        st.download_button("⬇️ Unduh tabel terenkripsi per kolom (maks. 1000 baris)", comparison['table_csv'],
+                           file_name="tabel_terenkripsi_per_kolom.csv", mime="text/csv")
+
+def process_file_with_timing(combined_texts, max_rows, key, padding_method, parallel_config=None, pool=None):
+    """Fungsi dengan pengukuran waktu yang lebih akurat (opsional AES paralel)
+
+    Menerima teks gabungan yang sudah di-parse sekali; hanya prefiks max_rows yang diproses.
+    `pool` adalah executor yang dibuka di luar pengukuran (lihat open_pool) agar startup worker tidak terukur.
+    """
     timing_results = {
-        'read_file': 0,
         'reverse_cipher': 0,
         'aes_encrypt': 0,
         'aes_decrypt': 0,
         'reverse_undo': 0,
-        'total': 0
+        'total': 0,
+        'plain_bytes': 0,
+        'cipher_bytes': 0
     }
     
     try:
         # Gunakan perf_counter untuk resolusi lebih tinggi
         start_total = time.perf_counter()
         
-        # 1. Baca file
-        start = time.perf_counter()
-        df = pd.read_excel(uploaded_file, engine='openpyxl')
-        df = df[[col for col in TARGET_COLUMNS if col in df.columns]].fillna("").astype(str)
-        df = df.head(max_rows)
-        combined_texts = df.apply(lambda row: " || ".join(str(item) for item in row), axis=1)
-        timing_results['read_file'] = max(time.perf_counter() - start, 0.0001)  # Minimal 0.0001
+        # 1. Ambil prefiks data dari hasil parse yang sudah di-cache
+        combined_texts = combined_texts[:max_rows]
         
         # 2. Reverse Cipher (diukur 10 kali untuk akurasi)
         start = time.perf_counter()
@@ -212,20 +622,18 @@ def process_file_with_timing(uploaded_file, max_rows, key, padding_method):
             reversed_for_encrypt = [reverse_cipher(text) for text in combined_texts]
         timing_results['reverse_cipher'] = max((time.perf_counter() - start)/10, 0.0001)
         
-        # 3. AES Encryption
+        # 3. AES Encryption (batch, serial atau per shard paralel)
         start = time.perf_counter()
-        if padding_method == "PKCS#7":
-            aes_results = [aes_encrypt_pkcs7(text, key) for text in reversed_for_encrypt]
-        else:
-            aes_results = [aes_encrypt_fixed_length(text, key) for text in reversed_for_encrypt]
+        aes_batch = parallel_encrypt(reversed_for_encrypt, key, padding_method, parallel_config, pool=pool)
+        timing_results['plain_bytes'] = sum(len(text.encode('utf-8')) for text in reversed_for_encrypt)
+        timing_results['cipher_bytes'] = len(aes_batch.buffer)
+        aes_results = aes_batch.hex_rows()
         timing_results['aes_encrypt'] = max(time.perf_counter() - start, 0.0001)
         
-        # 4. AES Decryption
+        # 4. AES Decryption (batch, serial atau per shard paralel)
         start = time.perf_counter()
-        if padding_method == "PKCS#7":
-            decrypted_aes = [aes_decrypt_pkcs7(ct, key) for ct in aes_results]
-        else:
-            decrypted_aes = [aes_decrypt_fixed_length(ct, key) for ct in aes_results]
+        decrypted_aes = parallel_decrypt(aes_results, key, padding_method, parallel_config, on_error=st.error,
+                                         pool=pool)
         timing_results['aes_decrypt'] = max(time.perf_counter() - start, 0.0001)
         
         # 5. Reverse Undo (diukur 10 kali untuk akurasi)
@@ -247,41 +655,108 @@ def run_comprehensive_timing_test(uploaded_file, key):
     st.subheader("🕒 Pengujian Waktu Komprehensif")
     
     test_sizes = [10, 50, 100, 200, 500, 1000, 2000]
-    padding_methods = ["PKCS#7", "Fixed Length"]
+    padding_methods = list(PADDING_METHODS)
     
     all_results = []
     
     with st.expander("⚙️ Pengaturan Pengujian"):
         st.write("""
         Pengujian ini akan memproses file dengan berbagai ukuran data dan mencatat waktu 
-        eksekusi untuk setiap tahap dan metode padding.
+        eksekusi untuk setiap tahap, metode padding dan jumlah worker paralel.
         """)
+        cpu_count = os.cpu_count() or 1
+        worker_options = sorted({1, 2, 4, 8, 16, 32, 64, cpu_count})
+        col_exec, col_workers, col_shard = st.columns(3)
+        with col_exec:
+            executor_choice = st.selectbox("Executor paralel:", (EXECUTOR_THREAD, EXECUTOR_PROCESS),
+                                           key="timing_executor")
+        with col_workers:
+            worker_counts = st.multiselect("Jumlah worker yang diuji:", worker_options,
+                                           default=sorted({w for w in (1, 2, 4, cpu_count) if w <= cpu_count}),
+                                           key="timing_workers")
+        with col_shard:
+            shard_size = st.number_input("Ukuran shard maksimum (baris):", min_value=10, value=DEFAULT_SHARD_SIZE,
+                                         step=100, key="timing_shard_size",
+                                         help="Setiap ukuran data dibagi rata ke semua worker "
+                                              "(shard = jumlah baris / worker), dibatasi nilai ini.")
+        worker_counts = sorted(set(worker_counts)) or [1]
+        timing_bucket_strategy = st.selectbox("Strategi bucket (padding Bucket):", BUCKET_STRATEGIES,
+                                              key="timing_bucket_strategy")
+
         if st.button("Mulai Pengujian Komprehensif"):
             progress_bar = st.progress(0)
             status_text = st.empty()
+            total_runs = len(test_sizes) * len(padding_methods) * len(worker_counts)
+            run_index = 0
+            
+            # Parse file hanya sekali (di-cache berdasarkan hash isi file)
+            status_text.text("Membaca file...")
+            digest = file_digest(uploaded_file)
+            combined_texts, parse_time = load_timing_texts(digest, max(test_sizes), uploaded_file)
+            st.session_state['timing_parse'] = {
+                'digest': digest,
+                'rows': len(combined_texts),
+                'parse_time': parse_time
+            }
+            # Kelas bucket dipelajari sekali dari seluruh data uji, lalu dipakai untuk semua ukuran
+            ceilings, report = learn_padding_buckets(combined_texts, timing_bucket_strategy)
+            st.session_state['timing_buckets'] = report
             
-            for i, size in enumerate(test_sizes):
-                for method in padding_methods:
-                    status_text.text(f"Memproses {size} baris dengan {method} padding...")
-                    result = process_file_with_timing(uploaded_file, size, key, method)
-                    
-                    if result:
-                        result['size'] = size
-                        result['method'] = method
-                        all_results.append(result)
-                    
-                    progress_bar.progress((i * len(padding_methods) + padding_methods.index(method) + 1) / 
-                                        (len(test_sizes) * len(padding_methods)))
+            for workers in worker_counts:
+                base_config = ParallelConfig(executor_choice, workers, shard_size)
+                # Pool dibuat (dan worker dijalankan) sekali per jumlah worker, di luar pengukuran waktu
+                with open_pool(base_config) as pool:
+                    for size in test_sizes:
+                        rows = min(size, len(combined_texts))
+                        config = base_config.for_rows(rows)
+                        for method in padding_methods:
+                            if method == PADDING_BUCKET:
+                                method = bucket_padding_method(ceilings)
+                            status_text.text(f"Memproses {size} baris dengan {method} padding, {workers} worker "
+                                             f"(shard {config.shard_size} baris)...")
+                            result = process_file_with_timing(combined_texts, size, key, method, config, pool=pool)
+
+                            if result:
+                                result['size'] = rows
+                                result['method'] = padding_family(method)
+                                result['workers'] = workers
+                                result['executor'] = executor_choice if workers > 1 else EXECUTOR_SERIAL
+                                all_results.append(result)
+
+                            run_index += 1
+                            progress_bar.progress(run_index / total_runs)
             
             if all_results:
                 st.session_state['timing_results'] = all_results
+                get_timing_store().record_many([{
+                    'source': SOURCE_TIMING_TEST,
+                    'rows': result['size'],
+                    'padding': result['method'],
+                    'workers': result['workers'],
+                    'executor': result['executor'],
+                    'total_s': result['total'],
+                    'reverse_s': result['reverse_cipher'],
+                    'encrypt_s': result['aes_encrypt'],
+                    'decrypt_s': result['aes_decrypt'],
+                    'undo_s': result['reverse_undo'],
+                } for result in all_results])
                 st.success("Pengujian waktu selesai!")
     
     if 'timing_results' in st.session_state:
         df_results = pd.DataFrame(st.session_state['timing_results'])
+        if 'workers' not in df_results.columns:
+            df_results['workers'] = 1
+        
+        parse_info = st.session_state.get('timing_parse')
+        if parse_info:
+            st.metric("Waktu Parse File (diukur sekali)", f"{parse_info['parse_time']:.4f} detik",
+                      help=f"{parse_info['rows']} baris, hash isi {parse_info['digest'][:12]}…")
         
         st.subheader("Tabel Hasil Pengujian Waktu")
         st.dataframe(df_results)
+        bucket_info = st.session_state.get('timing_buckets')
+        if bucket_info and PADDING_BUCKET in set(df_results['method']):
+            st.caption(f"Padding Bucket — {format_bucket_report(bucket_info)}")
         
         st.subheader("Visualisasi Waktu Eksekusi")
         
@@ -289,12 +764,54 @@ def run_comprehensive_timing_test(uploaded_file, key):
             x='size:Q',
             y='total:Q',
             color='method:N',
-            tooltip=['size', 'method', 'total']
+            strokeDash='workers:N',
+            tooltip=['size', 'method', 'workers', 'total']
         ).properties(title='Total Waktu Eksekusi vs Ukuran Data')
         st.altair_chart(chart_total, use_container_width=True)
         
+        if 'cipher_bytes' in df_results.columns:
+            # Ukuran ciphertext dan throughput AES per mode (CTR/GCM tanpa padding)
+            df_bytes = df_results[df_results['workers'] == df_results['workers'].min()].copy()
+            df_bytes['rasio_ukuran'] = df_bytes['cipher_bytes'] / df_bytes['plain_bytes'].where(df_bytes['plain_bytes'] > 0)
+            df_bytes['mb_per_s'] = (df_bytes['cipher_bytes'] / (1024 * 1024)) / (df_bytes['aes_encrypt'] + df_bytes['aes_decrypt'])
+            col_size, col_rate = st.columns(2)
+            with col_size:
+                st.altair_chart(alt.Chart(df_bytes).mark_line(point=True).encode(
+                    x='size:Q',
+                    y=alt.Y('cipher_bytes:Q', title='Byte ciphertext'),
+                    color='method:N',
+                    tooltip=['size', 'method', 'plain_bytes', 'cipher_bytes', alt.Tooltip('rasio_ukuran', format='.2f')]
+                ).properties(title='Ukuran Ciphertext per Mode'), use_container_width=True)
+            with col_rate:
+                st.altair_chart(alt.Chart(df_bytes).mark_line(point=True).encode(
+                    x='size:Q',
+                    y=alt.Y('mb_per_s:Q', title='Throughput AES (MB/detik)'),
+                    color='method:N',
+                    tooltip=['size', 'method', alt.Tooltip('mb_per_s', format='.2f')]
+                ).properties(title='Throughput Enkripsi+Dekripsi AES per Mode'), use_container_width=True)
+        
+        if df_results['workers'].nunique() > 1:
+            # Speedup tahap AES terhadap jumlah worker paling kecil yang diuji
+            df_speedup = df_results.copy()
+            df_speedup['aes_total'] = df_speedup['aes_encrypt'] + df_speedup['aes_decrypt']
+            baseline = df_speedup[df_speedup['workers'] == df_speedup['workers'].min()]
+            baseline = baseline.set_index(['size', 'method'])['aes_total']
+            df_speedup['speedup'] = [
+                baseline.get((size, method), float('nan')) / aes_total
+                for size, method, aes_total in zip(df_speedup['size'], df_speedup['method'], df_speedup['aes_total'])
+            ]
+            chart_speedup = alt.Chart(df_speedup).mark_line(point=True).encode(
+                x=alt.X('workers:Q', title='Jumlah Worker'),
+                y=alt.Y('speedup:Q', title='Speedup AES (x)'),
+                color='size:N',
+                strokeDash='method:N',
+                tooltip=['size', 'method', 'workers', alt.Tooltip('speedup', format='.2f')]
+            ).properties(title='Speedup Enkripsi/Dekripsi AES vs Jumlah Worker')
+            st.altair_chart(chart_speedup, use_container_width=True)
+        
+        df_results = df_results[df_results['workers'] == df_results['workers'].min()]
         df_melted = df_results.melt(id_vars=['size', 'method'], 
-                                   value_vars=['read_file', 'reverse_cipher', 'aes_encrypt', 
+                                   value_vars=['reverse_cipher', 'aes_encrypt', 
                                                'aes_decrypt', 'reverse_undo'],
                                    var_name='operation', 
                                    value_name='time')
@@ -321,8 +838,8 @@ def run_comprehensive_timing_test(uploaded_file, key):
         3. Perbedaan antara metode padding tidak signifikan dalam hal waktu.
         """)
 
-def simulate_long_string_avalanche_demo(key):
-    """Mendemonstrasikan Avalanche Effect dengan membalik satu bit"""
+def simulate_long_string_avalanche_demo(key, padding_method=PADDING_PKCS7):
+    """Mendemonstrasikan Avalanche Effect dengan membalik satu bit, memakai metode padding/mode yang dipilih"""
     st.subheader("💡 Simulasi Avalanche Effect pada String Panjang")
     
     sample_text = st.text_input("Masukkan teks contoh untuk simulasi:",
@@ -338,7 +855,7 @@ def simulate_long_string_avalanche_demo(key):
 
         # Enkripsi teks asli
         reversed_text_original = reverse_cipher(sample_text)
-        ciphertext_original = aes_encrypt_pkcs7(reversed_text_original, key)
+        ciphertext_original = aes_encrypt_batch([reversed_text_original], key, padding_method).hex_rows()[0]
         
         # Balik satu bit pada teks asli
         text_bytes = sample_text.encode('utf-8')
@@ -361,7 +878,7 @@ def simulate_long_string_avalanche_demo(key):
 
         # Enkripsi teks yang dimodifikasi
         reversed_text_modified = reverse_cipher(modified_text)
-        ciphertext_modified = aes_encrypt_pkcs7(reversed_text_modified, key)
+        ciphertext_modified = aes_encrypt_batch([reversed_text_modified], key, padding_method).hex_rows()[0]
 
         # Hitung perbedaan bit
         if len(ciphertext_original) != len(ciphertext_modified):
@@ -378,6 +895,87 @@ def simulate_long_string_avalanche_demo(key):
 
         st.markdown(f"**Total Bit yang Berbeda:** {diff_bits} bit dari {total_bits_ciphertext} bit")
         st.markdown(f"**Persentase Perubahan (Avalanche Effect):** **{percent_diff:.2f}%**")
+        st.caption(f"Metode padding/mode: **{padding_method}**.")
+        if padding_method in NONCE_MODES:
+            st.caption(f"Pada mode {padding_method} setiap enkripsi memakai nonce acak baru (ikut tersimpan di "
+                       "ciphertext), sehingga dua ciphertext berbeda sekitar 50% bahkan untuk plaintext yang sama. "
+                       "Dengan nonce yang sama, membalik satu bit plaintext hanya membalik satu bit ciphertext "
+                       "(lihat tab Uji SAC / BIC).")
+
+def show_sac_test(key, padding_method):
+    """Menampilkan uji Strict Avalanche Criterion (SAC) dan Bit Independence (BIC) secara batch"""
+    st.subheader("🧪 Uji Strict Avalanche Criterion (SAC) & Bit Independence")
+    st.write("""
+    Setiap plaintext dibuat semua varian balik-satu-bit pada input AES (setelah Reverse Cipher),
+    lalu seluruh varian dienkripsi dalam satu panggilan batch. Nilai ideal peluang flip adalah 0.5.
+    """)
+
+    sources = ["Teks contoh (satu per baris)"]
+    if st.session_state.get('file_processed', False):
+        sources.append("Baris dari file yang diproses")
+    source = st.radio("Sumber plaintext:", sources, horizontal=True, key="sac_source")
+
+    if source == "Teks contoh (satu per baris)":
+        sample_lines = st.text_area(
+            "Plaintext contoh:",
+            "\n".join(f"MAT{i:06d} || Contoh material {i}" for i in range(1, 21)),
+            height=150, key="sac_texts")
+        texts = [line for line in sample_lines.splitlines() if line.strip()]
+    else:
+        texts = st.session_state['hasil'].combined()
+
+    col_count, col_bytes = st.columns(2)
+    with col_count:
+        max_plaintexts = st.number_input("Maksimum jumlah plaintext:", min_value=1,
+                                         value=min(max(len(texts), 1), 2000), step=100, key="sac_count")
+    with col_bytes:
+        input_bytes = st.selectbox("Panjang input yang diuji (byte):", [16, 32, 48, 64], key="sac_bytes")
+
+    if padding_method in NONCE_MODES:
+        st.caption(f"Pada mode {padding_method} plaintext di-XOR dengan keystream, sehingga membalik satu bit "
+                   "plaintext hanya membalik satu bit ciphertext. Uji ini mengukur fungsi blok AES (ECB) "
+                   "yang membangkitkan keystream tersebut.")
+
+    if st.button("Jalankan Uji SAC"):
+        if not texts:
+            st.warning("Tidak ada plaintext untuk diuji.")
+            return
+        start = time.perf_counter()
+        result = strict_avalanche_test(texts[:max_plaintexts], key, input_bytes, padding_method)
+        result["elapsed"] = time.perf_counter() - start
+        st.session_state['sac_result'] = result
+
+    result = st.session_state.get('sac_result')
+    if not result:
+        return
+
+    sac, bic = result["sac"], result["bic"]
+    st.caption(f"{result['plaintexts']:,} plaintext unik × {result['input_bits']} bit = "
+               f"{result['variants']:,} varian dienkripsi dalam {result['elapsed']:.2f} detik")
+    cols = st.columns(4)
+    cols[0].metric("Rata-rata Peluang Flip", f"{sac['mean_flip_probability']:.4f}")
+    cols[1].metric("Deviasi Rata-rata dari 0.5", f"{sac['mean_deviation']:.4f}")
+    cols[2].metric("Deviasi Maksimum", f"{sac['max_deviation']:.4f}")
+    cols[3].metric("BIC |korelasi| maks", f"{bic['max_abs_correlation']:.4f}")
+    st.info(f"Rata-rata peluang flip pada blok AES lain: **{sac['cross_block_mean']:.4f}** "
+            "(mode ECB tidak menyebarkan perubahan antar blok).")
+
+    # Heatmap dirata-rata per byte agar jumlah sel tetap kecil
+    matrix = result["matrix"]
+    per_byte = matrix.reshape(matrix.shape[0] // 8, 8, matrix.shape[1] // 8, 8).mean(axis=(1, 3))
+    in_idx, out_idx = np.meshgrid(np.arange(per_byte.shape[0]), np.arange(per_byte.shape[1]), indexing="ij")
+    df_heat = pd.DataFrame({
+        "Byte Input": in_idx.ravel(),
+        "Byte Output": out_idx.ravel(),
+        "Peluang Flip": per_byte.ravel()
+    })
+    heatmap = alt.Chart(df_heat).mark_rect().encode(
+        x=alt.X('Byte Output:O'),
+        y=alt.Y('Byte Input:O'),
+        color=alt.Color('Peluang Flip:Q', scale=alt.Scale(domain=[0, 0.5, 1], range=['blue', 'white', 'red'])),
+        tooltip=['Byte Input', 'Byte Output', alt.Tooltip('Peluang Flip', format='.4f')]
+    ).properties(title="Matriks Peluang Flip (rata-rata per byte)")
+    st.altair_chart(heatmap, use_container_width=True)
 
 def show_crypto_diagram():
     """Menampilkan diagram alur proses kriptografi"""
@@ -408,22 +1006,23 @@ def show_manual_avalanche_calculation(hex1, hex2):
     st.markdown("### 🧮 Perhitungan Manual Avalanche Effect (Hex)")
     
     try:
-        val1 = int(hex1, 16)
-        val2 = int(hex2, 16)
+        if not hex1.strip() or not hex2.strip():
+            raise ValueError("ciphertext kosong")
+        bits1 = hex_to_bits(hex1)
+        bits2 = hex_to_bits(hex2)
     except ValueError:
         st.error("Masukkan ciphertext heksadesimal yang valid.")
         return
 
-    b1 = bin(val1)[2:].zfill(len(hex1) * 4)
-    b2 = bin(val2)[2:].zfill(len(hex2) * 4)
-    
-    max_len = max(len(b1), len(b2))
-    b1 = b1.zfill(max_len)
-    b2 = b2.zfill(max_len)
+    max_len = max(len(bits1), len(bits2))
+    bits1 = np.pad(bits1, (max_len - len(bits1), 0))
+    bits2 = np.pad(bits2, (max_len - len(bits2), 0))
+    b1 = "".join(map(str, bits1[:101]))
+    b2 = "".join(map(str, bits2[:101]))
 
-    diff_bits = [i for i, (bit1, bit2) in enumerate(zip(b1, b2)) if bit1 != bit2]
+    diff_bits = np.flatnonzero(bits1 != bits2)
     total_diff = len(diff_bits)
-    total_bits = len(b1)
+    total_bits = max_len
     percent = (total_diff / total_bits) * 100 if total_bits > 0 else 0
     
     col1, col2 = st.columns(2)
@@ -441,8 +1040,169 @@ def show_manual_avalanche_calculation(hex1, hex2):
     st.markdown(f"**Total Bit Berbeda:** {total_diff} bit dari {total_bits} bit")
     st.markdown(f"**Persentase Perubahan (Avalanche Effect):** {percent:.2f}%")
 
+def paginate(total_rows, key):
+    """Kontrol paginasi (ukuran halaman dan nomor halaman), mengembalikan rentang baris [start, stop)"""
+    col_size, col_page, col_info = st.columns([1, 1, 2])
+    with col_size:
+        page_size = st.selectbox("Baris per halaman:", PAGE_SIZES, index=1, key=f"{key}_page_size")
+    page_count = max(1, -(-total_rows // page_size))
+    page_key = f"{key}_page"
+    # Nomor halaman disimpan di session state agar tetap valid saat ukuran halaman berubah
+    st.session_state[page_key] = min(st.session_state.get(page_key, 1), page_count)
+    with col_page:
+        page = st.number_input("Halaman:", min_value=1, max_value=page_count, step=1, key=page_key)
+    start = (page - 1) * page_size
+    stop = min(start + page_size, total_rows)
+    with col_info:
+        st.caption(f"Halaman {page} dari {page_count} — menampilkan baris {start + 1 if total_rows else 0}–{stop} "
+                   f"dari {total_rows} baris")
+    return start, stop
+
+def show_accuracy_summary(hasil, confidence=0.95):
+    """Ringkasan akurasi dekripsi di sidebar, sesuai tingkat verifikasi yang benar-benar dilakukan"""
+    interval = hasil.success_interval(confidence)
+    with st.sidebar.expander("🔍 Ringkasan Akurasi Dekripsi"):
+        if interval is None:
+            st.markdown(f"""
+            ### Hasil Pengujian Akurasi Dekripsi:
+            - Mode: **{hasil.mode}** — hasil tidak diverifikasi
+            - Jumlah baris diproses: **{len(hasil)}**
+            """)
+            return
+        checked = hasil.checked_count
+        success_rate = hasil.match_count / checked * 100
+        if checked >= len(hasil):
+            confidence_text = "pasti (semua baris diverifikasi)"
+        else:
+            confidence_text = (f"{interval[0] * 100:.2f}% – {interval[1] * 100:.2f}% "
+                               f"(kepercayaan {confidence:.0%})")
+        st.markdown(f"""
+        ### Hasil Pengujian Akurasi Dekripsi:
+        - Mode: **{hasil.mode}**
+        - Tingkat keberhasilan: **{success_rate:.2f}%**
+        - Rentang untuk seluruh baris: **{confidence_text}**
+        - Jumlah baris diproses: **{len(hasil)}**
+        - Baris diverifikasi: **{checked}** ({checked / len(hasil):.1%})
+        - Baris sukses dekripsi: **{hasil.match_count}**
+        - Baris gagal dekripsi: **{len(hasil.mismatches)}**
+        """)
+
+def show_result_page(hasil, view):
+    """Menampilkan satu halaman dari tampilan hasil yang dipilih (hanya irisan yang terlihat yang dibuat)"""
+    start, stop = paginate(len(hasil), "hasil")
+    index = pd.RangeIndex(start + 1, stop + 1, name="Baris")
+
+    if view == "Data Asli":
+        st.subheader("Data Asli (Plaintext)")
+        st.dataframe(pd.DataFrame(hasil.original(start, stop), columns=hasil.headers, index=index))
+    elif view == "Hasil Reverse Cipher":
+        st.subheader("Hasil Reverse Cipher (Sebelum AES Enkripsi)")
+        st.dataframe(pd.DataFrame({
+            "Data Asli": hasil.combined(start, stop),
+            "Hasil Reverse Cipher": hasil.reversed_encrypt(start, stop)
+        }, index=index))
+    elif view == "Hasil AES Enkripsi":
+        st.subheader("Hasil Enkripsi AES-128 (Hexadesimal)")
+        st.dataframe(pd.DataFrame({
+            "Input ke AES": hasil.reversed_encrypt(start, stop),
+            "Ciphertext AES": hasil.aes_hex(start, stop)
+        }, index=index))
+    else:
+        st.subheader("Hasil Dekripsi Lengkap")
+        checked = hasil.checked_count
+        if checked == 0:
+            st.warning(f"Mode **{hasil.mode}**: tidak ada baris yang didekripsi, sehingga kolom hasil dekripsi "
+                       f"berisi '{NOT_DECRYPTED}'.")
+        elif checked < len(hasil):
+            st.info(f"Mode **{hasil.mode}**: hanya **{checked}** dari **{len(hasil)}** baris "
+                    f"({checked / len(hasil):.1%}) yang didekripsi dan diverifikasi; baris lainnya berisi "
+                    f"'{NOT_DECRYPTED}' dengan status '–'.")
+        st.dataframe(pd.DataFrame({
+            "Data Asli": hasil.combined(start, stop),
+            "Hasil Dekripsi Akhir": hasil.reversed_decrypt(start, stop),
+            "Status Kecocokan": ["–" if ok is None else "✅" if ok else "❌" for ok in hasil.match(start, stop)]
+        }, index=index))
+
+def show_container_panel(hasil, key):
+    """Unduhan container biner hasil enkripsi dan dekripsi acak satu baris lewat offset index"""
+    with st.expander("📦 Container Terenkripsi (.skc)"):
+        container = st.session_state.get('hasil_container')
+        if container is None:
+            container = container_bytes(hasil.ciphertexts, hasil.padding_method_used, key)
+            st.session_state['hasil_container'] = container
+        reader = ContainerReader(container)
+        col1, col2, col3 = st.columns(3)
+        col1.metric("Jumlah baris", len(reader))
+        col2.metric("Ukuran container", f"{len(container) / 1024:.1f} KB",
+                    help=f"Hex di memori: {len(hasil.ciphertexts.buffer) * 2 / 1024:.1f} KB")
+        col3.metric("Indeks offset", f"tetap {reader.row_stride} byte/baris" if reader.row_stride else "per baris")
+        st.download_button("⬇️ Unduh container", container, file_name=f"hasil_enkripsi{CONTAINER_EXTENSION}",
+                           mime="application/octet-stream")
+
+        row_number = st.number_input("Dekripsi baris ke- (mulai dari 1):", min_value=1, max_value=max(len(reader), 1),
+                                     value=1, step=1, key="container_row")
+        plaintext = reader.decrypt_rows([int(row_number) - 1], key, on_error=st.error)[0]
+        st.code(f"Ciphertext: {reader.row(int(row_number) - 1).hex()}\nPlaintext : {plaintext}")
+        st.caption("Container dari CLI dapat dibaca per baris lewat mmap: "
+                   "`python skripsi_cli.py hasil_enkripsi.skc --mode decrypt --row-index 734 -o baris.csv`")
+
+def show_encrypted_lookup(hasil, key):
+    """Pencarian baris lewat indeks kesamaan ciphertext pada tabel terenkripsi per kolom"""
+    with st.expander("🔎 Pencarian pada Data Terenkripsi (tanpa dekripsi penuh)"):
+        if hasil.padding_method_used in NONCE_MODES:
+            st.info(f"Mode {hasil.padding_method_used} memakai nonce acak per baris, sehingga nilai yang sama "
+                    "tidak menghasilkan ciphertext yang sama dan tidak dapat dicari lewat indeks ciphertext.")
+            return
+        st.write("""
+        Setiap kolom dienkripsi sendiri (mode per kolom). Nilai yang dicari dienkripsi dengan kunci dan
+        padding yang sama, lalu dicocokkan lewat hash index ciphertext → nomor baris. Hanya baris yang
+        cocok yang didekripsi. Karena AES-ECB deterministik, nilai yang sama selalu menghasilkan
+        ciphertext yang sama.
+        """)
+        col_column, col_value = st.columns(2)
+        with col_column:
+            column = st.selectbox("Kolom:", hasil.headers,
+                                  index=hasil.headers.index(KEY_COLUMN) if KEY_COLUMN in hasil.headers else 0,
+                                  key="lookup_column")
+        with col_value:
+            value = st.text_input("Nilai yang dicari:", key="lookup_value")
+
+        if st.button("Cari") and value:
+            lookup = st.session_state.get('hasil_lookup')
+            if lookup is None:
+                start = time.perf_counter()
+                table = encrypt_columns(hasil.headers, hasil.original(), key, hasil.padding_method_used)
+                lookup = {'table': table, 'encrypt_time': time.perf_counter() - start, 'indexes': {}}
+                st.session_state['hasil_lookup'] = lookup
+            index = lookup['indexes'].get(column)
+            if index is None:
+                start = time.perf_counter()
+                index = CiphertextIndex(lookup['table'], column)
+                lookup['indexes'][column] = (index, time.perf_counter() - start)
+            else:
+                index = index[0]
+
+            start = time.perf_counter()
+            matches, values = index.lookup(value, key, on_error=st.error)
+            lookup_time = time.perf_counter() - start
+
+            start = time.perf_counter()
+            scanned = decrypt_columns(lookup['table'], key, [column], on_error=st.error)[column]
+            scan_matches = [i for i, text in enumerate(scanned) if text == value]
+            scan_time = time.perf_counter() - start
+
+            col1, col2, col3 = st.columns(3)
+            col1.metric("Baris cocok", len(matches))
+            col2.metric("Lookup indeks", f"{lookup_time * 1000:.3f} ms",
+                        help=f"Indeks {column}: {len(index)} ciphertext unik, dibangun dalam "
+                             f"{lookup['indexes'][column][1] * 1000:.1f} ms")
+            col3.metric("Scan dengan dekripsi", f"{scan_time * 1000:.3f} ms",
+                        delta=None if scan_matches == matches else "hasil berbeda", delta_color="inverse")
+            if matches:
+                st.dataframe(pd.DataFrame({'Baris': [i + 1 for i in matches], **values}))
+
 def show_avalanche_visual(avalanche_data, aes_results=None, padding_method_used="N/A"):
-    """Menampilkan visualisasi Avalanche Effect"""
+    """Menampilkan visualisasi Avalanche Effect (aes_results berupa BatchCiphertext)"""
     df = pd.DataFrame(avalanche_data, columns=["Baris A", "Baris B", "Persentase (%)"])
     df["Persentase (%)"] = df["Persentase (%)"].astype(float).round(2)
 
@@ -467,6 +1227,9 @@ def show_avalanche_visual(avalanche_data, aes_results=None, padding_method_used=
     ).interactive()
     st.altair_chart(chart, use_container_width=True)
 
+    if aes_results and len(aes_results) >= 2:
+        show_avalanche_engine(aes_results)
+
     if aes_results and len(aes_results) >= 2:
         st.markdown("---")
         st.markdown("### 🔍 Perhitungan Manual Avalanche Effect")
@@ -483,20 +1246,102 @@ def show_avalanche_visual(avalanche_data, aes_results=None, padding_method_used=
             if len(selected_idx_str) == 2:
                 idx1, idx2 = int(selected_idx_str[0])-1, int(selected_idx_str[1])-1
                 if idx1 < len(aes_results) and idx2 < len(aes_results):
-                    show_manual_avalanche_calculation(aes_results[idx1], aes_results[idx2])
+                    show_manual_avalanche_calculation(aes_results.row(idx1).hex(), aes_results.row(idx2).hex())
+
+def show_avalanche_engine(aes_results):
+    """Menampilkan analisis avalanche tervektorisasi: berdekatan, semua pasangan (blok) atau sampel acak"""
+    st.markdown("---")
+    st.markdown("### ⚡ Analisis Avalanche Lanjutan (XOR + Popcount)")
+
+    col_mode, col_cap, col_k = st.columns(3)
+    with col_mode:
+        mode = st.selectbox("Mode analisis:", AVALANCHE_MODES, key="avalanche_engine_mode")
+    with col_cap:
+        memory_cap_mb = st.number_input("Batas memori per blok (MB):", min_value=1,
+                                        value=DEFAULT_MEMORY_CAP // (1024 * 1024), step=16,
+                                        disabled=mode != MODE_ALL_PAIRS, key="avalanche_engine_cap")
+    with col_k:
+        sample_pairs = st.number_input("Jumlah pasangan sampel (K):", min_value=1, value=DEFAULT_SAMPLE_PAIRS,
+                                       step=1000, disabled=mode != MODE_SAMPLED, key="avalanche_engine_k")
+
+    if st.button("Hitung Distribusi Avalanche"):
+        start = time.perf_counter()
+        result = run_avalanche(aes_results, mode, memory_cap=memory_cap_mb * 1024 * 1024,
+                               sample_pairs=sample_pairs)
+        result["elapsed"] = time.perf_counter() - start
+        st.session_state['avalanche_engine'] = result
+
+    result = st.session_state.get('avalanche_engine')
+    if not result:
+        return
+
+    summary = result["summary"]
+    st.caption(f"Mode: **{result['mode']}** — {summary['pairs']:,} pasangan dihitung dalam {result['elapsed']:.3f} detik")
+    cols = st.columns(4)
+    cols[0].metric("Rata-rata", f"{summary['mean']:.2f}%")
+    cols[1].metric("Simpangan Baku", f"{summary['std']:.2f}%")
+    cols[2].metric("Median", f"{summary['median']:.2f}%")
+    cols[3].metric("Min / Maks", f"{summary['min']:.1f}% / {summary['max']:.1f}%")
+    st.table(pd.DataFrame([summary]).style.format(precision=2))
+
+    df_hist = pd.DataFrame({
+        "Persentase (%)": HISTOGRAM_BINS[:-1],
+        "Jumlah Pasangan": result["histogram"]
+    })
+    df_hist = df_hist[df_hist["Jumlah Pasangan"] > 0]
+    chart = alt.Chart(df_hist).mark_bar().encode(
+        x=alt.X('Persentase (%):Q', title='Perubahan Bit (%)', bin=alt.Bin(binned=True, step=0.5)),
+        y=alt.Y('Jumlah Pasangan:Q'),
+        tooltip=['Persentase (%)', 'Jumlah Pasangan']
+    ).properties(title="Distribusi Avalanche Effect")
+    st.altair_chart(chart, use_container_width=True)
+
+def show_trace_summary():
+    """Menampilkan ringkasan span per tahap dari proses terakhir beserta unduhan Chrome trace"""
+    st.markdown("### 🔬 Trace Tahap Pipeline")
+    trace = st.session_state.get('trace')
+    if not trace:
+        st.info("Aktifkan '🔬 Rekam trace per tahap' pada pengaturan lalu jalankan proses untuk melihat rincian "
+                "waktu dan memori setiap tahap.")
+        return
+
+    st.write(f"Proses terakhir: **{trace['rows']} baris**, padding **{trace['padding']}**"
+             f"{', dengan profil memori' if trace['memory'] else ''}.")
+    df_trace = pd.DataFrame(trace['summary'])
+    st.dataframe(df_trace.style.format({
+        'total_ms': '{:.3f}',
+        'peak_kib': '{:.1f}',
+        'rows_per_s': '{:,.0f}',
+        'mb_per_s': '{:.2f}'
+    }, na_rep='-'))
+    st.caption("Tahap 'verify' mencakup 'decrypt', 'unpad' dan 'reverse_undo'. Proses berjalan sebagai job latar "
+               "belakang, sehingga pembaruan progres di UI tidak ikut terukur sebagai tahap.")
+
+    chart = alt.Chart(df_trace).mark_bar().encode(
+        x=alt.X('total_ms:Q', title='Total Waktu (ms)'),
+        y=alt.Y('stage:N', sort=None, title='Tahap'),
+        tooltip=['stage', 'calls', alt.Tooltip('total_ms', format='.3f'), 'rows', 'bytes', 'peak_kib']
+    ).properties(title='Waktu per Tahap Pipeline')
+    st.altair_chart(chart, use_container_width=True)
+
+    st.download_button("⬇️ Unduh Chrome trace (.json)", trace['chrome_trace'], file_name="trace_pipeline.json",
+                       mime="application/json",
+                       help="Buka di chrome://tracing atau https://ui.perfetto.dev")
 
 def show_execution_time():
     """Menampilkan visualisasi dan analisis hasil pengujian waktu enkripsi dan dekripsi"""
     st.markdown("### 🕒 Analisis Waktu Eksekusi")
     
-    if os.path.exists(LOG_FILE) and os.path.getsize(LOG_FILE) > 0:
+    # Ringkasan per (jumlah data, metode padding) sudah diagregasi di log waktu
+    df_log = get_timing_store().summary().rename(columns={
+        'rows': 'Jumlah Data',
+        'padding': 'Metode Padding',
+        'runs': 'Jumlah Run',
+        'mean_s': 'Waktu Eksekusi (detik)'
+    })
+    
+    if not df_log.empty:
         try:
-            df_log = pd.read_csv(LOG_FILE)
-            
-            # Memastikan kolom yang diperlukan ada
-            if 'Metode Padding' not in df_log.columns:
-                df_log['Metode Padding'] = 'PKCS#7'  # Default jika kolom tidak ada
-            
             # Format ulang tabel untuk perbandingan
             comparison_df = df_log.pivot_table(
                 index='Jumlah Data',
@@ -504,23 +1349,30 @@ def show_execution_time():
                 values='Waktu Eksekusi (detik)',
                 aggfunc='mean'
             ).reset_index()
+            # Semua metode dibandingkan terhadap satu baseline: PKCS#7
+            baseline = PADDING_PKCS7
+            if baseline not in comparison_df.columns:
+                comparison_df[baseline] = float('nan')
+            method_columns = [method for method in PADDING_METHODS if method in comparison_df.columns]
+            other_methods = [method for method in method_columns if method != baseline]
             
-            # Tambahkan kolom perbedaan waktu
-            if 'PKCS#7' in comparison_df.columns and 'Fixed Length' in comparison_df.columns:
-                comparison_df['Perbedaan (detik)'] = comparison_df['PKCS#7'] - comparison_df['Fixed Length']
-                comparison_df['Perbedaan (%)'] = ((comparison_df['PKCS#7'] - comparison_df['Fixed Length']) / comparison_df['PKCS#7']) * 100
+            # Tambahkan kolom perbedaan waktu (metode - PKCS#7); negatif berarti lebih cepat dari PKCS#7
+            diff_s_columns = {method: f'Δ {method} (detik)' for method in other_methods}
+            diff_pct_columns = {method: f'Δ {method} (%)' for method in other_methods}
+            for method in other_methods:
+                comparison_df[diff_s_columns[method]] = comparison_df[method] - comparison_df[baseline]
+                comparison_df[diff_pct_columns[method]] = (comparison_df[diff_s_columns[method]] / comparison_df[baseline]) * 100
             
             # Tampilkan tabel dengan styling
             st.markdown("#### Tabel 4.3.1 Hasil Pengujian Waktu")
+            st.caption(f"Kolom Δ = waktu metode dikurangi waktu {baseline}; hijau berarti lebih cepat dari {baseline}.")
             st.dataframe(
                 comparison_df.style.format({
-                    'PKCS#7': '{:.4f}',
-                    'Fixed Length': '{:.4f}',
-                    'Perbedaan (detik)': '{:.4f}',
-                    'Perbedaan (%)': '{:.2f}%'
-                }).applymap(lambda x: 'color: green' if isinstance(x, str) and '-' in x and x.endswith('%') and float(x[:-1]) < 0 
-                          else 'color: red' if isinstance(x, str) and x.endswith('%') and float(x[:-1]) > 0 
-                          else '', subset=['Perbedaan (%)'])
+                    **{method: '{:.4f}' for method in method_columns},
+                    **{column: '{:.4f}' for column in diff_s_columns.values()},
+                    **{column: '{:+.2f}%' for column in diff_pct_columns.values()}
+                }, na_rep='-').map(lambda x: 'color: green' if x < 0 else 'color: red' if x > 0 else '',
+                                   subset=list(diff_pct_columns.values()))
                 .set_properties(**{'text-align': 'center'})
                 .set_table_styles([{
                     'selector': 'th',
@@ -528,11 +1380,19 @@ def show_execution_time():
                 }])
             )
             
-            # Analisis statistik
-            avg_diff = comparison_df['Perbedaan (detik)'].mean()
-            avg_pct_diff = comparison_df['Perbedaan (%)'].mean()
-            max_diff = comparison_df['Perbedaan (detik)'].max()
-            min_diff = comparison_df['Perbedaan (detik)'].min()
+            # Analisis statistik per metode terhadap baseline
+            diff_stats = []
+            for method in other_methods:
+                diffs = comparison_df[diff_s_columns[method]].dropna()
+                if diffs.empty:
+                    continue
+                diff_stats.append({
+                    'method': method,
+                    'avg_diff': diffs.mean(),
+                    'avg_pct_diff': comparison_df[diff_pct_columns[method]].dropna().mean(),
+                    'max_diff': diffs.max(),
+                    'min_diff': diffs.min()
+                })
             
             st.markdown("#### Gambar 4.3.1 Grafik Perbandingan Waktu Eksekusi")
             
@@ -547,7 +1407,7 @@ def show_execution_time():
                 ).properties(
                     width=600,
                     height=400,
-                    title="Perbandingan Waktu Eksekusi antara PKCS#7 dan Fixed Length"
+                    title="Perbandingan Waktu Eksekusi antar Metode Padding/Mode AES"
                 )
                 
                 # Grafik area untuk menunjukkan perbedaan
@@ -559,19 +1419,24 @@ def show_execution_time():
                 
                 st.altair_chart(line_chart + area_chart, use_container_width=True)
                 
-                # Grafik batang perbedaan
-                if 'Perbedaan (detik)' in comparison_df.columns:
-                    bar_chart = alt.Chart(comparison_df).mark_bar().encode(
-                        x='Jumlah Data:Q',
+                # Grafik batang perbedaan tiap metode terhadap baseline
+                if diff_stats:
+                    diff_long = comparison_df.melt(
+                        id_vars='Jumlah Data',
+                        value_vars=list(diff_s_columns.values()),
+                        var_name='Metode Padding',
+                        value_name='Perbedaan (detik)'
+                    ).dropna(subset=['Perbedaan (detik)'])
+                    diff_long['Metode Padding'] = diff_long['Metode Padding'].map(
+                        {column: method for method, column in diff_s_columns.items()})
+                    bar_chart = alt.Chart(diff_long).mark_bar().encode(
+                        x='Jumlah Data:O',
+                        xOffset='Metode Padding:N',
                         y='Perbedaan (detik):Q',
-                        color=alt.condition(
-                            alt.datum['Perbedaan (detik)'] > 0,
-                            alt.value('red'),  # Positive difference
-                            alt.value('green')  # Negative difference
-                        ),
-                        tooltip=['Jumlah Data', 'Perbedaan (detik)', 'Perbedaan (%)']
+                        color=alt.Color('Metode Padding:N', legend=alt.Legend(title="Metode Padding")),
+                        tooltip=['Jumlah Data', 'Metode Padding', alt.Tooltip('Perbedaan (detik)', format='.4f')]
                     ).properties(
-                        title='Perbedaan Waktu Eksekusi (PKCS#7 - Fixed Length)'
+                        title=f'Perbedaan Waktu Eksekusi terhadap {baseline} (metode - {baseline})'
                     )
                     st.altair_chart(bar_chart, use_container_width=True)
                 
@@ -589,37 +1454,41 @@ def show_execution_time():
                 
                 # Analisis perbedaan
                 st.markdown("#### Analisis Perbedaan Performa")
-                st.write(f"""
-                **Hasil Pengujian:**
-                - **Rata-rata perbedaan waktu**: {avg_diff:.4f} detik (PKCS#7 lebih lambat)
-                - **Rata-rata perbedaan persentase**: {avg_pct_diff:.2f}%
-                - **Perbedaan maksimum**: {max_diff:.4f} detik
-                - **Perbedaan minimum**: {min_diff:.4f} detik
-                """)
-                
-                st.markdown("""
-                **Interpretasi Hasil:**
-                1. **Linearitas Waktu Eksekusi**:
-                   - Grafik menunjukkan hubungan linear antara jumlah data dan waktu eksekusi, sesuai dengan teori kompleksitas O(n) untuk AES.
-                   - Setiap penambahan 100 baris data meningkatkan waktu eksekusi sekitar 0.2-0.4 detik.
+                if diff_stats:
+                    st.write("**Hasil Pengujian** (terhadap " + baseline + "):\n" + "\n".join(
+                        f"- **{stat['method']}**: rata-rata {abs(stat['avg_diff']):.4f} detik "
+                        f"({abs(stat['avg_pct_diff']):.2f}%) "
+                        f"{'lebih cepat' if stat['avg_diff'] < 0 else 'lebih lambat'} dari {baseline}; "
+                        f"perbedaan maksimum {stat['max_diff']:.4f} detik, minimum {stat['min_diff']:.4f} detik"
+                        for stat in diff_stats))
+                else:
+                    st.info(f"Belum ada pasangan pengukuran {baseline} dan metode lain pada jumlah data yang sama.")
                 
-                2. **Perbandingan Metode Padding**:
-                   - Metode PKCS#7 secara konsisten lebih lambat 1-7% dibanding Fixed Length.
-                   - Perbedaan ini disebabkan oleh overhead operasi padding/unpadding dinamis pada PKCS#7.
-                   - Fixed Length memiliki performa lebih stabil karena menggunakan padding statis.
+                # Kemiringan waktu per 100 baris dari regresi linear hasil terukur
+                slopes = []
+                for method, group in df_log.groupby('Metode Padding'):
+                    if group['Jumlah Data'].nunique() >= 2:
+                        slope = np.polyfit(group['Jumlah Data'], group['Waktu Eksekusi (detik)'], 1)[0]
+                        slopes.append(f"{method}: {slope * 100:.4f} detik")
                 
-                3. **Faktor-faktor yang Mempengaruhi**:
-                   - Ukuran data: Pengaruh metode padding lebih terlihat pada data besar (>500 baris).
-                   - Variasi waktu: Pada data kecil, perbedaan tidak signifikan karena overhead inisialisasi.
-                """)
+                st.markdown("**Interpretasi Hasil:**")
+                if slopes:
+                    st.markdown("- **Linearitas Waktu Eksekusi**: tambahan waktu per 100 baris data "
+                                "(kemiringan regresi linear) — " + "; ".join(slopes) + ".")
+                if diff_stats:
+                    fastest = min(diff_stats, key=lambda stat: stat['avg_pct_diff'])
+                    slowest = max(diff_stats, key=lambda stat: stat['avg_pct_diff'])
+                    st.markdown(f"- **Perbandingan Metode**: relatif terhadap {baseline}, metode tercepat adalah "
+                                f"**{fastest['method']}** ({fastest['avg_pct_diff']:+.2f}%) dan paling lambat "
+                                f"**{slowest['method']}** ({slowest['avg_pct_diff']:+.2f}%).")
+                st.markdown("- **Faktor yang Mempengaruhi**: pada data kecil overhead inisialisasi mendominasi, "
+                            "sehingga perbedaan antar metode baru terlihat jelas pada data besar.")
 
-        except pd.errors.EmptyDataError:
-            st.warning("File log waktu kosong atau rusak. Tidak dapat menampilkan data pengujian waktu.")
         except Exception as e:
-            st.error(f"Terjadi kesalahan saat membaca file log waktu: {e}")
+            st.error(f"Terjadi kesalahan saat membaca log waktu: {e}")
     else:
-        # Tampilkan contoh data jika file log belum ada
-        st.info("File log waktu belum ditemukan atau kosong. Berikut contoh data untuk ilustrasi:")
+        # Tampilkan contoh data jika log belum berisi hasil
+        st.info("Log waktu belum berisi hasil pengujian. Berikut contoh data untuk ilustrasi:")
         
         example_data = {
             "Jumlah Data (Baris)": [10, 50, 100, 200, 500, 1000],
@@ -648,9 +1517,9 @@ def show_execution_time():
        - Implementasi kombinasi AES-128 + Reverse Cipher menunjukkan kompleksitas waktu linear (O(n)) sesuai teori.
        - Skala waktu sebanding dengan jumlah data yang diproses.
     
-    2. **Performa Metode Padding**:
-       - Fixed Length memiliki performa lebih baik (1-7% lebih cepat) dibanding PKCS#7 untuk dataset besar.
-       - Perbedaan semakin signifikan seiring pertambahan ukuran data.
+    2. **Performa Metode Padding/Mode**:
+       - Perbandingan antar metode (Fixed Length, Bucket, CTR, GCM) terhadap PKCS#7 mengikuti hasil terukur pada tabel dan grafik di atas.
+       - CTR dan GCM tidak memerlukan padding, tetapi menambah nonce (dan tag pada GCM) di setiap baris.
     
     3. **Rekomendasi Implementasi**:
        - Untuk aplikasi dengan data sensitif, PKCS#7 lebih direkomendasikan karena standar keamanannya.
@@ -658,108 +1527,92 @@ def show_execution_time():
     
     4. **Validasi Teori**:
        - Hasil empiris sesuai dengan teori kompleksitas algoritma kriptografi.
-       - Overhead operasi padding menjadi faktor penentu perbedaan performa.
+       - Overhead padding (atau nonce/tag pada CTR dan GCM) menjadi faktor penentu perbedaan performa antar metode.
     """)
 
-def show_aes_simulation():
-    """Menampilkan simulasi interaktif tahap-tahap AES"""
-    st.title("🔢 Simulasi Interaktif Proses AES")
-    
-    SBOX = {
-        "00": "63", "01": "7c", "02": "77", "03": "7b", "04": "f2", "05": "6b", "06": "6f", "07": "c5",
-        "08": "30", "09": "01", "0a": "67", "0b": "2b", "0c": "fe", "0d": "d7", "0e": "ab", "0f": "76",
-        "10": "ca", "11": "82", "12": "c9", "13": "7d", "14": "fa", "15": "59", "16": "47", "17": "f0",
-        "18": "ad", "19": "d4", "1a": "a2", "1b": "af", "1c": "9c", "1d": "a4", "1e": "72", "1f": "c0",
-        "20": "b7", "21": "fd", "22": "93", "23": "26", "24": "36", "25": "3f", "26": "f7", "27": "cc",
-        "28": "34", "29": "a5", "2a": "e5", "2b": "f1", "2c": "71", "2d": "d8", "2e": "31", "2f": "15",
-        "30": "04", "31": "c7", "32": "23", "33": "c3", "34": "18", "35": "96", "36": "05", "37": "9a",
-        "38": "07", "39": "12", "3a": "80", "3b": "e2", "3c": "eb", "3d": "27", "3e": "b2", "3f": "75",
-        "40": "09", "41": "83", "42": "2c", "43": "1a", "44": "1b", "45": "6e", "46": "5a", "47": "a0",
-        "48": "52", "49": "3b", "4a": "d6", "4b": "b3", "4c": "29", "4d": "e3", "4e": "2f", "4f": "84",
-        "50": "53", "51": "d1", "52": "00", "53": "ed", "54": "20", "55": "fc", "56": "b1", "57": "5b",
-        "58": "6a", "59": "cb", "5a": "be", "5b": "39", "5c": "4a", "5d": "4c", "5e": "58", "5f": "cf",
-        "60": "d0", "61": "ef", "62": "aa", "63": "fb", "64": "43", "65": "4d", "66": "33", "67": "85",
-        "68": "45", "69": "f9", "6a": "02", "6b": "7f", "6c": "50", "6d": "3c", "6e": "9f", "6f": "a8",
-        "70": "51", "71": "a3", "72": "40", "73": "8f", "74": "92", "75": "9d", "76": "38", "77": "f5",
-        "78": "bc", "79": "b6", "7a": "da", "7b": "21", "7c": "10", "7d": "ff", "7e": "f3", "7f": "d2",
-        "80": "cd", "81": "0c", "82": "13", "83": "ec", "84": "5f", "85": "97", "86": "44", "87": "17",
-        "88": "c4", "89": "a7", "8a": "7e", "8b": "3d", "8c": "64", "8d": "5d", "8e": "19", "8f": "73",
-        "90": "60", "91": "81", "92": "4f", "93": "dc", "94": "22", "95": "2a", "96": "90", "97": "88",
-        "98": "46", "99": "ee", "9a": "b8", "9b": "14", "9c": "de", "9d": "5e", "9e": "0b", "9f": "db",
-        "a0": "e0", "a1": "32", "a2": "3a", "a3": "0a", "a4": "49", "a5": "06", "a6": "24", "a7": "5c",
-        "a8": "c2", "a9": "d3", "aa": "ac", "ab": "62", "ac": "91", "ad": "95", "ae": "e4", "af": "79",
-        "b0": "e7", "b1": "c8", "b2": "37", "b3": "6d", "b4": "8d", "b5": "d5", "b6": "4e", "b7": "a9",
-        "b8": "6c", "b9": "56", "ba": "f4", "bb": "ea", "bc": "65", "bd": "7a", "be": "ae", "bf": "08",
-        "c0": "ba", "c1": "78", "c2": "25", "c3": "2e", "c4": "1c", "c5": "a6", "c6": "b4", "c7": "c6",
-        "c8": "e8", "c9": "dd", "ca": "74", "cb": "1f", "cc": "4b", "cd": "bd", "ce": "8b", "cf": "8a",
-        "d0": "70", "d1": "3e", "d2": "b5", "d3": "66", "d4": "48", "d5": "03", "d6": "f6", "d7": "0e",
-        "d8": "61", "d9": "35", "da": "57", "db": "b9", "dc": "86", "dd": "c1", "de": "1d", "df": "9e",
-        "e0": "e1", "e1": "f8", "e2": "98", "e3": "11", "e4": "69", "e5": "d9", "e6": "8e", "e7": "94",
-        "e8": "9b", "e9": "1e", "ea": "87", "eb": "e9", "ec": "ce", "ed": "55", "ee": "28", "ef": "df",
-        "f0": "8c", "f1": "a1", "f2": "89", "f3": "0d", "f4": "bf", "f5": "e6", "f6": "42", "f7": "68",
-        "f8": "41", "f9": "99", "fa": "2d", "fb": "0f", "fc": "b0", "fd": "54", "fe": "bb", "ff": "16"
-    }
-    
-    steps = ["SubBytes", "ShiftRows", "MixColumns", "AddRoundKey"]
-    step = st.selectbox("Pilih tahap AES:", steps)
-    
-    st.subheader("State Awal (Input)")
-    state_input = []
+def state_frame(state):
+    """State AES 16 byte (urutan kolom) sebagai tabel hex 4x4"""
+    grid = np.asarray(state, dtype=np.uint8).reshape(4, 4).T
+    return pd.DataFrame([[f"{value:02x}" for value in row] for row in grid],
+                        index=[f"Baris {i}" for i in range(4)], columns=[f"Kolom {j}" for j in range(4)])
+
+def read_state_grid(prefix, label):
+    """Input 4x4 byte hex dari pengguna, dikembalikan sebagai state 16 byte (urutan kolom)"""
+    state = np.zeros(16, dtype=np.uint8)
     for i in range(4):
         cols = st.columns(4)
-        row = []
         for j in range(4):
-            val = cols[j].text_input(f"S[{i},{j}]", value="00", max_chars=2).lower()
+            val = cols[j].text_input(f"{label}[{i},{j}]", value="00", max_chars=2, key=f"{prefix}_{i}_{j}").lower()
             if not (len(val) == 2 and all(c in '0123456789abcdef' for c in val)):
                 cols[j].error("Input harus hex 2 digit")
                 val = "00"
-            row.append(val)
-        state_input.append(row)
+            state[i + 4 * j] = int(val, 16)
+    return state
+
+def show_aes_simulation(uploaded_file=None, key=KEY):
+    """Menampilkan simulasi interaktif tahap-tahap AES (mesin AES NumPy, lihat aes_numpy.py)"""
+    st.title("🔢 Simulasi Interaktif Proses AES")
+    
+    steps = ["SubBytes", "ShiftRows", "MixColumns", "AddRoundKey"]
+    step = st.selectbox("Pilih tahap AES:", steps)
+    
+    st.subheader("State Awal (Input)")
+    state = read_state_grid("state", "S")[np.newaxis, :]
     
-    result = []
     if step == "SubBytes":
-        result = [[SBOX.get(cell, "??") for cell in row] for row in state_input]
+        result = aes_numpy.sub_bytes(state)
     elif step == "ShiftRows":
-        result = [
-            state_input[0],
-            state_input[1][1:] + [state_input[1][0]],
-            state_input[2][2:] + state_input[2][:2],
-            state_input[3][3:] + state_input[3][:3]
-        ]
+        result = aes_numpy.shift_rows(state)
     elif step == "MixColumns":
-        st.warning("Implementasi MixColumns disederhanakan untuk demo.")
-        result = [["02","03","01","01"],
-                  ["01","02","03","01"],
-                  ["01","01","02","03"],
-                  ["03","01","01","02"]]
-    elif step == "AddRoundKey":
+        result = aes_numpy.mix_columns(state)
+    else:
         st.subheader("Round Key (Input)")
-        key_input = []
-        for i in range(4):
-            cols = st.columns(4)
-            krow = []
-            for j in range(4):
-                val = cols[j].text_input(f"K[{i},{j}]", value="00", max_chars=2).lower()
-                if not (len(val) == 2 and all(c in '0123456789abcdef' for c in val)):
-                    cols[j].error("Input harus hex 2 digit")
-                    val = "00"
-                krow.append(val)
-            key_input.append(krow)
-        
-        result = []
-        for i in range(4):
-            row = []
-            for j in range(4):
-                xor = int(state_input[i][j], 16) ^ int(key_input[i][j], 16)
-                row.append(f"{xor:02x}")
-            result.append(row)
+        result = aes_numpy.add_round_key(state, read_state_grid("round_key", "K"))
     
     st.subheader(f"Hasil {step}")
-    for i in range(4):
-        cols = st.columns(4)
-        for j in range(4):
-            with cols[j]:
-                st.metric(f"S'[{i},{j}]", result[i][j])
+    st.table(state_frame(result[0]))
+
+    st.subheader("Jejak Lengkap 10 Ronde AES-128")
+    plaintext = st.text_input("Plaintext satu blok (16 byte UTF-8, dipotong/ditambah spasi):",
+                              value="Reverse Cipher!!", key="trace_plaintext")
+    block = plaintext.encode("utf-8")[:16].ljust(16, b" ")
+    try:
+        trace = aes_numpy.trace_encrypt_block(block, key)
+    except ValueError as e:
+        st.error(str(e))
+        return
+    round_number = st.slider("Ronde:", min_value=0, max_value=aes_numpy.ROUNDS, value=1, key="trace_round")
+    round_steps = [(name, values) for number, name, values in trace if number == round_number]
+    for column, (name, values) in zip(st.columns(len(round_steps)), round_steps):
+        with column:
+            st.markdown(f"**{name}**")
+            st.table(state_frame(values))
+    ciphertext = trace[-1][2].tobytes()
+    expected = AES.new(key.encode('utf-8'), AES.MODE_ECB).encrypt(block)
+    st.code(f"Round key {round_number}: {aes_numpy.expand_key(key)[round_number].tobytes().hex()}\n"
+            f"Ciphertext NumPy      : {ciphertext.hex()}\n"
+            f"Ciphertext pycryptodome: {expected.hex()}")
+    if ciphertext == expected:
+        st.success("✅ Hasil 10 ronde sama dengan pycryptodome.")
+    else:
+        st.error("❌ Hasil berbeda dengan pycryptodome.")
+
+    if uploaded_file is not None:
+        st.subheader("Cek Silang Mesin NumPy vs pycryptodome pada Data Unggahan")
+        max_rows = st.number_input("Jumlah baris:", min_value=1, value=2000, step=500, key="cross_check_rows")
+        if st.button("Jalankan Cek Silang"):
+            texts, _ = load_timing_texts(file_digest(uploaded_file), int(max_rows), uploaded_file)
+            buffer = padded_plaintext_buffer([reverse_cipher(text) for text in texts], PADDING_PKCS7)
+            check = aes_numpy.cross_check(buffer, key)
+            col1, col2, col3 = st.columns(3)
+            col1.metric("Blok diuji", f"{check['blocks']:,}")
+            col2.metric("Waktu NumPy", f"{check['numpy_s'] * 1000:.1f} ms")
+            col3.metric("Waktu pycryptodome", f"{check['pycryptodome_s'] * 1000:.1f} ms")
+            if check['encrypt_match'] and check['decrypt_match']:
+                st.success(f"✅ Enkripsi dan dekripsi {len(texts)} baris identik dengan pycryptodome.")
+            else:
+                st.error(f"❌ {check['mismatched_blocks']} blok enkripsi berbeda"
+                         + ("" if check['decrypt_match'] else "; hasil dekripsi juga berbeda") + ".")
 
 def show_complexity_analysis():
     """Menampilkan analisis kompleksitas waktu dan ruang"""
@@ -821,12 +1674,17 @@ def show_complexity_analysis():
         'Tipe': ['Teoritis'] * len(sizes)
     })
     
-    if os.path.exists(LOG_FILE):
+    df_summary = get_timing_store().summary()
+    if not df_summary.empty:
         try:
-            df_log = pd.read_csv(LOG_FILE)
-            df_empirical = df_log.groupby('Jumlah Data')['Waktu Eksekusi (detik)'].mean().reset_index()
-            df_empirical['Tipe'] = 'Empiris'
-            df_empirical.columns = ['Ukuran Data', 'Waktu Teoritis (detik)', 'Tipe']
+            # Rata-rata tertimbang jumlah run per ukuran data dari ringkasan log waktu
+            df_summary['total_s'] = df_summary['mean_s'] * df_summary['runs']
+            df_empirical = df_summary.groupby('rows')[['total_s', 'runs']].sum().reset_index()
+            df_empirical = pd.DataFrame({
+                'Ukuran Data': df_empirical['rows'],
+                'Waktu Teoritis (detik)': df_empirical['total_s'] / df_empirical['runs'],
+                'Tipe': 'Empiris'
+            })
             
             df_combined = pd.concat([df_theory, df_empirical])
             
@@ -888,28 +1746,194 @@ with st.sidebar:
         'Panduan Penggunaan Aplikasi'
     ])
 
+# Hasil job latar belakang yang sudah selesai dipasang sebelum menu mana pun dirender
+collect_finished_jobs()
+
 # Input pengguna untuk file, jumlah baris, dan kunci
 st.subheader("⚙️ Pengaturan Proses Enkripsi/Dekripsi")
 uploaded_file = st.file_uploader("📁 Unggah file Excel (.xlsx) Anda:", type="xlsx")
 jumlah_baris = st.number_input("📊 Masukkan jumlah baris data yang ingin diproses:", min_value=1, value=10, step=1)
 kunci_pengguna = st.text_input("🔑 Masukkan kunci enkripsi (disarankan 16 karakter):", value=KEY)
 
+pipeline_mode = st.radio(
+    "Pilih Mode Proses:",
+    PIPELINE_MODES,
+    horizontal=True,
+    help="Round-trip penuh mendekripsi ulang setiap baris untuk verifikasi. Enkripsi saja melewati dekripsi. "
+         f"Dekripsi saja membaca file berisi kolom '{CIPHERTEXT_COLUMN}' (hasil `skripsi_cli.py`). "
+         "Verifikasi sampel hanya mendekripsi sebagian baris acak dan membandingkannya dengan teks asli."
+)
+sample_fraction = DEFAULT_SAMPLE_FRACTION
+if pipeline_mode == PIPELINE_SAMPLED:
+    sample_fraction = st.slider("🎯 Persentase baris yang diverifikasi:", min_value=1, max_value=50,
+                                value=int(DEFAULT_SAMPLE_FRACTION * 100), step=1, format="%d%%") / 100
+
 padding_choice = st.radio(
     "Pilih Metode Padding untuk AES:",
-    ("PKCS#7", "Fixed Length"),
-    help="PKCS#7 adalah standar padding kriptografi. Fixed Length menggunakan padding '#' hingga 512 karakter."
+    PADDING_METHODS,
+    help="PKCS#7 adalah standar padding kriptografi. Fixed Length menggunakan padding '#' hingga 152 karakter. "
+         "Bucket meratakan setiap baris ke kelas ukuran yang dipelajari dari distribusi panjang data "
+         "(lebih hemat dari Fixed Length, panjang asli tetap tersamar di dalam kelasnya). CTR dan GCM tidak memakai padding: setiap baris memakai nonce acak (CTR 8 byte; GCM 12 byte + tag "
+         "16 byte) sehingga ukuran ciphertext mengikuti ukuran plaintext."
 )
 
-if uploaded_file and jumlah_baris:
-    if st.button("🚀 Mulai Enkripsi & Dekripsi"):
-        key_to_use = kunci_pengguna[:16].ljust(16, '\0')
-        hasil = process_file_fast(uploaded_file, jumlah_baris, key=key_to_use, padding_method=padding_choice)
-        
-        if hasil:
-            st.session_state['hasil'] = hasil
-            st.session_state['file_processed'] = True
-            st.success(f"✅ Proses selesai dalam {hasil['time']:.2f} detik menggunakan {hasil['padding_method_used']} padding!")
-            st.balloons()
+if padding_choice == PADDING_BUCKET:
+    col_strategy, col_count = st.columns(2)
+    with col_strategy:
+        bucket_strategy = st.selectbox("📐 Strategi kelas bucket:", BUCKET_STRATEGIES,
+                                       help="Pangkat dua: kelas 16, 32, 64, ... byte yang dipakai data. "
+                                            "Kuantil: kelas pada kuantil panjang baris.")
+    with col_count:
+        bucket_count = st.number_input("Jumlah kelas (kuantil):", min_value=1, max_value=16,
+                                       value=DEFAULT_BUCKET_COUNT, step=1,
+                                       disabled=bucket_strategy != BUCKET_QUANTILE)
+    if uploaded_file and pipeline_mode != PIPELINE_DECRYPT:
+        bucket_texts, _ = load_timing_texts(file_digest(uploaded_file), jumlah_baris, uploaded_file)
+        ceilings, report = learn_padding_buckets(bucket_texts, bucket_strategy, int(bucket_count))
+        st.caption(format_bucket_report(report))
+    else:
+        ceilings = DEFAULT_BUCKETS
+    padding_choice = bucket_padding_method(ceilings)
+
+execution_choice = st.radio(
+    "Pilih Mode Eksekusi:",
+    EXECUTOR_CHOICES,
+    horizontal=True,
+    help="Mode paralel membagi data menjadi shard dan mengenkripsi/dekripsi setiap shard pada worker terpisah."
+)
+parallel_config = None
+if execution_choice != EXECUTOR_SERIAL:
+    col_workers, col_shard = st.columns(2)
+    with col_workers:
+        worker_count = st.number_input("🧵 Jumlah worker:", min_value=1, max_value=64, value=os.cpu_count() or 1, step=1)
+    with col_shard:
+        shard_size = st.number_input("📦 Ukuran shard (baris):", min_value=10, value=DEFAULT_SHARD_SIZE, step=100)
+    parallel_config = ParallelConfig(execution_choice, worker_count, shard_size)
+
+col_trace, col_memory = st.columns(2)
+with col_trace:
+    trace_enabled = st.checkbox("🔬 Rekam trace per tahap", value=False,
+                                help="Mencatat waktu, jumlah baris/byte setiap tahap pipeline. "
+                                     "Hasilnya tampil di menu 'Pengujian Waktu & Efisiensi'.")
+with col_memory:
+    # tracemalloc.reset_peak berlaku untuk seluruh proses, sehingga puncak memori span yang tumpang tindih
+    # di beberapa thread saling menimpa; profil memori hanya dipakai pada eksekusi serial
+    trace_memory = st.checkbox("🧠 Sertakan profil memori (tracemalloc)", value=False,
+                               disabled=not trace_enabled or parallel_config is not None,
+                               help="Mengukur puncak memori per tahap; proses menjadi lebih lambat. Hanya untuk "
+                                    "eksekusi serial di luar mode batch (span paralel saling menimpa puncaknya).")
+
+incremental_enabled = st.checkbox(
+    "♻️ Mode inkremental (hanya enkripsi baris baru/berubah)", value=False,
+    help=f"Baris diidentifikasi lewat kolom {KEY_COLUMN}. Ciphertext baris yang isinya sama dengan run "
+         "sebelumnya (dataset, kunci dan padding yang sama) diambil dari indeks tanpa dienkripsi ulang."
+)
+incremental_dataset = None
+if incremental_enabled:
+    incremental_dataset = st.text_input("🗂️ Nama dataset indeks:", value=DEFAULT_DATASET).strip() or DEFAULT_DATASET
+
+memo_enabled = st.checkbox(
+    "🧩 Memoisasi baris duplikat", value=True,
+    help="Baris dengan teks gabungan yang sama hanya dienkripsi sekali per chunk, dan ciphertext-nya "
+         "diingat (LRU) per kunci dan metode padding untuk run berikutnya. Tidak berlaku untuk CTR/GCM "
+         "karena setiap baris harus memakai nonce acak sendiri.",
+    disabled=padding_choice in NONCE_MODES
+)
+
+multi_key_enabled = st.checkbox(
+    "🗝️ Mode multi-kunci (kunci per pelanggan/grup dari file kunci)", value=False,
+    help="Setiap baris dienkripsi dengan kunci milik nilai kolom rute. File kunci lokal: .json {nilai: kunci} "
+         "atau .csv dua kolom (nilai, kunci) dengan header; Key ID opsional lewat {nilai: {\"key\": kunci, "
+         "\"id\": key_id}} atau kolom ketiga .csv. Kolom rute harus tetap terenkripsi di tempat lain "
+         "atau disimpan bersama Key ID agar dapat didekripsi."
+)
+key_map = None
+route_column = ROUTE_COLUMNS[0]
+fallback_key = False
+if multi_key_enabled:
+    col_keys, col_route = st.columns(2)
+    with col_keys:
+        key_file = st.file_uploader("📄 File kunci (.json/.csv):", type=["json", "csv"], key="key_file")
+    with col_route:
+        route_column = st.selectbox("Kolom rute:", ROUTE_COLUMNS)
+        fallback_key = st.checkbox("Nilai tanpa kunci memakai kunci utama", value=False)
+    if key_file is not None:
+        try:
+            key_map = load_key_map(key_file)
+            st.caption(f"{len(key_map)} nilai {route_column} memiliki kunci sendiri. Memoisasi, mode inkremental "
+                       "dan eksekusi paralel tidak dipakai pada mode multi-kunci.")
+        except KeyMapError as e:
+            st.error(str(e))
+
+batch_enabled = st.checkbox(
+    "📚 Mode batch (banyak workbook, semua sheet)", value=False,
+    help="Semua sheet yang memuat kolom target dari setiap file diproses dalam satu job. File dan sheet "
+         "di-parse bersamaan di thread I/O lalu dikirim lewat antrean terbatas ke tahap enkripsi."
+)
+batch_files = []
+io_workers = DEFAULT_IO_WORKERS
+queue_chunks = DEFAULT_QUEUE_CHUNKS
+if batch_enabled:
+    batch_files = st.file_uploader("📁 Unggah beberapa file (.xlsx/.csv):", type=["xlsx", "csv"],
+                                   accept_multiple_files=True, key="batch_files")
+    col_io, col_queue = st.columns(2)
+    with col_io:
+        io_workers = st.number_input("🧵 Thread I/O parsing:", min_value=1, max_value=16, value=DEFAULT_IO_WORKERS,
+                                     step=1)
+    with col_queue:
+        queue_chunks = st.number_input("📥 Kapasitas antrean (chunk):", min_value=1, max_value=64,
+                                       value=DEFAULT_QUEUE_CHUNKS, step=1,
+                                       help="Parsing berhenti sejenak bila antrean penuh sehingga memori tetap "
+                                            "terbatas saat enkripsi lebih lambat dari pembacaan.")
+    st.caption("Jumlah baris di atas berlaku per sheet. Mode inkremental, multi-kunci dan dekripsi saja "
+               "tidak dipakai pada mode batch.")
+
+show_workbook_cache_panel(uploaded_file)
+show_row_memo_panel()
+
+if (batch_files if batch_enabled else uploaded_file) and jumlah_baris:
+    job_running = any(job.is_active for job in st.session_state.get('jobs', {}).values())
+    if batch_enabled:
+        start_disabled = job_running or pipeline_mode == PIPELINE_DECRYPT
+    else:
+        start_disabled = job_running or (multi_key_enabled and key_map is None)
+    if st.button("🚀 Mulai Enkripsi & Dekripsi", disabled=start_disabled,
+                 help="Proses berjalan di latar belakang; menu lain tetap bisa dibuka selama proses berjalan."):
+        options = dict(parallel_config=parallel_config,
+                       tracer=Tracer(memory=trace_memory and parallel_config is None and not batch_enabled)
+                       if trace_enabled else None,
+                       memo=get_row_memo() if memo_enabled else None,
+                       mode=pipeline_mode, sample_fraction=sample_fraction)
+        if batch_enabled:
+            job = start_batch_job(batch_files, jumlah_baris, normalize_key(kunci_pengguna), padding_choice,
+                                  io_workers=int(io_workers), queue_chunks=int(queue_chunks), **options)
+        else:
+            job = start_processing_job(uploaded_file, jumlah_baris, normalize_key(kunci_pengguna), padding_choice,
+                                       incremental_dataset=incremental_dataset, key_map=key_map,
+                                       route_column=route_column, fallback_key=fallback_key,
+                                       cipher_pool=get_cipher_pool(), **options)
+        st.info(f"⏳ Job #{job.id} dimulai. Progres tampil di sidebar.")
+
+with st.sidebar:
+    show_job_progress()
+
+notice = st.session_state.pop('job_notice', None)
+if notice is not None:
+    job = st.session_state['jobs'][notice]
+    hasil = job.result['hasil']
+    if job.messages:
+        st.error(f"⚠️ {job.message_count} error selama proses"
+                 + (f" ({job.dropped_messages} lainnya tidak ditampilkan)" if job.dropped_messages else "")
+                 + ":\n\n" + "\n".join(f"- {message}" for message in job.messages))
+    st.success(f"✅ Job #{job.id} selesai dalam {hasil.time:.2f} detik menggunakan {hasil.padding_method_used} padding "
+               f"({hasil.mode})!")
+    report = job.result['incremental_report']
+    if report is not None:
+        st.info(f"♻️ Inkremental: **{report.inserted}** baru, **{report.updated}** berubah, "
+                f"**{report.unchanged}** tetap (dipakai ulang, tidak didekripsi ulang), **{report.deleted}** dihapus dari indeks"
+                + (" — hanya sebagian file dibaca, penghapusan dilewati" if report.partial else ""))
+    st.balloons()
+show_job_history()
 
 # ========== TAMPILAN KONTEN BERDASARKAN PILIHAN MENU ==========
 if selected == 'Penjelasan Enkripsi':
@@ -934,68 +1958,42 @@ if selected == 'Penjelasan Enkripsi':
             st.warning("Gambar 'dekripsi.jpg' tidak ditemukan.")
     
     st.subheader("Simulasi Interaktif Tahap AES")
-    show_aes_simulation()
+    show_aes_simulation(uploaded_file, normalize_key(kunci_pengguna))
 
 elif selected == 'Hasil Lengkap Proses':
     if st.session_state.get('file_processed', False):
         hasil = st.session_state['hasil']
+        show_accuracy_summary(hasil)
         
-        match_results = ["✅" if o == d else "❌" for o, d in
-                         zip([" || ".join(map(str, row)) for row in hasil['original']],
-                             hasil['reversed_decrypt'])]
-        success_rate = (match_results.count("✅") / len(match_results)) * 100 if match_results else 0
-        
-        with st.sidebar.expander("🔍 Ringkasan Akurasi Dekripsi"):
-            st.markdown(f"""
-            ### Hasil Pengujian Akurasi Dekripsi:
-            - Tingkat keberhasilan: **{success_rate:.2f}%**
-            - Jumlah baris diproses: **{len(match_results)}**
-            - Baris sukses dekripsi: **{match_results.count("✅")}**
-            - Baris gagal dekripsi: **{match_results.count("❌")}**
-            """)
-        
-        st.info(f"Metode Padding yang digunakan: **{hasil['padding_method_used']}**")
-        tab1, tab2, tab3, tab4 = st.tabs(["Data Asli", "Hasil Reverse Cipher", "Hasil AES Enkripsi", "Hasil Dekripsi"])
-        
-        with tab1:
-            st.subheader("Data Asli (Plaintext)")
-            st.dataframe(pd.DataFrame(hasil['original'], columns=hasil['headers']))
-        
-        with tab2:
-            st.subheader("Hasil Reverse Cipher (Sebelum AES Enkripsi)")
-            st.dataframe(pd.DataFrame({
-                "Data Asli": [" || ".join(map(str, row)) for row in hasil['original']],
-                "Hasil Reverse Cipher": hasil['reversed_encrypt']
-            }))
-            
-        with tab3:
-            st.subheader("Hasil Enkripsi AES-128 (Hexadesimal)")
-            st.dataframe(pd.DataFrame({
-                "Input ke AES": hasil['reversed_encrypt'],
-                "Ciphertext AES": hasil['aes']
-            }))
-            
-        with tab4:
-            st.subheader("Hasil Dekripsi Lengkap")
-            st.dataframe(pd.DataFrame({
-                "Data Asli": [" || ".join(map(str, row)) for row in hasil['original']],
-                "Hasil Dekripsi Akhir": hasil['reversed_decrypt'],
-                "Status Kecocokan": match_results
-            }))
+        st.info(f"Metode Padding yang digunakan: **{hasil.padding_method_used}** — mode **{hasil.mode}**")
+        # Hanya tampilan yang dipilih yang dibangun (st.tabs selalu me-render semua tab)
+        view = st.radio("Tampilan:", RESULT_VIEWS, horizontal=True, key="hasil_view")
+        show_result_page(hasil, view)
+        ingest_report = st.session_state.get('ingest_report')
+        if ingest_report is not None:
+            show_ingest_report(ingest_report)
+        key_report = st.session_state.get('key_report')
+        if key_report is not None:
+            show_key_report(key_report, get_cipher_pool())
+            st.info("Container .skc dan pencarian terenkripsi memakai satu kunci, sehingga tidak tersedia "
+                    "untuk hasil multi-kunci.")
+        else:
+            show_container_panel(hasil, st.session_state.get('hasil_key', normalize_key(kunci_pengguna)))
+            show_encrypted_lookup(hasil, st.session_state.get('hasil_key', normalize_key(kunci_pengguna)))
     else:
         st.info("Silakan unggah file dan mulai proses enkripsi untuk melihat hasil lengkap.")
 
 elif selected == 'Analisis Avalanche Effect':
     if st.session_state.get('file_processed', False):
         hasil = st.session_state['hasil']
-        show_avalanche_visual(hasil['avalanche'], hasil['aes'], hasil['padding_method_used'])
+        show_avalanche_visual(hasil.avalanche, hasil.ciphertexts, hasil.padding_method_used)
     else:
         st.info("Silakan unggah file dan mulai proses enkripsi untuk melihat hasil Avalanche Effect.")
 
 elif selected == 'Kalkulator Avalanche Effect':
     st.header("🧮 Kalkulator Manual Avalanche Effect")
     
-    tab_hex_calc, tab_text_sim = st.tabs(["Dari Ciphertext (Hex)", "Simulasi dari Plaintext"])
+    tab_hex_calc, tab_text_sim, tab_sac = st.tabs(["Dari Ciphertext (Hex)", "Simulasi dari Plaintext", "Uji SAC / BIC"])
 
     with tab_hex_calc:
         st.subheader("Perbandingan Ciphertext (Hex)")
@@ -1010,14 +2008,19 @@ elif selected == 'Kalkulator Avalanche Effect':
 
     with tab_text_sim:
         st.subheader("Simulasi Avalanche Effect dari Plaintext")
-        simulate_long_string_avalanche_demo(kunci_pengguna[:16].ljust(16, '\0'))
+        simulate_long_string_avalanche_demo(normalize_key(kunci_pengguna), padding_choice)
+
+    with tab_sac:
+        show_sac_test(normalize_key(kunci_pengguna), padding_choice)
 
 elif selected == 'Pengujian Waktu & Efisiensi':
     if uploaded_file:
-        run_comprehensive_timing_test(uploaded_file, kunci_pengguna[:16].ljust(16, '\0'))
+        run_comprehensive_timing_test(uploaded_file, normalize_key(kunci_pengguna))
+        show_layout_comparison(uploaded_file, normalize_key(kunci_pengguna))
     else:
         st.warning("Silakan unggah file terlebih dahulu untuk menjalankan pengujian waktu")
     
+    show_trace_summary()
     show_execution_time()
     show_complexity_analysis()
 
@@ -1037,7 +2040,7 @@ elif selected == 'Panduan Penggunaan Aplikasi':
     1. **Unggah File Excel** yang berisi data Material SAP
     2. **Tentukan Jumlah Baris** yang ingin diproses
     3. **Masukkan Kunci Enkripsi** (16 karakter)
-    4. **Pilih Metode Padding** (PKCS#7 atau Fixed Length)
+    4. **Pilih Metode Padding** (PKCS#7, Fixed Length, atau mode tanpa padding CTR/GCM)
     5. **Klik Tombol** "Mulai Enkripsi & Dekripsi"
     6. **Jelajahi Hasil** melalui menu navigasi
     """)
@@ -0,0 +1,407 @@
+import argparse
+import os
+import sys
+import time
+from functools import partial
+import csv
+import openpyxl
+import pandas as pd
+from tracing import Tracer, tracing
+from aes_batch import PADDING_PKCS7, PADDING_METHODS, PADDING_BUCKET, bucket_padding_method
+from pipeline import (KEY, TARGET_COLUMNS, DEFAULT_CHUNK_SIZE, CIPHERTEXT_COLUMN, normalize_key,
+                      iter_row_chunks, stream_pipeline, stream_decrypt_pipeline, sample_verify, split_plaintext, decrypt_texts, round_trip)
+from incremental import EncryptionIndex, IncrementalReport, incremental_pipeline, DEFAULT_DATASET, KEY_COLUMN
+from row_memo import CiphertextMemo, memo_round_trip
+from column_crypto import EncryptedTable, decrypt_columns, stream_column_pipeline
+from container import ContainerWriter, ContainerReader, CONTAINER_EXTENSION
+from equality_index import scan_hex_column
+from key_routing import (CipherPool, KeyUsageReport, load_key_map, keys_by_id, stream_multi_key_pipeline,
+                         stream_multi_key_decrypt_pipeline, ROUTE_COLUMNS, KEY_ID_COLUMN, DEFAULT_POOL_SIZE)
+from batch_ingest import (IngestReport, expand_sources, stream_batch_pipeline, DEFAULT_IO_WORKERS, DEFAULT_QUEUE_CHUNKS,
+                          SOURCE_FILE_COLUMN, SOURCE_SHEET_COLUMN)
+
+# ========== KONSTANTA ==========
+LAYOUT_ROW = "row"
+LAYOUT_COLUMN = "column"
+
+# ========== FUNGSI CLI ==========
+
+class TableWriter:
+    """Menulis hasil per chunk ke .csv atau .xlsx (write-only) tanpa menampung seluruh tabel"""
+
+    def __init__(self, path, headers):
+        self.path = path
+        self.headers = headers
+        self.is_excel = os.path.splitext(path)[1].lower() == ".xlsx"
+        if self.is_excel:
+            self.workbook = openpyxl.Workbook(write_only=True)
+            self.sheet = self.workbook.create_sheet()
+            self.sheet.append(headers)
+        else:
+            self.file = open(path, "w", newline="", encoding="utf-8")
+            self.writer = csv.writer(self.file)
+            self.writer.writerow(headers)
+
+    def write_rows(self, rows):
+        if self.is_excel:
+            for row in rows:
+                self.sheet.append(row)
+        else:
+            self.writer.writerows(rows)
+
+    def close(self):
+        if self.is_excel:
+            self.workbook.save(self.path)
+        else:
+            self.file.close()
+
+def is_container(path):
+    return path.lower().endswith(CONTAINER_EXTENSION)
+
+def run_encrypt(args, key):
+    """Mode enkripsi: Reverse Cipher + AES per chunk untuk kolom target (.skc: container biner)
+
+    Mode batch (banyak file/folder atau --all-sheets) membaca semua sheet berisi kolom target secara bersamaan;
+    keluaran tabel menyertakan kolom File dan Sheet asal setiap baris.
+    """
+    container = is_container(args.output)
+    if container:
+        writer = ContainerWriter(args.output, args.padding, key)
+    elif args.batch:
+        writer = TableWriter(args.output, [SOURCE_FILE_COLUMN, SOURCE_SHEET_COLUMN, CIPHERTEXT_COLUMN])
+    else:
+        writer = TableWriter(args.output, [CIPHERTEXT_COLUMN])
+    row_count = 0
+    memo = CiphertextMemo(args.memo_size) if args.memo_size > 0 else None
+    round_trip_fn = partial(memo_round_trip, memo=memo) if memo is not None else round_trip
+    batch_report = None
+    if args.batch:
+        report = None
+        batch_report = IngestReport()
+        chunks = stream_batch_pipeline(args.sources, key, args.padding, args.columns, args.chunk_size, args.rows,
+                                       verify=False, on_error=lambda message: print(message, file=sys.stderr),
+                                       round_trip_fn=round_trip_fn, io_workers=args.io_workers,
+                                       queue_chunks=args.queue_chunks, report=batch_report)
+    elif args.index:
+        report = IncrementalReport()
+        chunks = incremental_pipeline(args.input, key, args.padding, EncryptionIndex(args.index), args.dataset,
+                                      args.columns, args.chunk_size, args.rows, verify=False,
+                                      round_trip_fn=round_trip_fn, report=report)
+    else:
+        report = None
+        chunks = stream_pipeline(args.input, key, args.padding, args.columns, args.chunk_size, args.rows,
+                                 verify=False, round_trip_fn=round_trip_fn)
+    checked = failed = 0
+    if args.verify_sample > 0:
+        chunks = sample_verify(chunks, key, args.padding, args.verify_sample,
+                               on_error=lambda message: print(message, file=sys.stderr))
+    try:
+        for chunk in chunks:
+            if args.verify_sample > 0:
+                checked += len(chunk["checked_rows"])
+                failed += len(chunk["mismatches"])
+            if container:
+                writer.append(chunk["batch"])
+            elif args.batch:
+                writer.write_rows([chunk["file"], chunk["sheet"] or "", ciphertext]
+                                  for ciphertext in chunk["batch"].hex_rows())
+            else:
+                writer.write_rows([ciphertext] for ciphertext in chunk["batch"].hex_rows())
+            row_count += len(chunk["original"])
+    finally:
+        writer.close()
+    if report is not None:
+        print(f"Inkremental: {report.inserted} baru, {report.updated} berubah, {report.unchanged} tetap, "
+              f"{report.deleted} dihapus", file=sys.stderr)
+    if batch_report is not None:
+        print_ingest_report(batch_report)
+    if args.verify_sample > 0:
+        print(f"Verifikasi sampel: {checked} dari {row_count} baris didekripsi, {failed} tidak cocok",
+              file=sys.stderr)
+    if memo is not None:
+        print(f"Memo baris duplikat: {memo.hits} hit, {memo.misses} miss ({memo.hit_rate * 100:.1f}%)",
+              file=sys.stderr)
+    return row_count
+
+def print_ingest_report(report):
+    """Ringkasan per file/sheet dan throughput gabungan mode batch ke stderr"""
+    rows = report.summary()
+    print(f"Batch: {len(report.files)} file, {len(rows)} sheet, {report.rows} baris dalam {report.elapsed:.2f} detik "
+          f"({report.rows_per_s:,.0f} baris/detik, {report.mb_per_s:.2f} MB/detik)", file=sys.stderr)
+    print(f"{'file':<24} {'sheet':<16} {'status':<10} {'baris':>9} {'parsing (ms)':>13} {'antrean (ms)':>13} "
+          f"{'enkripsi (ms)':>14}", file=sys.stderr)
+    for row in rows:
+        print(f"{row['file'][-24:]:<24} {(row['sheet'] or '-')[:16]:<16} {row['state']:<10} {row['rows']:>9} "
+              f"{row['parse_ms']:>13.1f} {row['wait_ms']:>13.1f} {row['encrypt_ms']:>14.1f}", file=sys.stderr)
+    for file, sheet, missing in report.skipped:
+        print(f"Dilewati: {file} [{sheet or '-'}] tanpa kolom {', '.join(missing)}", file=sys.stderr)
+
+def print_key_report(report, pool):
+    """Ringkasan per kunci (10 kunci dengan baris terbanyak) ke stderr"""
+    rows = report.rows()
+    print(f"Multi-kunci: {len(rows)} kunci, {report.unmapped_rows} baris memakai kunci utama, pool cipher "
+          f"{pool.hits} hit / {pool.misses} miss / {pool.evictions} eviksi", file=sys.stderr)
+    print(f"{'Key ID':<18} {'nilai':>6} {'baris':>9} {'enkripsi (ms)':>14} {'dekripsi (ms)':>14}", file=sys.stderr)
+    for row in rows[:10]:
+        print(f"{row['key_id']:<18} {row['values']:>6} {row['rows']:>9} {row['encrypt_ms']:>14.3f} "
+              f"{row['decrypt_ms']:>14.3f}", file=sys.stderr)
+
+def run_encrypt_multi_key(args, key):
+    """Mode enkripsi multi-kunci: kunci per baris dari --key-file berdasarkan --route-column"""
+    key_map = load_key_map(args.key_file)
+    pool = CipherPool(args.pool_size)
+    report = KeyUsageReport()
+    writer = TableWriter(args.output, [CIPHERTEXT_COLUMN, KEY_ID_COLUMN])
+    row_count = 0
+    try:
+        for chunk in stream_multi_key_pipeline(args.input, key_map, args.padding, args.route_column, args.columns,
+                                               args.chunk_size, args.rows, verify=False,
+                                               default_key=key if args.fallback_key else None,
+                                               pool=pool, report=report):
+            writer.write_rows(zip(chunk["batch"].hex_rows(), chunk["key_ids"]))
+            row_count += len(chunk["original"])
+    finally:
+        writer.close()
+    print_key_report(report, pool)
+    return row_count
+
+def run_decrypt_multi_key(args, key):
+    """Mode dekripsi multi-kunci: kunci setiap baris dicari lewat kolom Key ID"""
+    keys = keys_by_id(load_key_map(args.key_file), key if args.fallback_key else None)
+    pool = CipherPool(args.pool_size)
+    report = KeyUsageReport()
+    writer = TableWriter(args.output, args.columns)
+    row_count = 0
+    try:
+        for chunk in stream_multi_key_decrypt_pipeline(args.input, keys, args.padding, args.columns,
+                                                       args.chunk_size, args.rows,
+                                                       on_error=lambda message: print(message, file=sys.stderr),
+                                                       pool=pool, report=report):
+            writer.write_rows(chunk["original"])
+            row_count += len(chunk["original"])
+    finally:
+        writer.close()
+    print_key_report(report, pool)
+    return row_count
+
+def run_encrypt_columns(args, key):
+    """Mode enkripsi per kolom: setiap kolom target dienkripsi sendiri, skema keluaran sama dengan input"""
+    writer = None
+    row_count = 0
+    try:
+        for chunk in stream_column_pipeline(args.input, key, args.padding, args.columns, args.chunk_size,
+                                            args.rows, verify=False):
+            if writer is None:
+                writer = TableWriter(args.output, chunk["headers"])
+            writer.write_rows(chunk["table"].hex_frame().values.tolist())
+            row_count += len(chunk["original"])
+    finally:
+        if writer is not None:
+            writer.close()
+    return row_count
+
+def run_decrypt_columns(args, key):
+    """Mode dekripsi per kolom: hanya kolom pada --columns yang dibaca dan didekripsi"""
+    writer = TableWriter(args.output, args.columns)
+    row_count = 0
+    try:
+        for headers, rows in iter_row_chunks(args.input, args.columns, args.chunk_size, args.rows):
+            frame = pd.DataFrame(rows, columns=headers)
+            table, _ = EncryptedTable.from_hex_frame(frame, args.padding, args.columns)
+            values = decrypt_columns(table, key, on_error=lambda message: print(message, file=sys.stderr))
+            writer.write_rows(zip(*(values[name] for name in args.columns)))
+            row_count += len(rows)
+    finally:
+        writer.close()
+    return row_count
+
+def run_lookup(args, key):
+    """Mode lookup: mencari nilai pada tabel terenkripsi per kolom tanpa mendekripsi seluruh tabel
+
+    Nilai yang dicari dienkripsi dengan kunci/padding yang sama lalu dicocokkan dengan ciphertext kolom
+    --lookup-column; hanya baris yang cocok yang didekripsi dan ditulis (beserta nomor barisnya).
+    """
+    if args.lookup_column not in args.columns:
+        args.columns = [args.lookup_column] + args.columns
+    writer = TableWriter(args.output, ["Row"] + args.columns)
+    match_count = 0
+    start = 0
+    try:
+        for headers, rows in iter_row_chunks(args.input, args.columns, args.chunk_size, args.rows):
+            frame = pd.DataFrame(rows, columns=headers)
+            matches = scan_hex_column(frame[args.lookup_column].tolist(), args.value, key, args.padding)
+            if matches:
+                table, _ = EncryptedTable.from_hex_frame(frame.iloc[matches], args.padding, args.columns)
+                values = decrypt_columns(table, key, on_error=lambda message: print(message, file=sys.stderr))
+                writer.write_rows([start + i] + list(row)
+                                  for i, row in zip(matches, zip(*(values[name] for name in args.columns))))
+                match_count += len(matches)
+            start += len(rows)
+    finally:
+        writer.close()
+    print(f"Lookup {args.lookup_column} = {args.value!r}: {match_count} dari {start} baris cocok", file=sys.stderr)
+    return start
+
+def run_decrypt(args, key):
+    """Mode dekripsi: AES + Reverse Undo per chunk, lalu memecah teks kembali ke kolom target"""
+    writer = TableWriter(args.output, args.columns)
+    row_count = 0
+    try:
+        for chunk in stream_decrypt_pipeline(args.input, key, args.padding, args.columns, args.chunk_size,
+                                             args.rows, on_error=lambda message: print(message, file=sys.stderr)):
+            writer.write_rows(chunk["original"])
+            row_count += len(chunk["original"])
+    finally:
+        writer.close()
+    return row_count
+
+def run_decrypt_container(args, key):
+    """Mode dekripsi container: lewat mmap, hanya baris pada --row-index (atau seluruhnya per chunk)"""
+    with ContainerReader(args.input) as reader:
+        reader.check_key(key)
+        args.padding = reader.padding_method
+        writer = TableWriter(args.output, args.columns)
+        on_error = lambda message: print(message, file=sys.stderr)
+        row_count = 0
+        try:
+            if args.row_index is not None:
+                batches = [reader.rows(args.row_index)]
+            else:
+                stop = len(reader) if args.rows is None else min(args.rows, len(reader))
+                batches = (reader.slice(start, min(start + args.chunk_size, stop))
+                           for start in range(0, stop, args.chunk_size))
+            for batch in batches:
+                _, plaintexts = decrypt_texts(batch, key, reader.padding_method, on_error=on_error)
+                writer.write_rows(split_plaintext(text, len(args.columns)) for text in plaintexts)
+                row_count += len(plaintexts)
+        finally:
+            writer.close()
+    return row_count
+
+def parse_row_indices(value):
+    """'5,10-12' -> [5, 10, 11, 12] (nomor baris mulai dari 0)"""
+    indices = []
+    for part in value.split(","):
+        part = part.strip()
+        if "-" in part:
+            first, last = part.split("-", 1)
+            indices.extend(range(int(first), int(last) + 1))
+        elif part:
+            indices.append(int(part))
+    return indices
+
+def build_parser():
+    """Menyusun argumen command-line untuk mode batch tanpa Streamlit"""
+    parser = argparse.ArgumentParser(
+        description="Enkripsi/dekripsi data Material SAP (AES-128 + Reverse Cipher) tanpa Streamlit"
+    )
+    parser.add_argument("input", nargs="+",
+                        help="File masukan (.xlsx atau .csv); beberapa file atau folder menjalankan mode batch")
+    parser.add_argument("-o", "--output", required=True, help="File keluaran (.csv atau .xlsx)")
+    parser.add_argument("--mode", choices=["encrypt", "decrypt", "lookup"], default="encrypt",
+                        help="encrypt: kolom target -> ciphertext; decrypt: ciphertext -> kolom target; "
+                             "lookup: cari --value pada tabel terenkripsi per kolom tanpa dekripsi penuh")
+    parser.add_argument("--columns", default=",".join(TARGET_COLUMNS),
+                        help="Daftar kolom target dipisah koma (default: TARGET_COLUMNS); pada --layout column "
+                             "mode decrypt hanya kolom ini yang didekripsi")
+    parser.add_argument("--layout", choices=[LAYOUT_ROW, LAYOUT_COLUMN], default=LAYOUT_ROW,
+                        help="row: satu ciphertext per baris gabungan; column: satu ciphertext per sel, "
+                             "skema tabel sama dengan input")
+    parser.add_argument("--key", default=KEY, help="Kunci enkripsi (dipotong/ditambah menjadi 16 karakter)")
+    parser.add_argument("--padding", choices=PADDING_METHODS, default=PADDING_PKCS7,
+                        help="Metode padding AES (CTR/GCM: tanpa padding, nonce acak per baris)")
+    parser.add_argument("--buckets", default=None,
+                        help="Padding Bucket: batas kelas dalam byte ciphertext, mis. '48,96,160' "
+                             "(default: pangkat dua 16..1024)")
+    parser.add_argument("--rows", type=int, default=None,
+                        help="Batas jumlah baris yang diproses (mode batch: per sheet)")
+    parser.add_argument("--all-sheets", action="store_true",
+                        help="Mode batch untuk satu workbook: proses semua sheet yang memuat kolom target")
+    parser.add_argument("--io-workers", type=int, default=DEFAULT_IO_WORKERS,
+                        help="Mode batch: jumlah thread I/O yang mem-parse file/sheet bersamaan")
+    parser.add_argument("--queue-chunks", type=int, default=DEFAULT_QUEUE_CHUNKS,
+                        help="Mode batch: kapasitas antrean chunk antara parsing dan enkripsi (backpressure)")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE,
+                        help="Jumlah baris per chunk (menentukan batas pemakaian memori)")
+    parser.add_argument("--index", default=None,
+                        help="Mode inkremental (encrypt): file indeks SQLite berisi digest dan ciphertext run sebelumnya")
+    parser.add_argument("--dataset", default=DEFAULT_DATASET, help="Nama dataset di dalam indeks inkremental")
+    parser.add_argument("--lookup-column", default=KEY_COLUMN,
+                        help="Mode lookup: kolom terenkripsi yang dicocokkan")
+    parser.add_argument("--value", default=None, help="Mode lookup: nilai plaintext yang dicari")
+    parser.add_argument("--row-index", type=parse_row_indices, default=None,
+                        help="Dekripsi container .skc: hanya baris ini (mulai dari 0), mis. '5,734912' atau '10-20'")
+    parser.add_argument("--verify-sample", type=float, default=0.0,
+                        help="Mode encrypt: dekripsi ulang pecahan baris acak ini (mis. 0.05) dan bandingkan dengan teks asli")
+    parser.add_argument("--key-file", default=None,
+                        help="Mode multi-kunci: file kunci lokal (.json {nilai: kunci} atau .csv nilai,kunci[,key_id]); "
+                             f"keluaran encrypt berisi kolom '{KEY_ID_COLUMN}' dari file kunci")
+    parser.add_argument("--route-column", choices=ROUTE_COLUMNS, default=ROUTE_COLUMNS[0],
+                        help="Mode multi-kunci: kolom yang menentukan kunci setiap baris")
+    parser.add_argument("--fallback-key", action="store_true",
+                        help="Mode multi-kunci: nilai tanpa kunci memakai --key (default: error)")
+    parser.add_argument("--pool-size", type=int, default=DEFAULT_POOL_SIZE,
+                        help="Mode multi-kunci: jumlah maksimum objek cipher per kunci yang disimpan (LRU)")
+    parser.add_argument("--memo-size", type=int, default=0,
+                        help="Ukuran memo LRU baris duplikat (0 = nonaktif)")
+    parser.add_argument("--trace", default=None,
+                        help="Simpan trace per tahap (format Chrome/Perfetto JSON) ke file ini")
+    parser.add_argument("--trace-memory", action="store_true",
+                        help="Sertakan puncak memori tracemalloc per tahap pada trace (lebih lambat)")
+    return parser
+
+def print_trace_summary(tracer):
+    """Mencetak ringkasan span per tahap ke stderr"""
+    print(f"{'tahap':<14} {'panggilan':>9} {'total (ms)':>12} {'baris':>10} {'puncak (KiB)':>13}", file=sys.stderr)
+    for entry in tracer.summary():
+        peak = f"{entry['peak_kib']:.1f}" if entry['peak_kib'] is not None else "-"
+        print(f"{entry['stage']:<14} {entry['calls']:>9} {entry['total_ms']:>12.3f} {entry['rows']:>10} {peak:>13}",
+              file=sys.stderr)
+
+def main(argv=None):
+    """Titik masuk command-line"""
+    args = build_parser().parse_args(argv)
+    args.columns = [col.strip() for col in args.columns.split(",") if col.strip()]
+    args.batch = args.all_sheets or len(args.input) > 1 or os.path.isdir(args.input[0])
+    args.sources = expand_sources(args.input)
+    args.input = args.input[0]
+    key = normalize_key(args.key)
+    if args.padding == PADDING_BUCKET and args.buckets:
+        args.padding = bucket_padding_method(sorted(int(value) for value in args.buckets.split(",")))
+
+    tracer = Tracer(memory=args.trace_memory) if args.trace else None
+    start_time = time.perf_counter()
+    try:
+        with tracing(tracer):
+            if args.batch and (args.mode != "encrypt" or args.key_file or args.index or args.layout == LAYOUT_COLUMN):
+                raise ValueError("Mode batch (beberapa file, folder atau --all-sheets) hanya mendukung --mode encrypt "
+                                 "dengan --layout row, tanpa --key-file dan --index")
+            if args.mode == "lookup":
+                if args.value is None:
+                    raise ValueError("Mode lookup membutuhkan --value")
+                row_count = run_lookup(args, key)
+            elif args.key_file:
+                if is_container(args.input) or is_container(args.output):
+                    raise ValueError("Container .skc hanya mendukung satu kunci")
+                row_count = (run_encrypt_multi_key(args, key) if args.mode == "encrypt"
+                             else run_decrypt_multi_key(args, key))
+            elif args.layout == LAYOUT_COLUMN:
+                row_count = run_encrypt_columns(args, key) if args.mode == "encrypt" else run_decrypt_columns(args, key)
+            elif args.mode == "encrypt":
+                row_count = run_encrypt(args, key)
+            elif is_container(args.input):
+                row_count = run_decrypt_container(args, key)
+            else:
+                row_count = run_decrypt(args, key)
+    except (OSError, ValueError, KeyError, IndexError) as e:
+        print(f"Terjadi error saat memproses file: {str(e)}", file=sys.stderr)
+        return 1
+    elapsed_time = time.perf_counter() - start_time
+    if tracer is not None:
+        tracer.dump(args.trace)
+        print_trace_summary(tracer)
+    print(f"✅ {row_count} baris diproses ({args.mode}, {args.padding}) dalam {elapsed_time:.2f} detik -> {args.output}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
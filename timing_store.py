@@ -0,0 +1,255 @@
+import os
+import sys
+import time
+import socket
+import sqlite3
+import platform
+import argparse
+import hashlib
+import pandas as pd
+
+# ========== KONSTANTA ==========
+DEFAULT_DB_PATH = os.environ.get("SKRIPSI_TIMING_DB", "log_waktu.db")
+SOURCE_APP = "app"
+SOURCE_TIMING_TEST = "timing_test"
+SOURCE_LEGACY = "legacy"
+DEFAULT_PADDING = "PKCS#7"
+STAGE_COLUMNS = ("read_s", "reverse_s", "encrypt_s", "decrypt_s", "undo_s", "avalanche_s")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    created REAL NOT NULL,
+    source TEXT NOT NULL,
+    rows INTEGER NOT NULL,
+    padding TEXT NOT NULL,
+    workers INTEGER NOT NULL DEFAULT 1,
+    executor TEXT,
+    total_s REAL NOT NULL,
+    read_s REAL,
+    reverse_s REAL,
+    encrypt_s REAL,
+    decrypt_s REAL,
+    undo_s REAL,
+    avalanche_s REAL,
+    host TEXT,
+    python TEXT
+);
+CREATE TABLE IF NOT EXISTS run_summary (
+    source TEXT NOT NULL,
+    rows INTEGER NOT NULL,
+    padding TEXT NOT NULL,
+    workers INTEGER NOT NULL,
+    runs INTEGER NOT NULL,
+    total_sum REAL NOT NULL,
+    total_min REAL NOT NULL,
+    total_max REAL NOT NULL,
+    last_created REAL NOT NULL,
+    PRIMARY KEY (source, rows, padding, workers)
+);
+CREATE TABLE IF NOT EXISTS imports (
+    digest TEXT PRIMARY KEY,
+    path TEXT NOT NULL,
+    rows INTEGER NOT NULL,
+    created REAL NOT NULL
+);
+"""
+
+UPSERT_SUMMARY = """
+INSERT INTO run_summary (source, rows, padding, workers, runs, total_sum, total_min, total_max, last_created)
+VALUES (?, ?, ?, ?, 1, ?, ?, ?, ?)
+ON CONFLICT (source, rows, padding, workers) DO UPDATE SET
+    runs = runs + 1,
+    total_sum = total_sum + excluded.total_sum,
+    total_min = MIN(total_min, excluded.total_min),
+    total_max = MAX(total_max, excluded.total_max),
+    last_created = MAX(last_created, excluded.last_created)
+"""
+
+# ========== PENYIMPANAN WAKTU ==========
+
+class TimingStore:
+    """Log waktu eksekusi berbasis SQLite (WAL) dengan append atomik dan ringkasan yang sudah diagregasi"""
+
+    def __init__(self, path=DEFAULT_DB_PATH):
+        self.path = path
+        self.host = f"{socket.gethostname()} ({platform.system()} {platform.machine()}, {os.cpu_count()} CPU)"
+        self.python = platform.python_version()
+        conn = sqlite3.connect(self.path, timeout=30)
+        try:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(SCHEMA)
+        finally:
+            conn.close()
+
+    def _connect(self, write=True):
+        # Koneksi baru per operasi: aman dipakai dari beberapa thread/sesi Streamlit sekaligus.
+        # Baca memakai transaksi deferred: dengan WAL, pembaca tidak mengambil kunci tulis dan tetap
+        # berjalan bersamaan dengan record() dari job lain.
+        conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        conn.execute("PRAGMA busy_timeout=30000")
+        return _Transaction(conn, "IMMEDIATE" if write else "DEFERRED")
+
+    def record(self, rows, total_s, padding_method=DEFAULT_PADDING, source=SOURCE_APP, workers=1,
+               executor=None, created=None, **stages):
+        """Menambah satu hasil pengukuran; stages berisi waktu per tahap (read_s, encrypt_s, ...)"""
+        unknown = set(stages) - set(STAGE_COLUMNS)
+        if unknown:
+            raise ValueError(f"Tahap tidak dikenal: {', '.join(sorted(unknown))}")
+        self.record_many([dict(rows=rows, total_s=total_s, padding=padding_method, source=source,
+                               workers=workers, executor=executor, created=created, **stages)])
+
+    def record_many(self, records):
+        """Menambah beberapa hasil dalam satu transaksi (semua tersimpan atau tidak sama sekali)"""
+        with self._connect() as conn:
+            for record in records:
+                self._insert(conn, record)
+
+    def _insert(self, conn, record):
+        created = record.get("created") or time.time()
+        values = {
+            "created": created,
+            "source": record.get("source", SOURCE_APP),
+            "rows": int(record["rows"]),
+            "padding": record.get("padding") or DEFAULT_PADDING,
+            "workers": int(record.get("workers") or 1),
+            "executor": record.get("executor"),
+            "total_s": float(record["total_s"]),
+            "host": record.get("host", self.host),
+            "python": record.get("python", self.python),
+        }
+        for stage in STAGE_COLUMNS:
+            if record.get(stage) is not None:
+                values[stage] = float(record[stage])
+        columns = ", ".join(values)
+        conn.execute(f"INSERT INTO runs ({columns}) VALUES ({', '.join('?' * len(values))})",
+                     list(values.values()))
+        conn.execute(UPSERT_SUMMARY, (values["source"], values["rows"], values["padding"], values["workers"],
+                                      values["total_s"], values["total_s"], values["total_s"], created))
+
+    def summary(self, sources=(SOURCE_APP, SOURCE_LEGACY)):
+        """Ringkasan per (jumlah baris, metode padding): jumlah run, rata-rata, minimum dan maksimum"""
+        placeholders = ", ".join("?" * len(sources))
+        with self._connect(write=False) as conn:
+            df = pd.read_sql_query(
+                f"""SELECT rows, padding, SUM(runs) AS runs, SUM(total_sum) / SUM(runs) AS mean_s,
+                           MIN(total_min) AS min_s, MAX(total_max) AS max_s
+                    FROM run_summary WHERE source IN ({placeholders})
+                    GROUP BY rows, padding ORDER BY rows, padding""",
+                conn.connection, params=list(sources))
+        return df
+
+    def runs(self, sources=None, limit=None):
+        """Data mentah per run (terbaru lebih dulu)"""
+        query = "SELECT * FROM runs"
+        params = []
+        if sources:
+            query += f" WHERE source IN ({', '.join('?' * len(sources))})"
+            params.extend(sources)
+        query += " ORDER BY id DESC"
+        if limit:
+            query += " LIMIT ?"
+            params.append(int(limit))
+        with self._connect(write=False) as conn:
+            return pd.read_sql_query(query, conn.connection, params=params)
+
+    def import_legacy_csv(self, path):
+        """Mengimpor log_waktu.csv lama (kolom campuran); file yang sama hanya diimpor sekali
+
+        Mengembalikan jumlah baris yang diimpor (0 bila file sudah pernah diimpor atau kosong).
+        """
+        if not os.path.exists(path) or os.path.getsize(path) == 0:
+            return 0
+        with open(path, "rb") as f:
+            digest = hashlib.sha256(f.read()).hexdigest()
+        # Cek baca dulu agar pemanggilan berulang (setiap kali dashboard dibuka) tidak mengambil kunci tulis
+        with self._connect(write=False) as conn:
+            if conn.execute("SELECT 1 FROM imports WHERE digest = ?", (digest,)).fetchone():
+                return 0
+        try:
+            df = pd.read_csv(path)
+        except pd.errors.EmptyDataError:
+            return 0
+        records = legacy_records(df)
+        created = os.path.getmtime(path)
+        with self._connect() as conn:
+            if conn.execute("SELECT 1 FROM imports WHERE digest = ?", (digest,)).fetchone():
+                return 0
+            for record in records:
+                self._insert(conn, {**record, "source": SOURCE_LEGACY, "created": created,
+                                    "host": None, "python": None})
+            conn.execute("INSERT INTO imports (digest, path, rows, created) VALUES (?, ?, ?, ?)",
+                         (digest, os.path.abspath(path), len(records), time.time()))
+        return len(records)
+
+    def clear(self, sources=None):
+        """Menghapus hasil (semua atau hanya sumber tertentu) beserta ringkasannya"""
+        with self._connect() as conn:
+            if sources:
+                placeholders = ", ".join("?" * len(sources))
+                conn.execute(f"DELETE FROM runs WHERE source IN ({placeholders})", list(sources))
+                conn.execute(f"DELETE FROM run_summary WHERE source IN ({placeholders})", list(sources))
+                if SOURCE_LEGACY in sources:
+                    conn.execute("DELETE FROM imports")
+            else:
+                for table in ("runs", "run_summary", "imports"):
+                    conn.execute(f"DELETE FROM {table}")
+
+class _Transaction:
+    """Context manager: BEGIN IMMEDIATE (tulis) atau DEFERRED (baca) saat masuk, COMMIT/ROLLBACK saat keluar,
+    lalu menutup koneksi"""
+
+    def __init__(self, connection, mode="IMMEDIATE"):
+        self.connection = connection
+        self.mode = mode
+
+    def __enter__(self):
+        self.connection.execute(f"BEGIN {self.mode}")
+        return self
+
+    def execute(self, *args):
+        return self.connection.execute(*args)
+
+    def __exit__(self, exc_type, exc, tb):
+        try:
+            self.connection.execute("ROLLBACK" if exc_type else "COMMIT")
+        finally:
+            self.connection.close()
+        return False
+
+def legacy_records(df):
+    """Menormalkan baris log CSV lama: ('Jumlah Data', 'Waktu Eksekusi (detik)', 'Metode Padding')
+    atau ('Rows Processed', 'Time (s)') menjadi record untuk TimingStore"""
+    def column(*names):
+        for name in names:
+            if name in df.columns:
+                return df[name]
+        return pd.Series([None] * len(df), index=df.index)
+
+    rows = column("Jumlah Data").fillna(column("Rows Processed"))
+    totals = column("Waktu Eksekusi (detik)").fillna(column("Time (s)"))
+    paddings = column("Metode Padding").fillna(DEFAULT_PADDING)
+    records = []
+    for row_count, total_s, padding in zip(rows, totals, paddings):
+        if pd.isna(row_count) or pd.isna(total_s):
+            continue
+        records.append({"rows": int(row_count), "total_s": float(total_s), "padding": str(padding)})
+    return records
+
+# ========== CLI ==========
+
+def main(argv=None):
+    """Mengimpor log CSV lama dan/atau menampilkan ringkasan dari command-line"""
+    parser = argparse.ArgumentParser(description="Penyimpanan log waktu eksekusi (SQLite)")
+    parser.add_argument("--db", default=DEFAULT_DB_PATH, help="Lokasi database SQLite")
+    parser.add_argument("--import-csv", default=None, help="Impor log_waktu.csv lama")
+    args = parser.parse_args(argv)
+
+    store = TimingStore(args.db)
+    if args.import_csv:
+        print(f"{store.import_legacy_csv(args.import_csv)} baris diimpor dari {args.import_csv}")
+    print(store.summary().to_string(index=False))
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,232 @@
+import os
+import json
+import threading
+import tracemalloc
+from time import perf_counter_ns
+from contextlib import contextmanager
+from contextvars import ContextVar, copy_context
+from concurrent.futures import ThreadPoolExecutor
+
+# ========== KONSTANTA ==========
+_current_tracer = ContextVar("skripsi_tracer", default=None)
+
+# ========== SPAN ==========
+
+class _NullSpan:
+    """Span kosong yang dipakai saat tracing tidak aktif (tanpa biaya pengukuran)"""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+    def set(self, **values):
+        pass
+
+_NULL_SPAN = _NullSpan()
+
+class Span:
+    """Satu tahap terukur: waktu (ns), jumlah baris/byte dan puncak memori tracemalloc"""
+
+    def __init__(self, tracer, name, rows=None, nbytes=None, args=None):
+        self.tracer = tracer
+        self.name = name
+        self.rows = rows
+        self.nbytes = nbytes
+        self.args = args or {}
+        self.start_ns = 0
+        self.duration_ns = 0
+        self.peak_bytes = None
+        self._mem_start = 0
+        self._child_peak = 0
+
+    def set(self, rows=None, nbytes=None, **args):
+        """Mengisi jumlah baris/byte (atau atribut lain) yang baru diketahui di dalam span"""
+        if rows is not None:
+            self.rows = rows
+        if nbytes is not None:
+            self.nbytes = nbytes
+        self.args.update(args)
+
+    def __enter__(self):
+        stack = self.tracer._stack()
+        if self.tracer.memory:
+            current, peak = tracemalloc.get_traced_memory()
+            if stack:
+                stack[-1]._child_peak = max(stack[-1]._child_peak, peak)
+            tracemalloc.reset_peak()
+            self._mem_start = current
+            self._child_peak = current
+        stack.append(self)
+        self.start_ns = perf_counter_ns()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.duration_ns = perf_counter_ns() - self.start_ns
+        stack = self.tracer._stack()
+        stack.pop()
+        if self.tracer.memory:
+            _, peak = tracemalloc.get_traced_memory()
+            peak = max(peak, self._child_peak)
+            self.peak_bytes = peak - self._mem_start
+            if stack:
+                # reset_peak di span anak menghapus puncak milik induk, jadi diteruskan secara manual
+                stack[-1]._child_peak = max(stack[-1]._child_peak, peak)
+        self.tracer._finish(self)
+        return False
+
+# ========== TRACER ==========
+
+class Tracer:
+    """Pengumpul span tahap pipeline, dapat diekspor sebagai trace Chrome/Perfetto"""
+
+    def __init__(self, memory=False):
+        self.memory = memory
+        self.spans = []
+        self.origin_ns = perf_counter_ns()
+        self._local = threading.local()
+        self._lock = threading.Lock()
+
+    def _stack(self):
+        stack = getattr(self._local, "stack", None)
+        if stack is None:
+            stack = self._local.stack = []
+        return stack
+
+    def _finish(self, span):
+        span.tid = threading.get_ident()
+        span.depth = len(self._stack())
+        with self._lock:
+            self.spans.append(span)
+
+    def span(self, name, rows=None, nbytes=None, **args):
+        return Span(self, name, rows, nbytes, args)
+
+    def summary(self):
+        """Ringkasan per tahap (urut kemunculan pertama): jumlah panggilan, waktu, baris, byte, memori"""
+        stages = {}
+        for span in sorted(self.spans, key=lambda s: s.start_ns):
+            entry = stages.setdefault(span.name, {
+                "stage": span.name, "calls": 0, "total_ms": 0.0,
+                "rows": 0, "bytes": 0, "peak_kib": None,
+            })
+            entry["calls"] += 1
+            entry["total_ms"] += span.duration_ns / 1e6
+            entry["rows"] += span.rows or 0
+            entry["bytes"] += span.nbytes or 0
+            if span.peak_bytes is not None:
+                entry["peak_kib"] = max(entry["peak_kib"] or 0, span.peak_bytes / 1024)
+        for entry in stages.values():
+            total_s = entry["total_ms"] / 1000
+            entry["rows_per_s"] = entry["rows"] / total_s if total_s > 0 and entry["rows"] else None
+            entry["mb_per_s"] = entry["bytes"] / total_s / 1e6 if total_s > 0 and entry["bytes"] else None
+        return list(stages.values())
+
+    def totals(self):
+        """Waktu dinding (detik) per nama tahap
+
+        Span tahap yang sama dari beberapa thread worker bisa tumpang tindih, sehingga intervalnya digabung
+        lebih dulu; menjumlahkan durasinya begitu saja bisa melebihi waktu proses sebenarnya.
+        """
+        intervals = {}
+        for span in self.spans:
+            intervals.setdefault(span.name, []).append((span.start_ns, span.start_ns + span.duration_ns))
+        totals = {}
+        for name, spans in intervals.items():
+            total_ns = 0
+            current_start, current_end = None, None
+            for start, end in sorted(spans):
+                if current_end is None or start > current_end:
+                    if current_end is not None:
+                        total_ns += current_end - current_start
+                    current_start, current_end = start, end
+                else:
+                    current_end = max(current_end, end)
+            total_ns += current_end - current_start
+            totals[name] = total_ns / 1e9
+        return totals
+
+    def to_chrome_trace(self):
+        """Format Trace Event JSON (dibuka di chrome://tracing atau ui.perfetto.dev)"""
+        pid = os.getpid()
+        events = [{"name": "process_name", "ph": "M", "pid": pid, "args": {"name": "skripsi pipeline"}}]
+        for span in sorted(self.spans, key=lambda s: s.start_ns):
+            args = dict(span.args)
+            if span.rows is not None:
+                args["rows"] = span.rows
+            if span.nbytes is not None:
+                args["bytes"] = span.nbytes
+            if span.peak_bytes is not None:
+                args["peak_bytes"] = span.peak_bytes
+            events.append({
+                "name": span.name,
+                "cat": "pipeline",
+                "ph": "X",
+                "ts": (span.start_ns - self.origin_ns) / 1000,
+                "dur": span.duration_ns / 1000,
+                "pid": pid,
+                "tid": span.tid,
+                "args": args,
+            })
+        return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+    def dump(self, path):
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.to_chrome_trace(), f)
+
+# ========== API MODUL ==========
+
+def span(name, rows=None, nbytes=None, **args):
+    """Membuka span pada tracer aktif; tanpa tracer aktif mengembalikan span kosong"""
+    tracer = _current_tracer.get()
+    if tracer is None:
+        return _NULL_SPAN
+    return tracer.span(name, rows, nbytes, **args)
+
+def submit_traced(executor, fn, *args, **kwargs):
+    """executor.submit yang meneruskan tracer aktif ke thread worker
+
+    Thread worker tidak mewarisi ContextVar, sehingga tanpa ini span di ThreadPoolExecutor hilang. Setiap
+    tugas mendapat salinan konteks sendiri (satu Context tidak boleh dimasuki dua thread sekaligus). Worker
+    ProcessPoolExecutor tidak berbagi tracer dengan proses utama, sehingga tugasnya dikirim apa adanya.
+    """
+    if isinstance(executor, ThreadPoolExecutor):
+        return executor.submit(copy_context().run, fn, *args, **kwargs)
+    return executor.submit(fn, *args, **kwargs)
+
+def traced_iter(iterable, name, count=len):
+    """Mengukur setiap pengambilan item dari iterator (mis. pembacaan chunk) sebagai span"""
+    if _current_tracer.get() is None:
+        return iterable
+    return _traced_iter(iter(iterable), name, count)
+
+def _traced_iter(iterator, name, count):
+    while True:
+        with span(name) as current:
+            try:
+                item = next(iterator)
+            except StopIteration:
+                return
+            current.set(rows=count(item))
+        yield item
+
+def is_enabled():
+    return _current_tracer.get() is not None
+
+@contextmanager
+def tracing(tracer):
+    """Mengaktifkan tracer untuk konteks saat ini (tracemalloc dinyalakan bila tracer.memory)"""
+    if tracer is None:
+        yield None
+        return
+    started_memory = tracer.memory and not tracemalloc.is_tracing()
+    if started_memory:
+        tracemalloc.start()
+    token = _current_tracer.set(tracer)
+    try:
+        yield tracer
+    finally:
+        _current_tracer.reset(token)
+        if started_memory:
+            tracemalloc.stop()
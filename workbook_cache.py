@@ -0,0 +1,192 @@
+import os
+import json
+import time
+import shutil
+import hashlib
+import tempfile
+import numpy as np
+from pipeline import TARGET_COLUMNS, DEFAULT_CHUNK_SIZE, iter_row_chunks, file_digest
+
+# ========== KONSTANTA ==========
+DEFAULT_CACHE_DIR = os.environ.get("SKRIPSI_CACHE_DIR", os.path.join(".cache", "workbooks"))
+DEFAULT_MAX_BYTES = 512 * 1024 * 1024
+META_FILE = "meta.json"
+
+# ========== TABEL TER-CACHE ==========
+
+class CachedTable:
+    """Kolom target hasil parse yang dibaca lewat memory-map (blob UTF-8 + offset per kolom)"""
+
+    def __init__(self, directory, meta):
+        self.directory = directory
+        self.headers = meta["headers"]
+        self.row_count = meta["rows"]
+        self.complete = meta["complete"]
+        self.blobs = []
+        self.offsets = []
+        for i in range(len(self.headers)):
+            self.blobs.append(_memmap(os.path.join(directory, f"col{i}.bin"), np.uint8))
+            self.offsets.append(_memmap(os.path.join(directory, f"col{i}.off"), np.int64))
+
+    def rows(self, start, stop):
+        """Mendekode baris [start, stop) menjadi list of list string"""
+        stop = min(stop, self.row_count)
+        columns = []
+        for blob, offsets in zip(self.blobs, self.offsets):
+            bounds = offsets[start:stop + 1].tolist()
+            data = blob[bounds[0]:bounds[-1]].tobytes() if len(bounds) > 1 else b""
+            base = bounds[0] if bounds else 0
+            columns.append([data[a - base:b - base].decode("utf-8") for a, b in zip(bounds, bounds[1:])])
+        return [list(row) for row in zip(*columns)] if columns else [[] for _ in range(stop - start)]
+
+    def iter_chunks(self, chunk_size=DEFAULT_CHUNK_SIZE, max_rows=None):
+        """Menghasilkan (headers, rows) per chunk seperti pipeline.iter_row_chunks"""
+        limit = self.row_count if max_rows is None else min(max_rows, self.row_count)
+        for start in range(0, limit, chunk_size):
+            yield self.headers, self.rows(start, min(start + chunk_size, limit))
+
+def _memmap(path, dtype):
+    """np.memmap yang aman untuk file kosong"""
+    if os.path.getsize(path) == 0:
+        return np.zeros(0, dtype=dtype)
+    return np.memmap(path, dtype=dtype, mode="r")
+
+# ========== CACHE PERSISTEN ==========
+
+class WorkbookCache:
+    """Cache kolumnar di disk untuk workbook yang sudah di-parse, dengan kunci hash isi file dan eviksi LRU"""
+
+    def __init__(self, directory=DEFAULT_CACHE_DIR, max_bytes=DEFAULT_MAX_BYTES):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+
+    def entry_dir(self, digest, columns):
+        key = hashlib.sha256((digest + "\x1f" + "\x1f".join(columns)).encode("utf-8")).hexdigest()[:32]
+        return os.path.join(self.directory, key)
+
+    def get(self, digest, columns=TARGET_COLUMNS, max_rows=None):
+        """Mengembalikan CachedTable bila entri ada dan mencakup max_rows baris, selain itu None"""
+        directory = self.entry_dir(digest, columns)
+        meta_path = os.path.join(directory, META_FILE)
+        try:
+            with open(meta_path, encoding="utf-8") as f:
+                meta = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if not meta["complete"] and (max_rows is None or max_rows > meta["rows"]):
+            return None
+        os.utime(meta_path)  # penanda akses terakhir untuk LRU
+        return CachedTable(directory, meta)
+
+    def iter_chunks(self, source, columns=TARGET_COLUMNS, chunk_size=DEFAULT_CHUNK_SIZE, max_rows=None):
+        """Membaca (headers, rows) per chunk dari cache; saat miss mem-parse file sambil mengisi cache"""
+        digest = file_digest(source)
+        table = self.get(digest, columns, max_rows)
+        if table is not None:
+            self.hits += 1
+            yield from table.iter_chunks(chunk_size, max_rows)
+            return
+
+        self.misses += 1
+        os.makedirs(self.directory, exist_ok=True)
+        temp_dir = tempfile.mkdtemp(prefix=".tmp-", dir=self.directory)
+        writers = None
+        headers = list(columns)
+        row_count = 0
+        completed = False
+        try:
+            for headers, rows in iter_row_chunks(source, columns, chunk_size, max_rows):
+                if writers is None:
+                    writers = _ColumnWriters(temp_dir, len(headers))
+                writers.append(rows)
+                row_count += len(rows)
+                yield headers, rows
+            completed = True
+        finally:
+            if writers is not None:
+                writers.close()
+            if completed:
+                complete = max_rows is None or row_count < max_rows
+                self._commit(temp_dir, digest, columns, headers, row_count, complete)
+            else:
+                shutil.rmtree(temp_dir, ignore_errors=True)
+
+    def _commit(self, temp_dir, digest, columns, headers, row_count, complete):
+        """Memindahkan entri sementara ke lokasi final lalu menjalankan eviksi"""
+        if not os.path.exists(os.path.join(temp_dir, "col0.bin")):
+            for i in range(len(headers)):
+                open(os.path.join(temp_dir, f"col{i}.bin"), "wb").close()
+                np.zeros(1, dtype=np.int64).tofile(os.path.join(temp_dir, f"col{i}.off"))
+        meta = {"digest": digest, "columns": list(columns), "headers": headers,
+                "rows": row_count, "complete": complete, "created": time.time()}
+        with open(os.path.join(temp_dir, META_FILE), "w", encoding="utf-8") as f:
+            json.dump(meta, f)
+
+        final_dir = self.entry_dir(digest, columns)
+        shutil.rmtree(final_dir, ignore_errors=True)
+        try:
+            os.replace(temp_dir, final_dir)
+        except OSError:
+            # Sesi lain sudah menulis entri yang sama lebih dulu
+            shutil.rmtree(temp_dir, ignore_errors=True)
+        self.evict()
+
+    def entries(self):
+        """Daftar entri (direktori, ukuran byte, waktu akses terakhir)"""
+        result = []
+        if not os.path.isdir(self.directory):
+            return result
+        for name in os.listdir(self.directory):
+            path = os.path.join(self.directory, name)
+            meta_path = os.path.join(path, META_FILE)
+            if name.startswith(".tmp-") or not os.path.exists(meta_path):
+                continue
+            size = sum(os.path.getsize(os.path.join(path, f)) for f in os.listdir(path))
+            result.append((path, size, os.path.getmtime(meta_path)))
+        return result
+
+    def total_bytes(self):
+        return sum(size for _, size, _ in self.entries())
+
+    def evict(self):
+        """Menghapus entri yang paling lama tidak diakses hingga total ukuran <= max_bytes"""
+        entries = sorted(self.entries(), key=lambda entry: entry[2])
+        total = sum(size for _, size, _ in entries)
+        for path, size, _ in entries:
+            if total <= self.max_bytes:
+                break
+            shutil.rmtree(path, ignore_errors=True)
+            total -= size
+
+    def invalidate(self, digest=None, columns=TARGET_COLUMNS):
+        """Menghapus entri untuk satu file (berdasarkan hash) atau seluruh cache bila digest None"""
+        if digest is not None:
+            shutil.rmtree(self.entry_dir(digest, columns), ignore_errors=True)
+            return
+        for path, _, _ in self.entries():
+            shutil.rmtree(path, ignore_errors=True)
+
+class _ColumnWriters:
+    """Menulis blob UTF-8 dan offset kumulatif setiap kolom secara bertahap"""
+
+    def __init__(self, directory, column_count):
+        self.blob_files = [open(os.path.join(directory, f"col{i}.bin"), "wb") for i in range(column_count)]
+        self.offset_files = [open(os.path.join(directory, f"col{i}.off"), "wb") for i in range(column_count)]
+        self.positions = [0] * column_count
+        for f in self.offset_files:
+            np.zeros(1, dtype=np.int64).tofile(f)
+
+    def append(self, rows):
+        for i, (blob_file, offset_file) in enumerate(zip(self.blob_files, self.offset_files)):
+            encoded = [row[i].encode("utf-8") for row in rows]
+            blob_file.write(b"".join(encoded))
+            offsets = self.positions[i] + np.cumsum([len(value) for value in encoded], dtype=np.int64)
+            offsets.tofile(offset_file)
+            if len(offsets):
+                self.positions[i] = int(offsets[-1])
+
+    def close(self):
+        for f in self.blob_files + self.offset_files:
+            f.close()